@@ -0,0 +1,228 @@
+"""
+异步客户端模块 - Tavily 搜索和飞书推送的 asyncio 版本（共用 AsyncHTTP 连接池），以及同步包装
+"""
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+
+from async_http import AsyncHTTP, gather_with_timeout, run_sync
+from feishu_sender import FeishuSender, bot_payload, rate_limit_delay, webhook_payload
+from feishu_token import TOKEN_EXPIRED_CODES
+from tavily_client import RETRY_STATUS_CODES, QueryBudget, SearchResult, TavilyClient
+
+
+class AsyncTavilyClient:
+    """TavilyClient 的异步版本：沿用同步客户端的缓存、预算、额度、重试策略和水位线，只把网络请求换成 asyncio"""
+
+    def __init__(self, client: TavilyClient, http: AsyncHTTP):
+        """
+        Args:
+            client: 同步客户端（提供 API Key、地址、重试参数以及缓存/额度/水位线）
+            http: 共享的异步 HTTP 客户端
+        """
+        self.client = client
+        self.http = http
+
+    async def _post_search(self, payload: Dict) -> Optional[List[SearchResult]]:
+        """请求 Tavily API（重试策略和响应解析同 TavilyClient），失败时返回 None"""
+        client = self.client
+        print(f"[Tavily] 搜索: {payload['query'][:80]}...")
+
+        for attempt in range(client.max_retries + 1):
+            retry_after = None
+            try:
+                status, headers, body = await self.http.request_json("POST", client.search_url, json_body=payload)
+                if status not in RETRY_STATUS_CODES:
+                    return client._parse_response(status, body)
+                error = f"HTTP {status}"
+                retry_after = headers.get("Retry-After")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                error = f"网络错误: {e.__class__.__name__}"
+
+            delay = client._retry_delay(attempt, error, retry_after)
+            if delay is None:
+                return None
+            await asyncio.sleep(delay)
+
+        return None
+
+    async def search(self, query: str, time_range: str = "day", max_results: int = 10,
+                     search_depth: str = "basic", budget: QueryBudget = None,
+                     incremental: bool = False) -> List[SearchResult]:
+        """执行搜索，参数和返回值同 TavilyClient.search"""
+        client = self.client
+        plan = client._prepare(query, time_range, max_results, search_depth, budget, incremental)
+        if "results" in plan:
+            return plan["results"]
+
+        # 额度管理器的令牌桶会阻塞等待，放到线程中避免卡住事件循环
+        if not await asyncio.to_thread(client._acquire_quota, plan):
+            return []
+
+        results = await self._post_search(dict(plan["request"], api_key=client.api_key))
+        return client._complete(plan, results)
+
+    async def search_many(self, queries: List[str], time_range: str = "day", max_results: int = 10,
+                          budget: QueryBudget = None, incremental: bool = False,
+                          timeout: Optional[float] = None) -> List[List[SearchResult]]:
+        """
+        并发执行多个查询（连接数受 AsyncHTTP 的每主机上限约束）
+
+        Args:
+            incremental: 各查询只搜索上次成功以来的内容
+            timeout: 整体超时（秒），超时后取消未完成的查询，其结果为空列表
+
+        Returns:
+            与 queries 顺序一致的结果列表
+        """
+        results = await gather_with_timeout(
+            (self.search(query, time_range=time_range, max_results=max_results, budget=budget,
+                         incremental=incremental)
+             for query in queries),
+            timeout
+        )
+        return [r or [] for r in results]
+
+
+class AsyncFeishuSender:
+    """FeishuSender 的异步版本：相同的配置、消息格式、token 缓存、发送队列和幂等键"""
+
+    def __init__(self, sender: FeishuSender, http: AsyncHTTP):
+        """
+        Args:
+            sender: 同步推送器（提供 webhook_url、app_id/app_secret、chat_id 和发送队列）
+            http: 共享的异步 HTTP 客户端
+        """
+        self.sender = sender
+        self.http = http
+        self._token_lock = asyncio.Lock()
+
+    async def get_tenant_access_token(self, rejected_token: Optional[str] = None) -> Optional[str]:
+        """获取 tenant_access_token（复用同步推送器的 token 缓存，并发请求时只获取一次）"""
+        async with self._token_lock:
+            # token 缓存持有文件锁，放到线程中避免卡住事件循环
+            return await asyncio.to_thread(self.sender.get_tenant_access_token, rejected_token)
+
+    async def _webhook_once(self, content: str, title: str) -> Tuple[bool, Optional[float]]:
+        """通过 Webhook 发送一次，返回值同 FeishuSender.send_once"""
+        try:
+            status, headers, result = await self.http.request_json(
+                "POST", self.sender.webhook_url, json_body=webhook_payload(content, title)
+            )
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"[飞书推送] Webhook 发送异常: {e}")
+            return False, None
+        if result and (result.get("StatusCode") == 0 or result.get("code") == 0):
+            print(f"[飞书推送] Webhook 发送成功: {title}")
+            return True, None
+        print(f"[飞书推送] Webhook 发送失败: {result}")
+        return False, rate_limit_delay(status, headers, result)
+
+    async def _bot_once(self, content: str, title: str,
+                        message_uuid: Optional[str] = None) -> Tuple[bool, Optional[float]]:
+        """通过机器人发送一次（token 失效时换新 token 重试一次），返回值同 FeishuSender.send_once"""
+        if not self.sender.chat_id:
+            print("[飞书推送] 未配置 chat_id")
+            return False, None
+        token = await self.get_tenant_access_token()
+        if not token:
+            return False, None
+
+        result, retry_after = await self._post_message(token, content, title, message_uuid)
+        if result and result.get("code") in TOKEN_EXPIRED_CODES:
+            print(f"[飞书推送] ⚠️ token 已失效（{result.get('code')}），重新获取后重试")
+            token = await self.get_tenant_access_token(rejected_token=token)
+            if not token:
+                return False, None
+            result, retry_after = await self._post_message(token, content, title, message_uuid)
+
+        if result and result.get("code") == 0:
+            print(f"[飞书推送] 机器人发送成功: {title}")
+            return True, None
+        if result is not None:
+            print(f"[飞书推送] 机器人发送失败: {result}")
+        return False, retry_after
+
+    async def _post_message(self, token: str, content: str, title: str,
+                            message_uuid: Optional[str] = None) -> Tuple[Optional[Dict], Optional[float]]:
+        """调用 im/v1/messages 发送一条卡片消息，返回值同 FeishuSender._post_message"""
+        try:
+            status, headers, result = await self.http.request_json(
+                "POST", f"{self.sender.api_base}/im/v1/messages",
+                json_body=bot_payload(self.sender.chat_id, content, title, message_uuid),
+                params={"receive_id_type": "chat_id"},
+                headers={"Authorization": f"Bearer {token}"}
+            )
+            return result, rate_limit_delay(status, headers, result)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"[飞书推送] 机器人发送异常: {e}")
+            return None, None
+
+    async def send_once(self, content: str, title: str,
+                        message_uuid: Optional[str] = None) -> Tuple[bool, Optional[float]]:
+        """按配置的方式发送一次，不排队、不重试，返回值同 FeishuSender.send_once"""
+        if self.sender.webhook_url:
+            return await self._webhook_once(content, title)
+        return await self._bot_once(content, title, message_uuid)
+
+    async def send_message(self, content: str, title: str = "物流预警",
+                           idempotency_key: Optional[str] = None) -> bool:
+        """
+        发送消息，参数和返回值同 FeishuSender.send_message
+
+        启用限速时交给同步推送器的发送队列（与同步发送共用同一去向的令牌桶、限流重试和合并），
+        在线程中等待结果；未启用时在事件循环中直接发送，卡片拆分和幂等键与同步推送一致
+        """
+        sender = self.sender
+        if not sender.destination:
+            print("[飞书推送] 未配置任何推送方式（webhook 或 机器人）")
+            return False
+        if sender.queue:
+            return await asyncio.to_thread(sender.send_message, content, title, idempotency_key)
+
+        cards = sender.split_cards(content, title)
+        ok = True
+        for (card_content, card_title), message_uuid in zip(cards, sender.card_uuids(len(cards), idempotency_key)):
+            if not (await self.send_once(card_content, card_title, message_uuid))[0]:
+                ok = False
+                if len(cards) > 1:
+                    print(f"[飞书推送] ❌ 未送达: {card_title}")
+        return ok
+
+    async def send_many(self, messages: List[Tuple[str, str]], timeout: Optional[float] = None,
+                        idempotency_keys: Optional[List[Optional[str]]] = None) -> List[bool]:
+        """
+        并发发送多条消息
+
+        Args:
+            messages: (内容, 标题) 列表
+            timeout: 整体超时（秒），超时后取消未完成的发送
+            idempotency_keys: 每条消息的幂等键（如发件箱条目 id），None 表示都不带
+
+        Returns:
+            与 messages 顺序一致的发送结果
+        """
+        keys = idempotency_keys or [None] * len(messages)
+        results = await gather_with_timeout(
+            (self.send_message(content, title, key) for (content, title), key in zip(messages, keys)), timeout
+        )
+        return [bool(r) for r in results]
+
+
+def search_many(client: TavilyClient, queries: List[str], limit_per_host: int = 8, **kwargs) -> List[List[SearchResult]]:
+    """同步包装：用异步引擎并发执行多个查询（TavilyClient.search_sharded 在 async_io 启用时调用）"""
+    async def _run():
+        async with AsyncHTTP(limit_per_host=limit_per_host,
+                             connect_timeout=client.timeout[0], read_timeout=client.timeout[1]) as http:
+            return await AsyncTavilyClient(client, http).search_many(queries, **kwargs)
+    return run_sync(_run)
+
+
+def send_many(sender: FeishuSender, messages: List[Tuple[str, str]], limit_per_host: int = 8,
+              timeout: Optional[float] = None, idempotency_keys: Optional[List[Optional[str]]] = None) -> List[bool]:
+    """同步包装：用异步引擎并发发送多条飞书消息"""
+    async def _run():
+        async with AsyncHTTP(limit_per_host=limit_per_host, read_timeout=10) as http:
+            return await AsyncFeishuSender(sender, http).send_many(messages, timeout, idempotency_keys)
+    return run_sync(_run)
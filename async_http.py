@@ -0,0 +1,98 @@
+"""
+异步 HTTP 模块 - 基于 asyncio/aiohttp 的共享客户端（按主机限制连接数、可取消），以及同步入口
+"""
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import aiohttp
+
+
+class AsyncHTTP:
+    """同一事件循环内共用的 HTTP 客户端：一个连接池，总连接数和每个主机的连接数都有上限"""
+
+    def __init__(self, limit: int = 64, limit_per_host: int = 8, connect_timeout: float = 5,
+                 read_timeout: float = 30):
+        """
+        Args:
+            limit: 连接池总连接数上限
+            limit_per_host: 每个主机的连接数上限（避免打满单个 API）
+            connect_timeout: 建立连接超时（秒）
+            read_timeout: 读取响应超时（秒）
+        """
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """在当前事件循环中懒创建会话"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host)
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    async def request_json(self, method: str, url: str, json_body: Dict = None, params: Dict = None,
+                           headers: Dict = None) -> Tuple[int, Dict[str, str], Any]:
+        """
+        发送请求并解析 JSON 响应
+
+        Returns:
+            (状态码, 响应头, 解析后的 JSON；不是合法 JSON 时为 None)
+
+        Raises:
+            aiohttp.ClientError / asyncio.TimeoutError: 网络错误或超时
+        """
+        session = self._get_session()
+        async with session.request(method, url, json=json_body, params=params, headers=headers) as response:
+            text = await response.text()
+            try:
+                body = json.loads(text) if text else None
+            except ValueError:
+                body = None
+            return response.status, dict(response.headers), body
+
+    async def close(self):
+        """关闭连接池"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self) -> "AsyncHTTP":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+async def gather_with_timeout(awaitables: Iterable[Awaitable], timeout: Optional[float] = None) -> List[Any]:
+    """
+    并发执行，超过 timeout 秒后取消所有未完成的任务
+
+    Returns:
+        与输入顺序一致的结果列表；被取消或抛出异常的任务对应 None
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    if not tasks:
+        return []
+
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
+        print(f"[异步HTTP] ⚠️ 超时，已取消 {len(pending)} 个未完成的请求")
+
+    results = []
+    for task in tasks:
+        if task in done and task.exception() is None:
+            results.append(task.result())
+        else:
+            if task in done:
+                print(f"[异步HTTP] ❌ 请求异常: {task.exception()}")
+            results.append(None)
+    return results
+
+
+def run_sync(func: Callable[..., Awaitable], *args, **kwargs) -> Any:
+    """同步入口：在新的事件循环中执行异步函数，供现有命令行脚本调用"""
+    return asyncio.run(func(*args, **kwargs))
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+异步 I/O 基准测试 - 针对本地替身服务比较 20 个搜索 + 10 条推送在同步顺序执行和异步并发执行下的总耗时
+用法: python bench_async.py [--searches 20] [--sends 10] [--latency-ms 200] [--limit-per-host 8]
+      python bench_async.py --base-url http://127.0.0.1:8765   # 使用已启动的替身服务
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import time
+
+from async_clients import AsyncFeishuSender, AsyncTavilyClient
+from async_http import AsyncHTTP, run_sync
+from feishu_sender import FeishuSender
+from mock_tavily_server import start_server
+from tavily_client import TavilyClient
+
+
+def run_sequential(tavily: TavilyClient, feishu: FeishuSender, queries, messages):
+    """现有同步路径：逐个搜索、逐条推送"""
+    results = [tavily.search(query, max_results=10) for query in queries]
+    sent = [feishu.send_message(content, title) for content, title in messages]
+    return results, sent
+
+
+async def run_concurrent(tavily: TavilyClient, feishu: FeishuSender, queries, messages, limit_per_host: int):
+    """异步路径：共用一个连接池，搜索和推送同时进行"""
+    async with AsyncHTTP(limit_per_host=limit_per_host) as http:
+        search_task = AsyncTavilyClient(tavily, http).search_many(queries, max_results=10)
+        send_task = AsyncFeishuSender(feishu, http).send_many(messages)
+        return await asyncio.gather(search_task, send_task)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="异步 I/O 基准测试")
+    parser.add_argument("--searches", type=int, default=20, help="搜索次数")
+    parser.add_argument("--sends", type=int, default=10, help="推送次数")
+    parser.add_argument("--base-url", help="已启动的替身服务地址，不指定时在进程内启动")
+    parser.add_argument("--latency-ms", type=float, default=200, help="替身平均响应延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=50, help="替身延迟抖动（毫秒）")
+    parser.add_argument("--limit-per-host", type=int, default=8, help="异步引擎每个主机的连接数上限")
+    parser.add_argument("--verbose", action="store_true", help="显示请求日志")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = start_server(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, seed=42)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # 不使用缓存、额度管理和发送限速，保证每个请求都立即到达替身服务
+    tavily = TavilyClient("bench-key", base_url=base_url, backoff_base=0.05, backoff_max=0.5)
+    feishu = FeishuSender({"webhook_url": f"{base_url}/webhook", "rate_limit": {"enabled": False}})
+    queries = [f"Europe logistics disruption {i}" for i in range(args.searches)]
+    messages = [(f"**测试消息 {i}**", f"基准测试 {i}") for i in range(args.sends)]
+
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        start = time.perf_counter()
+        sync_results, sync_sent = run_sequential(tavily, feishu, queries, messages)
+        sync_wall = time.perf_counter() - start
+
+        start = time.perf_counter()
+        async_results, async_sent = run_sync(run_concurrent, tavily, feishu, queries, messages,
+                                             args.limit_per_host)
+        async_wall = time.perf_counter() - start
+
+    tavily.close()
+    if server:
+        server.shutdown()
+
+    print("=" * 60)
+    print("异步 I/O 基准测试")
+    print(f"搜索 {args.searches} 次 + 推送 {args.sends} 条，替身: {base_url}，"
+          f"每主机连接上限: {args.limit_per_host}")
+    print("=" * 60)
+    print(f"{'方式':<10} | {'总耗时(秒)':>10} | {'有结果的搜索':>12} | {'推送成功':>8}")
+    print("-" * 60)
+    print(f"{'同步顺序':<10} | {sync_wall:>10.2f} | {sum(1 for r in sync_results if r):>12} | "
+          f"{sum(sync_sent):>8}")
+    print(f"{'异步并发':<10} | {async_wall:>10.2f} | {sum(1 for r in async_results if r):>12} | "
+          f"{sum(async_sent):>8}")
+    print("-" * 60)
+    print(f"加速比: {sync_wall / async_wall:.1f}x")
+    if server:
+        print(f"替身统计: {server.stats}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
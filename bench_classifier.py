@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+分类器基准测试 - 在合成的搜索结果上比较逐个子串扫描（原先格式化函数的写法，以及同样写法覆盖完整词表）
+和 classifier 单次扫描的吞吐，并统计与原写法结果不一致的条数
+用法: python bench_classifier.py [--items 100000] [--seed 42]
+"""
+import argparse
+import random
+import time
+from typing import Dict, List, Set, Tuple
+
+from classifier import get_classifier
+from mock_tavily_server import COUNTRIES, NEWS_EVENTS, WEATHER_EVENTS
+
+FILLER = ("Shippers report delays and carriers are rerouting freight while the situation develops. Authorities "
+          "said more updates would follow later in the day and asked forwarders to support affected customers.")
+
+
+def make_items(count: int, seed: int) -> List[Dict]:
+    """合成搜索结果（标题 + 摘要），国家、城市和事件随机组合"""
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        country = rng.choice(list(COUNTRIES))
+        city = rng.choice(COUNTRIES[country])
+        event = rng.choice(NEWS_EVENTS + WEATHER_EVENTS)
+        # 一部分标题只写城市，考察枢纽城市识别
+        title = f"{city}, {country}: {event}" if rng.random() < 0.7 else f"{city}: {event}"
+        items.append({"title": f"{title} (#{i})", "content": f"{event.capitalize()} in {city}. {FILLER}"})
+    return items
+
+
+def legacy_tags(item: Dict) -> Tuple[Set[str], Set[str], Set[str]]:
+    """原先 format_news_report / format_weather_report 的写法：拼接后逐个关键词做子串查找（天气类型换算为灾害类型的键）"""
+    full_text = item.get("title", "").lower() + " " + item.get("content", "").lower()
+    countries, events, weather = set(), set(), set()
+    if "germany" in full_text or "german" in full_text or "hamburg" in full_text:
+        countries.add("Germany")
+    if "france" in full_text or "french" in full_text:
+        countries.add("France")
+    if "netherlands" in full_text or "dutch" in full_text or "rotterdam" in full_text:
+        countries.add("Netherlands")
+    if "belgium" in full_text or "belgian" in full_text:
+        countries.add("Belgium")
+    if "poland" in full_text or "polish" in full_text:
+        countries.add("Poland")
+    if "strike" in full_text:
+        events.add("strike")
+    if "fire" in full_text:
+        events.add("fire")
+    if "port" in full_text or "harbour" in full_text or "harbor" in full_text:
+        events.add("port")
+    if "warehouse" in full_text:
+        events.add("warehouse")
+    if "disruption" in full_text or "delay" in full_text:
+        events.add("disruption")
+    if "closure" in full_text or "closed" in full_text:
+        events.add("closure")
+    if "storm" in full_text or "风暴" in full_text:
+        weather.add("wind")
+    if "snow" in full_text or "雪" in full_text:
+        weather.add("snow_ice")
+    if "rain" in full_text or "雨" in full_text:
+        weather.add("rain")
+    if "wind" in full_text or "大风" in full_text:
+        weather.add("wind")
+    if "temperature" in full_text or "温度" in full_text:
+        weather.add("heat")
+    return countries, events, weather
+
+
+def naive_tags(item: Dict) -> Tuple[Set[str], ...]:
+    """同样的逐个子串查找，但覆盖 classifier 的完整词表（词表越大越慢）"""
+    full_text = item.get("title", "").lower() + " " + item.get("content", "").lower()
+    found = (set(), set(), set(), set())
+    for term, tags in get_classifier().terms.items():
+        if term in full_text:
+            for field, tag in tags:
+                found[field].add(tag)
+    return found
+
+
+def timed(func, items: List[Dict]) -> Tuple[float, List]:
+    start = time.perf_counter()
+    results = [func(item) for item in items]
+    return time.perf_counter() - start, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="分类器基准测试")
+    parser.add_argument("--items", type=int, default=100000, help="合成结果数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    args = parser.parse_args()
+
+    items = make_items(args.items, args.seed)
+    legacy_time, legacy = timed(legacy_tags, items)
+    naive_time, _ = timed(naive_tags, items)
+    compiled_time, compiled = timed(get_classifier().classify, items)
+
+    country_diff = sum(1 for old, new in zip(legacy, compiled) if old[0] != new.countries)
+    event_diff = sum(1 for old, new in zip(legacy, compiled) if old[1] != new.events)
+    weather_diff = sum(1 for old, new in zip(legacy, compiled) if old[2] != new.hazards)
+    false_port = sum(1 for old, new in zip(legacy, compiled) if "port" in old[1] and "port" not in new.events)
+
+    print("=" * 60)
+    print("分类器基准测试")
+    classifier = get_classifier()
+    print(f"合成结果 {args.items} 条，词表 v{classifier.version} 关键词 {len(classifier.terms)} 个"
+          f"（枢纽城市 {len(classifier.hubs)} 个）")
+    print("=" * 60)
+    print(f"{'方式':<12} | {'耗时(秒)':>8} | {'条/秒':>10}")
+    print("-" * 60)
+    print(f"{'逐个子串扫描（原词表）':<12} | {legacy_time:>8.2f} | {args.items / legacy_time:>10.0f}")
+    print(f"{'逐个子串扫描（完整词表）':<12} | {naive_time:>8.2f} | {args.items / naive_time:>10.0f}")
+    print(f"{'单次正则扫描':<12} | {compiled_time:>8.2f} | {args.items / compiled_time:>10.0f}")
+    print("-" * 60)
+    print(f"结果不一致: 国家 {country_diff} 条，事件 {event_diff} 条，天气 {weather_diff} 条")
+    print(f"  其中子串扫描误判为港口问题（如 report/support 中的 port）: {false_port} 条")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
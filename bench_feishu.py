@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+飞书推送压测 - 通过 FeishuSender 向本地飞书替身推送 N 份报告，统计每秒发送数、限流重试和尾延迟
+用法: python bench_feishu.py [--reports 100] [--concurrency 4] [--mode webhook|bot] [--items 10]
+                           [--latency-ms 100] [--jitter-ms 30] [--error-rate 0.02]
+                           [--server-rate 5] [--client-rate 1.5] [--no-queue]
+      python bench_feishu.py --base-url http://127.0.0.1:8766   # 使用已启动的替身服务
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from feishu_sender import FeishuSender
+from mock_feishu_server import WEBHOOK_PREFIX, start_server
+from news_monitor import format_news_report
+
+EVENTS = ["dock workers strike", "warehouse fire", "port closure", "rail freight disruption", "border delays"]
+CITIES = ["Hamburg", "Rotterdam", "Antwerp", "Le Havre", "Gdansk"]
+
+
+def make_news(report: int, items: int) -> List[Dict]:
+    """合成一份报告的新闻条目（items 越多报告越大，超过卡片上限时会被拆分）"""
+    now = datetime.now(timezone.utc)
+    news = []
+    for i in range(items):
+        city = CITIES[(report + i) % len(CITIES)]
+        event = EVENTS[(report * 7 + i) % len(EVENTS)]
+        news.append({
+            "title": f"{city}: {event} affects freight ({report}-{i})",
+            "url": f"https://news.example.com/{report}/{i}",
+            "content": f"{event.capitalize()} in {city}. Carriers report delays and are rerouting freight "
+                       f"while the situation develops; shippers should expect knock-on effects.",
+            "published_date": (now - timedelta(minutes=i)).isoformat(),
+        })
+    return news
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """最近秩百分位数"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="飞书推送压测")
+    parser.add_argument("--reports", type=int, default=100, help="推送的报告数")
+    parser.add_argument("--concurrency", type=int, default=4, help="同时推送的线程数")
+    parser.add_argument("--mode", choices=["webhook", "bot"], default="webhook", help="推送方式")
+    parser.add_argument("--items", type=int, default=10, help="每份报告的新闻条数")
+    parser.add_argument("--base-url", help="已启动的飞书替身地址，不指定时在进程内启动")
+    parser.add_argument("--latency-ms", type=float, default=100, help="替身平均响应延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=30, help="替身延迟抖动（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="替身返回 503 的概率")
+    parser.add_argument("--server-rate", type=float, default=5, help="替身每个去向每秒允许的消息数，0 为不限流")
+    parser.add_argument("--server-burst", type=int, default=5, help="替身限流令牌桶容量")
+    parser.add_argument("--client-rate", type=float, default=1.5, help="发送队列每秒发送数（feishu.rate_limit.rate_per_second）")
+    parser.add_argument("--client-burst", type=int, default=5, help="发送队列令牌桶容量")
+    parser.add_argument("--max-retries", type=int, default=3, help="发送队列被限流时的最多重试次数")
+    parser.add_argument("--no-queue", action="store_true", help="不经过发送队列直接发送（不限速、不重试）")
+    parser.add_argument("--verbose", action="store_true", help="显示推送日志")
+    args = parser.parse_args()
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = start_server(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+                              rate_per_second=args.server_rate, burst=args.server_burst, seed=42)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    token_dir = tempfile.mkdtemp(prefix="bench_feishu_")
+    config = {
+        "api_base": f"{base_url}/open-apis",
+        "token_cache_file": os.path.join(token_dir, "feishu_token.json"),
+        "rate_limit": {"enabled": not args.no_queue, "rate_per_second": args.client_rate,
+                       "burst": args.client_burst, "max_retries": args.max_retries},
+    }
+    if args.mode == "webhook":
+        config["webhook_url"] = f"{base_url}{WEBHOOK_PREFIX}bench-{os.getpid()}"
+    else:
+        config.update({"app_id": "cli_bench", "app_secret": "bench-secret", "chat_id": f"oc_bench_{os.getpid()}"})
+    # 环境变量会覆盖 api_base，压测时始终指向替身
+    os.environ.pop("FEISHU_API_BASE", None)
+    sender = FeishuSender(config)
+
+    reports = [(format_news_report(make_news(i, args.items)), f"压测报告 {i}") for i in range(args.reports)]
+    latencies: List[float] = []
+
+    def send(report):
+        content, title = report
+        start = time.perf_counter()
+        ok = sender.send_message(content, title, idempotency_key=f"bench-{title}")
+        latencies.append(time.perf_counter() - start)
+        return ok
+
+    output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+    with output:
+        cards = sum(len(sender.split_cards(content, title)) for content, title in reports)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, args.concurrency)) as pool:
+            results = list(pool.map(send, reports))
+        wall = time.perf_counter() - start
+
+    shutil.rmtree(token_dir, ignore_errors=True)
+    if server:
+        server.shutdown()
+
+    print("=" * 60)
+    print("飞书推送压测")
+    print(f"方式: {args.mode}，报告 {args.reports} 份（拆分后 {cards} 张卡片），并发 {args.concurrency}，"
+          f"发送队列: {'关闭' if args.no_queue else f'{args.client_rate}/秒'}，替身: {base_url}")
+    print("=" * 60)
+    print(f"总耗时:       {wall:.2f} 秒")
+    print(f"成功/失败:    {sum(results)} / {len(results) - sum(results)}")
+    print(f"报告/秒:      {len(results) / wall:.2f}")
+    if server:
+        # 发送队列会把排队中的卡片合并发送，按替身实际收到（去重后）的卡片数计算
+        print(f"卡片/秒:      {server.stats['delivered'] / wall:.2f}（替身收到 {server.stats['delivered']} 张）")
+    else:
+        print(f"卡片/秒:      {cards / wall:.2f}（按提交数计算，未计入发送队列的合并）")
+    if sender.queue:
+        print(f"限流重试:     {sender.queue.stats['retries']} 次")
+        print(f"发送队列:     {sender.queue.summary()}")
+    print(f"单份报告耗时: p50 {percentile(latencies, 50):.3f} 秒，p95 {percentile(latencies, 95):.3f} 秒，"
+          f"p99 {percentile(latencies, 99):.3f} 秒，最长 {max(latencies, default=0):.3f} 秒")
+    if server:
+        print(f"替身统计:     {server.stats}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
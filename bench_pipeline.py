@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+端到端基准测试 - 针对本地 Tavily 替身服务重复执行天气 + 新闻流水线，统计每秒运行次数和各阶段 p50/p95
+用法: python bench_pipeline.py [--runs 50] [--latency-ms 100] [--error-rate 0.02] [--sharding]
+      python bench_pipeline.py --base-url http://127.0.0.1:8765   # 使用已启动的替身服务
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import tempfile
+import time
+from typing import Dict, List
+
+from feishu_sender import FeishuSender
+from mock_tavily_server import start_server
+from news_monitor import extract_news_items, format_news_report, get_news_search_config
+from storage import create_storage
+from tavily_client import TavilyClient
+from weather_monitor import format_weather_report, get_weather_search_config
+
+STAGES = ["search_weather", "format_weather", "search_news", "dedup", "format_news", "send", "persist", "total"]
+
+
+def load_bench_config(sharding: bool) -> Dict:
+    """读取监控配置（优先 config.json，否则使用 config.json.example）"""
+    config_file = "config.json" if os.path.exists("config.json") else "config.json.example"
+    with open(config_file, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    config.setdefault("search", {}).setdefault("sharding", {})["enabled"] = sharding
+    return config
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """最近秩法百分位数"""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def run_once(config: Dict, tavily: TavilyClient, feishu: FeishuSender, storage) -> Dict[str, float]:
+    """执行一次完整流水线，返回各阶段耗时（秒）"""
+    timings = {}
+
+    def timed(stage, func, *args):
+        start = time.perf_counter()
+        result = func(*args)
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+        return result
+
+    run_start = time.perf_counter()
+    with storage.transaction():
+        weather_results = timed("search_weather", tavily.run, get_weather_search_config(config))
+        weather_report = timed("format_weather", format_weather_report, weather_results)
+
+        news_results = timed("search_news", tavily.run, get_news_search_config(config))
+        new_news = timed("dedup", lambda: storage.get_new_news(extract_news_items(news_results)))
+        news_report = timed("format_news", format_news_report, new_news)
+
+        timed("send", feishu.send_message, weather_report, "欧洲物流天气预警")
+        if news_report and timed("send", feishu.send_message, news_report, "欧洲物流突发事件预警"):
+            timed("persist", storage.add_sent_news, new_news)
+        start = time.perf_counter()
+    # 事务提交（快照/日志落盘）也计入 persist
+    timings["persist"] = timings.get("persist", 0.0) + time.perf_counter() - start
+    timings["total"] = time.perf_counter() - run_start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="物流预警流水线端到端基准测试")
+    parser.add_argument("--runs", type=int, default=50, help="运行次数")
+    parser.add_argument("--base-url", help="已启动的替身服务地址，不指定时在进程内启动")
+    parser.add_argument("--replay", help="回放的录制文件（仅进程内替身）")
+    parser.add_argument("--results", type=int, default=10, help="每次搜索合成的结果数")
+    parser.add_argument("--latency-ms", type=float, default=50, help="替身平均响应延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=20, help="替身延迟抖动（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="替身返回 429/503 的概率")
+    parser.add_argument("--sharding", action="store_true", help="启用分片搜索")
+    parser.add_argument("--backend", default="json", choices=["json", "sqlite"], help="存储后端")
+    parser.add_argument("--verbose", action="store_true", help="显示流水线日志")
+    args = parser.parse_args()
+
+    config = load_bench_config(args.sharding)
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        server = start_server(
+            replay_file=args.replay, results=args.results, latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms, error_rate=args.error_rate, seed=42
+        )
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    # 不使用缓存、额度管理和发送限速，保证每次运行都真正请求替身服务
+    tavily = TavilyClient("bench-key", base_url=base_url, backoff_base=0.05, backoff_max=0.5)
+    feishu = FeishuSender({"webhook_url": f"{base_url}/webhook", "rate_limit": {"enabled": False}})
+
+    samples: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = create_storage({
+            "backend": args.backend,
+            "sent_news_file": os.path.join(tmp, "sent_news.json"),
+            "sqlite_file": os.path.join(tmp, "sent_news.db"),
+        })
+
+        wall_start = time.perf_counter()
+        for _ in range(args.runs):
+            output = contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO())
+            with output:
+                timings = run_once(config, tavily, feishu, storage)
+            for stage in STAGES:
+                samples[stage].append(timings.get(stage, 0.0))
+        wall = time.perf_counter() - wall_start
+
+        if hasattr(storage, "close"):
+            storage.close()
+
+    tavily.close()
+    if server:
+        server.shutdown()
+
+    print("=" * 60)
+    print("流水线端到端基准测试")
+    print(f"运行次数: {args.runs}，替身: {base_url}，分片: {'是' if args.sharding else '否'}，"
+          f"存储: {args.backend}")
+    print("=" * 60)
+    print(f"{'阶段':<16} | {'p50(ms)':>10} | {'p95(ms)':>10}")
+    print("-" * 60)
+    for stage in STAGES:
+        print(f"{stage:<16} | {percentile(samples[stage], 50) * 1000:>10.2f} | "
+              f"{percentile(samples[stage], 95) * 1000:>10.2f}")
+    print("-" * 60)
+    print(f"吞吐: {args.runs / wall:.2f} 次/秒（总耗时 {wall:.1f} 秒）")
+    if server:
+        print(f"替身统计: {server.stats}")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+存储去重基准测试 - 验证 get_new_news 耗时不随历史记录规模增长
+用法: python bench_storage.py [--sizes 1000,10000,100000,1000000] [--candidates 50]
+      python bench_storage.py --memory [--records 100000]   # 对比内存占用
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List
+
+from fingerprint import title_fingerprint, url_fingerprint
+from storage import NewsStorage
+
+
+def make_history(count: int) -> List[Dict]:
+    """生成指定数量的历史推送记录"""
+    now = int(time.time())
+    return [
+        {
+            "title": f"Historic logistics event #{i}",
+            "url": f"https://example.com/news/{i}",
+            "sent_ts": now - i % (30 * 86400)
+        }
+        for i in range(count)
+    ]
+
+
+def make_candidates(history_size: int, count: int) -> List[Dict]:
+    """生成候选新闻：一半已推送（分布在历史中），一半为新增"""
+    candidates = []
+    for i in range(count):
+        if i % 2 == 0:
+            idx = (i * 7919) % history_size
+            candidates.append({
+                "title": f"Historic logistics event #{idx}",
+                "url": f"https://example.com/news/{idx}",
+            })
+        else:
+            candidates.append({
+                "title": f"Fresh logistics event #{i}",
+                "url": f"https://example.com/fresh/{i}",
+            })
+    return candidates
+
+
+def bench_size(size: int, candidates: int, repeat: int) -> Dict:
+    """对单个历史规模执行基准测试"""
+    with tempfile.TemporaryDirectory() as tmp:
+        storage = NewsStorage(os.path.join(tmp, "sent_news.json"))
+        history = make_history(size)
+
+        start = time.perf_counter()
+        for record in history:
+            storage._insert(
+                title_fingerprint(record["title"]),
+                url_fingerprint(record["url"]),
+                record["sent_ts"]
+            )
+        index_ms = (time.perf_counter() - start) * 1000
+
+        batch = make_candidates(size, candidates)
+        timings = []
+        new_count = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            new_count = len(storage.get_new_news(batch))
+            timings.append(time.perf_counter() - start)
+
+    timings.sort()
+    return {
+        "size": size,
+        "index_ms": index_ms,
+        "median_us": timings[len(timings) // 2] * 1e6,
+        "new": new_count,
+    }
+
+
+def bench_memory(count: int):
+    """用 tracemalloc 对比旧版 dict-of-strings 布局与指纹数组布局的内存占用"""
+    history = make_history(count)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    # 旧版布局：每条记录一个 dict（标题、URL、ISO 时间字符串）+ 字符串哈希索引
+    # "".join 复制字符串，使其计入本次统计
+    legacy = [
+        {
+            "title": "".join(record["title"]),
+            "url": "".join(record["url"]),
+            "sent_at": datetime.fromtimestamp(record["sent_ts"]).isoformat()
+        }
+        for record in history
+    ]
+    legacy_titles = {news["title"] for news in legacy}
+    legacy_urls = {news["url"] for news in legacy}
+    legacy_bytes = sum(s.size_diff for s in tracemalloc.take_snapshot().compare_to(before, "filename"))
+    del legacy, legacy_titles, legacy_urls
+    tracemalloc.stop()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        storage = NewsStorage(os.path.join(tmp, "sent_news.json"))
+        for record in history:
+            storage._insert(
+                title_fingerprint(record["title"]),
+                url_fingerprint(record["url"]),
+                record["sent_ts"]
+            )
+        compact_bytes = sum(s.size_diff for s in tracemalloc.take_snapshot().compare_to(before, "filename"))
+        tracemalloc.stop()
+
+    print("=" * 60)
+    print(f"内存占用对比（{count} 条记录，tracemalloc）")
+    print("=" * 60)
+    print(f"旧版 dict-of-strings : {legacy_bytes / 1024 / 1024:8.1f} MiB "
+          f"({legacy_bytes / count:6.1f} B/条)")
+    print(f"指纹数组 + 指纹索引  : {compact_bytes / 1024 / 1024:8.1f} MiB "
+          f"({compact_bytes / count:6.1f} B/条)")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NewsStorage 去重基准测试")
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000",
+                        help="历史记录规模，逗号分隔")
+    parser.add_argument("--candidates", type=int, default=50, help="每轮候选新闻数量")
+    parser.add_argument("--repeat", type=int, default=200, help="每个规模重复次数")
+    parser.add_argument("--memory", action="store_true", help="对比内存占用而不是去重耗时")
+    parser.add_argument("--records", type=int, default=100000, help="内存对比使用的记录数")
+    args = parser.parse_args()
+
+    if args.memory:
+        bench_memory(args.records)
+        return
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    print("=" * 60)
+    print("NewsStorage.get_new_news 基准测试")
+    print(f"候选数量: {args.candidates}，重复次数: {args.repeat}")
+    print("=" * 60)
+    print(f"{'历史记录':>10} | {'建索引(ms)':>10} | {'去重中位数(us)':>14} | {'新增':>4}")
+    print("-" * 60)
+
+    for size in sizes:
+        result = bench_size(size, args.candidates, args.repeat)
+        print(f"{result['size']:>10} | {result['index_ms']:>10.1f} | "
+              f"{result['median_us']:>14.1f} | {result['new']:>4}")
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
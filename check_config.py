@@ -162,20 +162,44 @@ def check_storage_config(config: dict) -> bool:
     print("="*60)
 
     storage = config.get("storage", {})
+    backend = storage.get("backend", "json")
     sent_news_file = storage.get("sent_news_file", "sent_news.json")
 
-    print(f"  ✅ 新闻记录文件: {sent_news_file}")
-
-    if os.path.exists(sent_news_file):
-        try:
-            with open(sent_news_file, "r") as f:
-                data = json.load(f)
-                news_count = len(data.get("news", []))
-            print(f"  ✅ 文件存在，已记录 {news_count} 条新闻")
-        except:
-            print(f"  ⚠️ 文件存在但格式可能有误")
+    print(f"  ✅ 存储后端: {backend}")
+
+    if backend == "sqlite":
+        sqlite_file = storage.get("sqlite_file", "sent_news.db")
+        print(f"  ✅ SQLite 数据库: {sqlite_file}")
+        if os.path.exists(sqlite_file):
+            try:
+                import sqlite3
+                conn = sqlite3.connect(sqlite_file)
+                news_count = conn.execute("SELECT COUNT(*) FROM sent_news").fetchone()[0]
+                conn.close()
+                print(f"  ✅ 数据库存在，已记录 {news_count} 条新闻")
+            except Exception:
+                print(f"  ⚠️ 数据库存在但无法读取")
+        else:
+            print("  ℹ️ 数据库不存在（首次运行时会自动创建并导入 JSON 记录）")
     else:
-        print("  ℹ️ 文件不存在（首次运行时会自动创建）")
+        print(f"  ✅ 新闻记录文件: {sent_news_file}")
+
+        if os.path.exists(sent_news_file):
+            try:
+                with open(sent_news_file, "r") as f:
+                    data = json.load(f)
+                    if "buckets" in data:
+                        news_count = sum(
+                            len(bucket["sent_ts"]) if isinstance(bucket, dict) else len(bucket)
+                            for bucket in data["buckets"].values()
+                        )
+                    else:
+                        news_count = len(data.get("news", []))
+                print(f"  ✅ 文件存在，已记录 {news_count} 条新闻")
+            except:
+                print(f"  ⚠️ 文件存在但格式可能有误")
+        else:
+            print("  ℹ️ 文件不存在（首次运行时会自动创建）")
 
     max_days = storage.get("max_history_days", 30)
     print(f"  ✅ 历史记录保留: {max_days} 天")
@@ -0,0 +1,284 @@
+"""
+文本分类模块 - 把 taxonomy.json 中的国家/枢纽城市/事件类型/灾害类型多语言词表编译为一个正则，单次扫描一条结果即得到结构化标签，
+供天气/新闻报告和飞书路由共用；编译结果按词表文件内容的哈希缓存在磁盘上
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional
+
+from file_lock import file_lock
+
+# 默认词表文件（与本模块同目录），环境变量 TAXONOMY_FILE 优先
+TAXONOMY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxonomy.json")
+
+# 编译结果的格式版本，编译方式改变时加一，使旧缓存失效
+COMPILED_FORMAT = 2
+
+# 缓存的关键词组合数上限
+MAX_COMBINATIONS = 4096
+
+# 中日韩文字之间没有空格，这类关键词不加单词边界
+_CJK = re.compile(r"[\u3040-\u30ff\u3400-\u9fff\uac00-\ud7af]")
+
+# DocumentTags 各字段的序号
+COUNTRY, HUB, EVENT, HAZARD = range(4)
+
+
+class DocumentTags(NamedTuple):
+    """一条结果的标签"""
+    countries: FrozenSet[str]
+    hubs: FrozenSet[str]
+    events: FrozenSet[str]
+    hazards: FrozenSet[str]
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    """
+    把关键词合并为前缀树形式的正则（germany|german -> german(?:y)?），共享前缀只比较一次；
+    关键词中的空格匹配任意空白
+
+    Returns:
+        正则片段，关键词为空时返回空字符串
+    """
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for char in term:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: Dict) -> str:
+        branches = [(r"\s+" if char == " " else re.escape(char)) + build(child)
+                    for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def _synonyms(entry: Dict) -> List[str]:
+    """一个词条各语言的同义词（小写、空白归一）"""
+    return [" ".join(term.lower().split()) for terms in entry.get("terms", {}).values() for term in terms
+            if term.strip()]
+
+
+def compile_taxonomy(taxonomy: Dict) -> Dict:
+    """
+    编译词表：展开各语言同义词并生成正则源码（可序列化为 JSON 缓存）
+
+    Args:
+        taxonomy: taxonomy.json 的内容
+
+    Returns:
+        编译结果，交给 Classifier 使用
+    """
+    terms: Dict[str, List] = {}
+
+    def add(synonyms: Iterable[str], field: int, tag: str):
+        for term in synonyms:
+            if [field, tag] not in terms.setdefault(term, []):
+                terms[term].append([field, tag])
+
+    for country, entry in taxonomy.get("countries", {}).items():
+        add(_synonyms(entry), COUNTRY, country)
+    for hub, entry in taxonomy.get("hubs", {}).items():
+        add(_synonyms(entry), COUNTRY, entry["country"])
+        add(_synonyms(entry), HUB, hub)
+    for event, entry in taxonomy.get("news_events", {}).items():
+        add(_synonyms(entry), EVENT, event)
+    for hazard, entry in taxonomy.get("hazards", {}).items():
+        add(_synonyms(entry), HAZARD, hazard)
+
+    # 拉丁文字关键词要求整词匹配（port 不匹配 report）；中日韩关键词不加边界、用前瞻匹配以允许重叠
+    # （大风暴 -> 大风、风暴），只在文本含非 ASCII 字符时才扫描
+    latin = [term for term in terms if not _CJK.search(term)]
+    cjk = [term for term in terms if _CJK.search(term)]
+    return {
+        "format": COMPILED_FORMAT,
+        "version": taxonomy.get("version"),
+        "countries": {k: v.get("label", k) for k, v in taxonomy.get("countries", {}).items()},
+        "hubs": {k: v["country"] for k, v in taxonomy.get("hubs", {}).items()},
+        "news_events": {k: v.get("label", k) for k, v in taxonomy.get("news_events", {}).items()},
+        "hazards": {k: v.get("label", k) for k, v in taxonomy.get("hazards", {}).items()},
+        "terms": terms,
+        "pattern": rf"\b({_trie_pattern(latin)})\b" if latin else None,
+        "cjk_pattern": rf"(?=({_trie_pattern(cjk)}))" if cjk else None,
+    }
+
+
+class Classifier:
+    """编译好的词表，classify() 对每条文本只扫描一次（含中日韩文字时再扫描一次中日韩关键词）"""
+
+    def __init__(self, compiled: Dict):
+        """
+        Args:
+            compiled: compile_taxonomy() 的结果（或从缓存读取的同样内容）
+        """
+        self.version = compiled.get("version")
+        self.countries: Dict[str, str] = compiled["countries"]
+        self.hubs: Dict[str, str] = compiled["hubs"]
+        self.news_events: Dict[str, str] = compiled["news_events"]
+        # 灾害类型 -> 中文名，顺序即同时命中多个类型时的优先级
+        self.hazards: Dict[str, str] = compiled["hazards"]
+        # 关键词 -> [(字段序号, 标签)]，字段序号对应 DocumentTags
+        self.terms = {term: [tuple(tag) for tag in tags] for term, tags in compiled["terms"].items()}
+        self.regex = re.compile(compiled["pattern"]) if compiled.get("pattern") else None
+        self.cjk_regex = re.compile(compiled["cjk_pattern"]) if compiled.get("cjk_pattern") else None
+        self._combinations: Dict[FrozenSet[str], DocumentTags] = {}
+
+    def classify_text(self, text: str) -> DocumentTags:
+        """识别一段文本的国家、枢纽城市、新闻事件类型和天气灾害类型"""
+        text = text.lower()
+        matched = frozenset(self.regex.findall(text)) if self.regex else frozenset()
+        if self.cjk_regex and not text.isascii():
+            matched |= frozenset(self.cjk_regex.findall(text))
+
+        # 命中的关键词组合种类有限，同一组合的标签只计算一次
+        tags = self._combinations.get(matched)
+        if tags is None:
+            found = (set(), set(), set(), set())
+            for term in matched:
+                # 多词关键词在原文中可能以换行或多个空格分隔
+                for field, tag in self.terms.get(" ".join(term.split()), ()):
+                    found[field].add(tag)
+            tags = DocumentTags(*(frozenset(tags) for tags in found))
+            if len(self._combinations) < MAX_COMBINATIONS:
+                self._combinations[matched] = tags
+        return tags
+
+    def classify(self, item: Dict) -> DocumentTags:
+        """识别一条搜索结果或新闻（title + content）"""
+        return self.classify_text(f"{item.get('title', '')} {item.get('content', '')}")
+
+    def country_labels(self, countries: Iterable[str]) -> List[str]:
+        """国家的中文名（排序后），未知国家保留原名"""
+        return sorted(self.countries.get(c, c) for c in countries)
+
+    def hazard_labels(self, hazards: Iterable[str]) -> List[str]:
+        """灾害类型的中文名（按词表顺序），未知类型（如 other）显示为“其他”"""
+        hazards = set(hazards)
+        labels = [label for hazard, label in self.hazards.items() if hazard in hazards]
+        if hazards - set(self.hazards):
+            labels.append("其他")
+        return labels
+
+    def primary_hazard(self, text: str) -> str:
+        """文本命中的灾害类型中词表顺序最靠前的一个，未命中时返回 other"""
+        found = self.classify_text(text).hazards
+        return next((hazard for hazard in self.hazards if hazard in found), "other")
+
+
+def _load_cache(cache_file: Optional[str], digest: str) -> Optional[Dict]:
+    """读取与词表哈希一致的编译结果，不存在、损坏或已过期时返回 None"""
+    if not cache_file or not os.path.exists(cache_file):
+        return None
+    try:
+        with open(cache_file, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except Exception as e:
+        print(f"[分类器] 读取编译缓存失败: {e}")
+        return None
+    if cached.get("hash") != digest or cached.get("compiled", {}).get("format") != COMPILED_FORMAT:
+        return None
+    return cached["compiled"]
+
+
+def _save_cache(cache_file: str, digest: str, compiled: Dict) -> bool:
+    """原子写入编译缓存"""
+    directory = os.path.dirname(os.path.abspath(cache_file))
+    fd, tmp_path = tempfile.mkstemp(prefix=".taxonomy_cache.", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"hash": digest, "compiled": compiled}, f, ensure_ascii=False)
+        os.replace(tmp_path, cache_file)
+        return True
+    except Exception as e:
+        print(f"[分类器] 保存编译缓存失败: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+def load_classifier(taxonomy_file: str = TAXONOMY_FILE,
+                    cache_file: Optional[str] = "taxonomy_cache.json") -> Classifier:
+    """
+    加载词表：cache_file 中有同一内容哈希的编译结果时直接使用，否则重新编译并写入缓存
+
+    缓存省去的是展开同义词和构造前缀树正则的步骤；正则对象无法跨进程保存（pickle 也只是在加载时重新编译），
+    两个正则的 re.compile 每次启动仍会执行
+
+    Args:
+        taxonomy_file: 词表文件
+        cache_file: 编译缓存文件，为空时不缓存
+
+    Returns:
+        分类器；词表读取失败或格式错误时返回不识别任何标签的空分类器（会输出日志）
+    """
+    try:
+        with open(taxonomy_file, "rb") as f:
+            raw = f.read()
+    except OSError as e:
+        print(f"[分类器] ❌ 读取词表失败，国家/事件识别不可用: {e}")
+        return Classifier(compile_taxonomy({}))
+
+    digest = hashlib.sha256(raw).hexdigest()
+    compiled = _load_cache(cache_file, digest)
+    if compiled is not None:
+        return Classifier(compiled)
+
+    try:
+        compiled = compile_taxonomy(json.loads(raw))
+    except (ValueError, KeyError, AttributeError, TypeError) as e:
+        print(f"[分类器] ❌ 词表格式错误，国家/事件识别不可用: {e}")
+        return Classifier(compile_taxonomy({}))
+    if cache_file:
+        with file_lock(cache_file + ".lock"):
+            _save_cache(cache_file, digest, compiled)
+    print(f"[分类器] 已编译词表 v{compiled['version']}（{len(compiled['terms'])} 个关键词）")
+    return Classifier(compiled)
+
+
+_classifier: Optional[Classifier] = None
+_classifier_lock = threading.Lock()
+_settings = {"taxonomy_file": None, "cache_file": "taxonomy_cache.json"}
+
+
+def configure_taxonomy(classifier_config: Dict):
+    """
+    按 config.json 的 classifier 配置指定词表和编译缓存文件（下次识别时重新加载）
+
+    Args:
+        classifier_config: taxonomy_file（默认本模块同目录的 taxonomy.json，环境变量 TAXONOMY_FILE 优先）、
+                           cache_file（默认 taxonomy_cache.json，为 null 时不缓存）
+    """
+    global _classifier
+    with _classifier_lock:
+        _settings["taxonomy_file"] = classifier_config.get("taxonomy_file")
+        _settings["cache_file"] = classifier_config.get("cache_file", "taxonomy_cache.json")
+        _classifier = None
+
+
+def get_classifier() -> Classifier:
+    """当前使用的分类器（首次调用时加载）"""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            taxonomy_file = os.getenv("TAXONOMY_FILE") or _settings["taxonomy_file"] or TAXONOMY_FILE
+            _classifier = load_classifier(taxonomy_file, _settings["cache_file"])
+        return _classifier
+
+
+def classify(item: Dict) -> DocumentTags:
+    """用当前词表识别一条搜索结果或新闻"""
+    return get_classifier().classify(item)
+
+
+def classify_text(text: str) -> DocumentTags:
+    """用当前词表识别一段文本"""
+    return get_classifier().classify_text(text)
@@ -12,7 +12,7 @@ from datetime import datetime
 from weather_monitor import format_weather_report, get_weather_search_config
 from news_monitor import format_news_report, extract_news_items, get_news_search_config
 from feishu_sender import FeishuSender
-from storage import NewsStorage
+from storage import create_storage
 
 
 def load_config():
@@ -94,7 +94,7 @@ def demo_news_check(send_to_feishu: bool = False):
     print_section("演示 2: 物流新闻检查（增量推送）")
 
     config = load_config()
-    storage = NewsStorage(config["storage"]["sent_news_file"])
+    storage = create_storage(config["storage"])
 
     print("📍 监控配置:")
     print(f"  - 国家: {', '.join(config['monitoring']['countries'])}")
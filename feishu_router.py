@@ -0,0 +1,260 @@
+"""
+飞书路由模块 - 按国家和事件类型把同一次搜索的结果分发到多个飞书去向（webhook 或群聊），并发推送
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from classifier import classify
+from feishu_sender import FeishuSender
+from fingerprint import url_fingerprint
+from outbox import Outbox
+from weather_feeds import WeatherAlert
+
+# 条目标签：(国家集合, 事件类型集合)
+Tags = Tuple[Set[str], Set[str]]
+
+
+def tag_news(item: Dict) -> Tags:
+    """新闻条目的国家和事件类型"""
+    tags = classify(item)
+    return set(tags.countries), set(tags.events)
+
+
+def tag_weather_result(result: Dict) -> Tags:
+    """天气搜索结果的国家和灾害类型（与官方预警共用 taxonomy.json 中 hazards 的键）"""
+    tags = classify(result)
+    return set(tags.countries), set(tags.hazards)
+
+
+def tag_weather_alert(alert: WeatherAlert) -> Tags:
+    """官方结构化预警的国家和灾害类型"""
+    return {alert["country"]}, {alert["hazard"]}
+
+
+class Destination:
+    """一个推送去向及其过滤条件"""
+
+    def __init__(self, name: str, sender: FeishuSender, countries: Iterable[str] = None,
+                 event_types: Iterable[str] = None, reports: Iterable[str] = None):
+        """
+        Args:
+            name: 去向名称（用于日志和汇总）
+            sender: 该去向的推送器
+            countries: 只接收涉及这些国家的条目，为空时不限
+            event_types: 只接收这些事件/灾害类型的条目（如 strike、port、snow_ice），为空时不限
+            reports: 接收的报告种类（weather、news），为空时全部接收
+        """
+        self.name = name
+        self.sender = sender
+        self.countries = set(countries or [])
+        self.event_types = set(event_types or [])
+        self.reports = set(reports or [])
+
+    def wants(self, kind: str) -> bool:
+        return not self.reports or kind in self.reports
+
+    def matches(self, tags: Tags) -> bool:
+        countries, events = tags
+        if self.countries and not self.countries & countries:
+            return False
+        if self.event_types and not self.event_types & events:
+            return False
+        return True
+
+
+class FeishuRouter:
+    """按去向过滤条目、分别生成报告，并发推送到所有去向"""
+
+    def __init__(self, feishu_config: Dict, max_concurrency: int = 4):
+        """
+        初始化
+
+        Args:
+            feishu_config: config.json 的 feishu 配置；destinations 列表中的每项可覆盖 webhook_url/chat_id 等，
+                           其余配置（app_id、app_secret、限速等）沿用外层。未配置 destinations 时只有外层一个去向；
+                           outbox 为发件箱配置（enabled、file、backoff_base、backoff_max、max_age_hours、
+                           weather_max_age_hours）
+            max_concurrency: 同时推送的去向数
+        """
+        base = {k: v for k, v in feishu_config.items() if k not in ("destinations", "outbox", "comment")}
+        destinations = feishu_config.get("destinations") or [{"name": "默认"}]
+        self.destinations = []
+        for idx, dest in enumerate(destinations, 1):
+            sender_config = dict(base, **{k: v for k, v in dest.items()
+                                         if k not in ("name", "countries", "event_types", "reports")})
+            # 单独指定了 webhook_url 或 chat_id 的去向只用该方式推送
+            if "chat_id" in dest and "webhook_url" not in dest:
+                sender_config["webhook_url"] = None
+            self.destinations.append(Destination(
+                dest.get("name", f"去向{idx}"), FeishuSender(sender_config),
+                dest.get("countries"), dest.get("event_types"), dest.get("reports")
+            ))
+        self.max_concurrency = max_concurrency
+        outbox_config = feishu_config.get("outbox", {})
+        self.outbox = Outbox(
+            outbox_config.get("file", "outbox.json"),
+            backoff_base=outbox_config.get("backoff_base", 60),
+            backoff_max=outbox_config.get("backoff_max", 3600),
+            max_age_hours=outbox_config.get("max_age_hours", 72),
+        ) if outbox_config.get("enabled", True) else None
+        # 每日天气报告过时很快，未送达时只在较短时间内重发
+        self.weather_max_age_hours = outbox_config.get("weather_max_age_hours", 6)
+        self.results: List[Tuple[str, str, bool, float, int]] = []
+        self._lock = threading.Lock()
+
+    def _destination(self, name: str) -> Optional[Destination]:
+        return next((dest for dest in self.destinations if dest.name == name), None)
+
+    def _deliver(self, dest: Destination, title: str, report: str, items: List,
+                 entry: Optional[Dict] = None, storage=None) -> bool:
+        """
+        推送一份报告并记录耗时；有发件箱条目时以其 id 为幂等键（机器人方式），失败时安排重试；
+        没有发件箱时送达后直接把报告中的条目 items 记录到 storage（按去向记录，不等其他去向）
+
+        送达后立即把条目标记为已送达再记录其中的新闻：新闻记录随存储事务提交，提交前中断时
+        下次 drain 只补记、不重发（webhook 没有幂等键也不会重复推送）；条目在确认新闻已写入存储后删除
+        """
+        start = time.perf_counter()
+        ok = dest.sender.send_message(report, title=title, idempotency_key=entry["id"] if entry else None)
+        elapsed = time.perf_counter() - start
+        if entry:
+            if not ok:
+                self.outbox.fail(entry["id"])
+            elif storage is not None and entry["news"]:
+                self.outbox.mark_delivered(entry["id"])
+                storage.add_sent_news(entry["news"])
+            else:
+                self.outbox.remove(entry["id"])
+        elif ok and storage is not None and items:
+            storage.add_sent_news(items)
+        with self._lock:
+            self.results.append((title, dest.name, ok, elapsed, len(items)))
+        print(f"[飞书路由] {'✅' if ok else '❌'} {dest.name}: {title} {len(items)} 条（{elapsed:.2f} 秒）")
+        return ok
+
+    def _run_jobs(self, jobs: List[Tuple], func: Callable[..., bool]) -> List[bool]:
+        """有界并发执行推送"""
+        if len(jobs) <= 1:
+            return [func(*job) for job in jobs]
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(jobs))),
+                                thread_name_prefix="feishu-route") as pool:
+            return list(pool.map(lambda job: func(*job), jobs))
+
+    def _settle(self, entry: Dict, storage):
+        """
+        处理已送达的发件箱条目：不重发；新闻已在存储中时删除条目，否则补记新闻，
+        条目留到下次 drain 确认记录已写入后再删除
+        """
+        if storage is None:
+            return
+        missing = storage.get_new_news(entry["news"])
+        if missing:
+            print(f"[发件箱] 补记已送达报告中的 {len(missing)} 条新闻: {entry['destination']} · {entry['title']}")
+            storage.add_sent_news(missing)
+        else:
+            self.outbox.remove(entry["id"])
+
+    def drain(self, storage=None) -> bool:
+        """
+        重发发件箱中到了重试时间的报告（每次运行开始时或常驻进程定时调用），已送达的报告只补记新闻
+
+        Args:
+            storage: 新闻存储，报告送达后把其中的新闻记录为已推送
+
+        Returns:
+            到期的报告是否全部送达
+        """
+        if not self.outbox:
+            return True
+        entries = self.outbox.due()
+        for entry in entries:
+            if entry.get("delivered"):
+                self._settle(entry, storage)
+        entries = [entry for entry in entries if not entry.get("delivered")]
+        if not entries:
+            return True
+
+        print(f"[发件箱] 重发 {len(entries)} 份未送达的报告")
+        jobs = []
+        for entry in entries:
+            dest = self._destination(entry["destination"])
+            if dest is None:
+                print(f"[发件箱] ⚠️ 去向 {entry['destination']} 已不在配置中，保留报告: {entry['title']}")
+                self.outbox.fail(entry["id"])
+                continue
+            jobs.append((dest, entry["title"], entry["content"], entry["news"], entry, storage))
+
+        delivered = self._run_jobs(jobs, self._deliver)
+        return len(jobs) == len(entries) and all(delivered)
+
+    def exclude_pending(self, news: List[Dict]) -> List[Dict]:
+        """去掉已经在发件箱中等待重发的新闻，避免重复推送"""
+        if not self.outbox:
+            return news
+        pending = self.outbox.pending_urls()
+        kept = [item for item in news if url_fingerprint(item.get("url", "")) not in pending]
+        if len(kept) < len(news):
+            print(f"[发件箱] {len(news) - len(kept)} 条新闻已在发件箱中等待重发，本次不再推送")
+        return kept
+
+    def dispatch(self, kind: str, items: List, render: Callable[[List], Optional[str]], title: str,
+                 tag: Callable[[Dict], Tags], storage=None) -> bool:
+        """
+        按去向过滤条目并生成报告，先写入发件箱再并发推送
+
+        Args:
+            kind: 报告种类（weather 或 news），对应去向的 reports 配置
+            items: 本次搜索得到的全部条目
+            render: 由条目子集生成报告的函数，返回 None 表示该去向无需推送
+            title: 卡片标题
+            tag: 识别条目国家和事件类型的函数
+            storage: 新闻存储（仅新闻报告）。每份报告送达后立即记录其中的新闻，没有去向需要的新闻在最后记录；
+                     未送达的留在发件箱，送达时再记录（未启用发件箱时不重发，同样只记录送达去向的新闻）
+
+        Returns:
+            所有需要推送的去向是否都推送成功
+        """
+        tags = [tag(item) for item in items]
+        jobs = []
+        for dest in self.destinations:
+            if not dest.wants(kind):
+                continue
+            subset = [item for item, item_tags in zip(items, tags) if dest.matches(item_tags)]
+            report = render(subset)
+            if report:
+                entry = self.outbox.add(
+                    dest.name, title, report, subset if storage is not None else None,
+                    max_age_hours=self.weather_max_age_hours if kind == "weather" else None
+                ) if self.outbox else None
+                jobs.append((dest, title, report, subset, entry, storage))
+            else:
+                print(f"[飞书路由] ⏭️ {dest.name}: 没有需要推送的{title}")
+
+        ok = all(self._run_jobs(jobs, self._deliver))
+
+        if storage is not None and items:
+            # 送达的新闻已在 _deliver 中按去向记录，这里只记录没有去向需要的新闻
+            pending = self.outbox.pending_urls() if self.outbox else set()
+            routed = {id(item) for job in jobs for item in job[3]}
+            unrouted = [item for item in items if id(item) not in routed
+                        and url_fingerprint(item.get("url", "")) not in pending]
+            if unrouted:
+                storage.add_sent_news(unrouted)
+        return ok
+
+    def refresh_tokens(self) -> bool:
+        """提前刷新各机器人去向的 tenant_access_token（供常驻进程定时调用）"""
+        return all([dest.sender.refresh_token() for dest in self.destinations])
+
+    def summary(self) -> List[str]:
+        """每个去向的推送结果和耗时"""
+        with self._lock:
+            results = list(self.results)
+        lines = [f"{name} · {title}: {'✅ 成功' if ok else '❌ 失败'}（{count} 条，{elapsed:.2f} 秒）"
+                 for title, name, ok, elapsed, count in results]
+        for dest in self.destinations:
+            if dest.sender.queue and dest.sender.queue.waits:
+                lines.append(f"{dest.name} 发送队列: {dest.sender.queue.summary()}")
+        return lines
@@ -3,7 +3,339 @@
 """
 import requests
 import json
-from typing import Dict, Optional
+import os
+import random
+import threading
+import time
+from typing import Callable, Dict, List, Mapping, Optional, Tuple
+
+from feishu_token import TOKEN_EXPIRED_CODES, TokenCache
+from rate_limit import TokenBucket
+
+FEISHU_API_BASE = "https://open.feishu.cn/open-apis"
+
+# 飞书频率限制错误码：自定义机器人 9499/11232，开放平台接口 99991400
+RATE_LIMIT_CODES = {9499, 11232, 99991400}
+
+# 卡片消息大小上限（按实际发送的请求体计算）：自定义机器人请求体 20 KB，机器人消息内容 30 KB
+WEBHOOK_MAX_BYTES = 20 * 1024
+BOT_MAX_BYTES = 30 * 1024
+
+
+def build_card(content: str, title: str) -> Dict:
+    """构建 Markdown 卡片"""
+    return {
+        "header": {
+            "title": {
+                "tag": "plain_text",
+                "content": title
+            }
+        },
+        "elements": [
+            {
+                "tag": "markdown",
+                "content": content
+            }
+        ]
+    }
+
+
+def webhook_payload(content: str, title: str) -> Dict:
+    """Webhook 消息体"""
+    return {"msg_type": "interactive", "card": build_card(content, title)}
+
+
+def bot_payload(chat_id: str, content: str, title: str, message_uuid: Optional[str] = None) -> Dict:
+    """机器人消息体（im/v1/messages，content 为序列化后的卡片；uuid 为幂等键，飞书对相同 uuid 只发送一次）"""
+    payload = {
+        "receive_id": chat_id,
+        "msg_type": "interactive",
+        "content": json.dumps(build_card(content, title))
+    }
+    if message_uuid:
+        payload["uuid"] = message_uuid
+    return payload
+
+
+def rate_limit_delay(status_code: int, headers: Mapping[str, str], result: Optional[Dict]) -> Optional[float]:
+    """
+    判断响应是否为频率限制（同步和异步推送共用）
+
+    Args:
+        status_code: HTTP 状态码
+        headers: 响应头
+        result: 飞书返回的 JSON，不是合法 JSON 时为 None
+
+    Returns:
+        建议等待的秒数（取 x-ogw-ratelimit-reset 或 Retry-After，没有时为 0）；不是频率限制时返回 None
+    """
+    if status_code != 429 and (result or {}).get("code") not in RATE_LIMIT_CODES:
+        return None
+    reset = headers.get("x-ogw-ratelimit-reset") or headers.get("Retry-After")
+    try:
+        return max(0.0, float(reset))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def merge_messages(messages: List[Tuple[str, str]]) -> Tuple[str, str]:
+    """
+    把同一去向排队中的多条消息合并为一张卡片
+
+    Args:
+        messages: (内容, 标题) 列表
+
+    Returns:
+        (合并后的内容, 合并后的标题)
+    """
+    if len(messages) == 1:
+        return messages[0]
+    titles = list(dict.fromkeys(title for _, title in messages))
+    title = titles[0] if len(titles) == 1 else f"{titles[0]} 等 {len(messages)} 条消息"
+    content = "\n\n---\n\n".join(f"**{msg_title}**\n\n{msg_content}" for msg_content, msg_title in messages)
+    return content, title
+
+
+def _hard_split(text: str, fits: Callable[[str], bool]) -> List[str]:
+    """单行仍然超限时按字符切分（二分查找每段能容纳的最大长度）"""
+    pieces = []
+    while text:
+        low, high = 1, len(text)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if fits(text[:middle]):
+                low = middle
+            else:
+                high = middle - 1
+        pieces.append(text[:low])
+        text = text[low:]
+    return pieces
+
+
+def split_report(content: str, title: str, fits: Callable[[str, str], bool]) -> List[Tuple[str, str]]:
+    """
+    按卡片大小拆分报告：在段落（章节标题、条目）边界切分，续页重复所在章节的标题，不丢弃任何内容
+
+    Args:
+        content: Markdown 报告
+        title: 卡片标题
+        fits: 判断 (内容, 标题) 组成的卡片是否在大小限制内
+
+    Returns:
+        [(内容, 标题)]，拆分为多张时标题带编号，如 "欧洲物流突发事件预警（2/3）"
+    """
+    if fits(content, title):
+        return [(content, title)]
+
+    # 按最长的编号标题估算，保证加上编号后仍不超限
+    numbered_title = f"{title}（99/99）"
+
+    def fits_block(text: str) -> bool:
+        return fits(text, numbered_title)
+
+    blocks = []
+    for block in content.split("\n\n"):
+        if not block.strip():
+            continue
+        if fits_block(block):
+            blocks.append(block)
+            continue
+        # 单个段落超限：按行拆分，单行仍超限时按字符拆分
+        for line in block.split("\n"):
+            blocks.extend([line] if fits_block(line) else _hard_split(line, fits_block))
+
+    parts: List[List[str]] = []
+    current: List[str] = []
+    heading = None
+    for block in blocks:
+        if current and fits_block("\n\n".join(current + [block])):
+            current.append(block)
+        else:
+            if current:
+                parts.append(current)
+            current = [block]
+            # 续页以所在章节标题开头（章节标题本身或续页标题放不下时除外）
+            if heading and not block.startswith("#") and fits_block(f"{heading}（续）\n\n{block}"):
+                current.insert(0, f"{heading}（续）")
+        if block.startswith("#"):
+            heading = block.split("\n", 1)[0]
+    if current:
+        parts.append(current)
+
+    total = len(parts)
+    return [("\n\n".join(part) + "\n\n", f"{title}（{idx}/{total}）") for idx, part in enumerate(parts, 1)]
+
+
+class _Message:
+    """发送队列中的一条消息"""
+
+    def __init__(self, sender: "FeishuSender", queue: "OutboundQueue", content: str, title: str,
+                 message_uuid: Optional[str] = None):
+        self.sender = sender
+        self.queue = queue
+        self.content = content
+        self.title = title
+        self.uuid = message_uuid
+        self.enqueued_at = time.monotonic()
+        self.wait = 0.0
+        self.ok = False
+        self.done = threading.Event()
+
+
+class _Lane:
+    """一个去向的令牌桶和待发消息，由后台线程依次发送"""
+
+    def __init__(self, bucket: TokenBucket, coalesce_window: float, max_retries: int):
+        self.bucket = bucket
+        self.coalesce_window = coalesce_window
+        self.max_retries = max_retries
+        self.pending: List[_Message] = []
+        self.condition = threading.Condition()
+        threading.Thread(target=self._run, name="feishu-outbound", daemon=True).start()
+
+    def put(self, messages: List[_Message]):
+        """一次放入多条消息（同一报告拆分出的多张卡片连续排列，按顺序发送）"""
+        with self.condition:
+            self.pending.extend(messages)
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+            if self.coalesce_window > 0:
+                # 等待合并窗口，收集同去向的后续消息
+                time.sleep(self.coalesce_window)
+            with self.condition:
+                batch, self.pending = self.pending, []
+            for group in self._coalesce(batch):
+                try:
+                    self._deliver(group)
+                except Exception as e:
+                    print(f"[飞书推送] ❌ 发送队列异常: {e}")
+                finally:
+                    for message in group:
+                        message.done.set()
+
+    @staticmethod
+    def _coalesce(batch: List[_Message]) -> List[List[_Message]]:
+        """按顺序把相邻消息合并成组，合并后的卡片不超过大小限制（带幂等键的消息单独发送，保证重发时幂等键不变）"""
+        groups: List[List[_Message]] = []
+        for message in batch:
+            if groups and not message.uuid and not groups[-1][-1].uuid:
+                candidate = groups[-1] + [message]
+                if message.sender.fits(*merge_messages([(m.content, m.title) for m in candidate])):
+                    groups[-1] = candidate
+                    continue
+            groups.append([message])
+        return groups
+
+    def _deliver(self, batch: List[_Message]):
+        """合并后发送，被限流时按飞书返回的重置时间（没有时指数退避）重试"""
+        content, title = merge_messages([(m.content, m.title) for m in batch])
+        sender = batch[0].sender
+        for attempt in range(self.max_retries + 1):
+            self.bucket.acquire()
+            if attempt == 0:
+                started = time.monotonic()
+                for message in batch:
+                    message.wait = started - message.enqueued_at
+            ok, retry_after = sender.send_once(content, title, batch[0].uuid if len(batch) == 1 else None)
+            if ok or retry_after is None or attempt >= self.max_retries:
+                break
+            delay = retry_after or min(30.0, 2 ** attempt) + random.uniform(0, 0.5)
+            for queue in {id(m.queue): m.queue for m in batch}.values():
+                queue.count("retries")
+            print(f"[飞书推送] ⚠️ 被限流，{delay:.1f} 秒后重试 ({attempt + 1}/{self.max_retries})")
+            time.sleep(delay)
+
+        for message in batch:
+            message.ok = ok
+        if len(batch) > 1:
+            print(f"[飞书推送] 已合并 {len(batch)} 条消息为一张卡片: {title}")
+
+
+# 同一进程内发往同一去向、限速设置相同的消息共用一个令牌桶和发送线程：(去向, 每秒发送数, 突发数, 合并窗口, 重试次数) -> 通道
+_lanes: Dict[Tuple[str, float, int, float, int], _Lane] = {}
+_lanes_lock = threading.Lock()
+
+
+class OutboundQueue:
+    """
+    飞书发送队列：按去向（webhook 或群聊）限速，被限流时退避重试，排队中的同去向消息合并为一张卡片
+
+    飞书自定义机器人限制为 100 次/分钟、5 次/秒，默认参数按此设置
+    """
+
+    def __init__(self, rate_per_second: float = 1.5, burst: int = 5, coalesce_window: float = 0,
+                 max_retries: int = 3):
+        """
+        Args:
+            rate_per_second: 每个去向每秒发送数
+            burst: 允许的突发发送数
+            coalesce_window: 合并窗口（秒），队列在发送前等待该时间以合并后续消息；为 0 时只合并已在排队的消息
+            max_retries: 被限流时的最大重试次数
+        """
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.coalesce_window = coalesce_window
+        self.max_retries = max_retries
+        self.stats = {"sent": 0, "failed": 0, "retries": 0}
+        self.waits: List[float] = []
+        self._lock = threading.Lock()
+
+    def _lane(self, destination: str) -> _Lane:
+        # 设置不同的队列（如各去向单独配置了 rate_limit）不共用通道，避免沿用先创建者的限速
+        key = (destination, self.rate_per_second, self.burst, self.coalesce_window, self.max_retries)
+        with _lanes_lock:
+            if key not in _lanes:
+                _lanes[key] = _Lane(TokenBucket(self.rate_per_second, self.burst),
+                                    self.coalesce_window, self.max_retries)
+            return _lanes[key]
+
+    def count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def send(self, sender: "FeishuSender", cards: List[Tuple[str, str]],
+             uuids: Optional[List[Optional[str]]] = None) -> bool:
+        """
+        排队发送并等待结果
+
+        Args:
+            sender: 推送器（决定去向）
+            cards: 同一报告的一张或多张卡片 (内容, 标题)，连续入队并按顺序发送
+            uuids: 每张卡片的幂等键（机器人方式）
+
+        Returns:
+            是否全部发送成功
+        """
+        uuids = uuids or [None] * len(cards)
+        messages = [_Message(sender, self, content, title, message_uuid)
+                    for (content, title), message_uuid in zip(cards, uuids)]
+        self._lane(sender.destination).put(messages)
+        for message in messages:
+            message.done.wait()
+
+        with self._lock:
+            for message in messages:
+                self.waits.append(message.wait)
+                self.stats["sent" if message.ok else "failed"] += 1
+        for message in messages:
+            if message.wait >= 0.1:
+                print(f"[飞书推送] 排队等待 {message.wait:.2f} 秒: {message.title}")
+            if not message.ok and len(messages) > 1:
+                print(f"[飞书推送] ❌ 未送达: {message.title}")
+        return all(message.ok for message in messages)
+
+    def summary(self) -> str:
+        with self._lock:
+            waits = list(self.waits)
+        if not waits:
+            return "未发送"
+        return (f"成功 {self.stats['sent']} 条，失败 {self.stats['failed']} 条，限流重试 {self.stats['retries']} 次，"
+                f"排队等待平均 {sum(waits) / len(waits):.2f} 秒、最长 {max(waits):.2f} 秒")
 
 
 class FeishuSender:
@@ -14,17 +346,38 @@ class FeishuSender:
         初始化飞书推送器
 
         Args:
-            config: 飞书配置，包含 app_id, app_secret, webhook_url 等
+            config: 飞书配置，包含 app_id, app_secret, webhook_url 等，可选 api_base（开放平台地址），
+                    可选 token_cache_file（token 缓存文件，默认 feishu_token.json）和
+                    token_refresh_margin（距过期不足该秒数时提前刷新，默认 600）、
+                    rate_limit（发送队列参数，见 OutboundQueue；enabled=false 时直接发送）、
+                    max_card_bytes（单张卡片请求体上限，默认按推送方式取飞书限制）
         """
         self.app_id = config.get("app_id")
         self.app_secret = config.get("app_secret")
         self.webhook_url = config.get("webhook_url")
         self.chat_id = config.get("chat_id")
+        # 开放平台地址：环境变量 FEISHU_API_BASE 优先，可指向本地替身服务
+        self.api_base = (os.getenv("FEISHU_API_BASE") or config.get("api_base") or FEISHU_API_BASE).rstrip("/")
         self.tenant_access_token = None
+        self.token_cache = TokenCache(config.get("token_cache_file", "feishu_token.json"),
+                                      config.get("token_refresh_margin", 600))
+        self.max_card_bytes = config.get("max_card_bytes") or (
+            WEBHOOK_MAX_BYTES if self.webhook_url else BOT_MAX_BYTES
+        )
+        rate_limit = config.get("rate_limit", {})
+        self.queue = OutboundQueue(
+            rate_per_second=rate_limit.get("rate_per_second", 1.5),
+            burst=rate_limit.get("burst", 5),
+            coalesce_window=rate_limit.get("coalesce_window", 0),
+            max_retries=rate_limit.get("max_retries", 3),
+        ) if rate_limit.get("enabled", True) else None
 
-    def get_tenant_access_token(self) -> Optional[str]:
+    def get_tenant_access_token(self, rejected_token: Optional[str] = None) -> Optional[str]:
         """
-        获取飞书 tenant_access_token
+        获取飞书 tenant_access_token（优先使用缓存，临近过期时自动刷新）
+
+        Args:
+            rejected_token: 被飞书判定失效的 token，传入时不再使用它
 
         Returns:
             access_token 或 None
@@ -33,7 +386,28 @@ class FeishuSender:
             print("[飞书推送] 缺少 app_id 或 app_secret")
             return None
 
-        url = "https://open.feishu.cn/open-apis/auth/v3/tenant_access_token/internal"
+        self.tenant_access_token = self.token_cache.get(self.app_id, self._request_token, rejected_token)
+        return self.tenant_access_token
+
+    def refresh_token(self) -> bool:
+        """
+        提前刷新 token（供常驻进程定时调用；未到刷新时间时直接使用缓存，webhook 方式无需 token）
+
+        Returns:
+            是否持有有效 token
+        """
+        if self.webhook_url or not (self.app_id and self.app_secret):
+            return True
+        return self.get_tenant_access_token() is not None
+
+    def _request_token(self) -> Optional[Tuple[str, float]]:
+        """
+        向飞书请求新的 tenant_access_token
+
+        Returns:
+            (token, 有效秒数) 或 None
+        """
+        url = f"{self.api_base}/auth/v3/tenant_access_token/internal"
         headers = {"Content-Type": "application/json"}
         data = {
             "app_id": self.app_id,
@@ -45,9 +419,8 @@ class FeishuSender:
             result = response.json()
 
             if result.get("code") == 0:
-                self.tenant_access_token = result.get("tenant_access_token")
                 print("[飞书推送] 成功获取 access_token")
-                return self.tenant_access_token
+                return result.get("tenant_access_token"), result.get("expire", 7200)
             else:
                 print(f"[飞书推送] 获取 token 失败: {result}")
                 return None
@@ -57,7 +430,7 @@ class FeishuSender:
 
     def send_via_webhook(self, content: str, title: str = "物流预警") -> bool:
         """
-        通过 Webhook 发送消息
+        通过 Webhook 发送消息（立即发送，不经过发送队列）
 
         Args:
             content: 消息内容（支持 Markdown）
@@ -66,27 +439,20 @@ class FeishuSender:
         Returns:
             是否发送成功
         """
+        return self._webhook_once(content, title)[0]
+
+    def _webhook_once(self, content: str, title: str) -> Tuple[bool, Optional[float]]:
+        """
+        通过 Webhook 发送一次
+
+        Returns:
+            (是否成功, 被限流时建议等待的秒数；未被限流为 None)
+        """
         if not self.webhook_url:
             print("[飞书推送] 未配置 webhook_url")
-            return False
+            return False, None
 
-        data = {
-            "msg_type": "interactive",
-            "card": {
-                "header": {
-                    "title": {
-                        "tag": "plain_text",
-                        "content": title
-                    }
-                },
-                "elements": [
-                    {
-                        "tag": "markdown",
-                        "content": content
-                    }
-                ]
-            }
-        }
+        data = webhook_payload(content, title)
 
         try:
             response = requests.post(
@@ -99,17 +465,17 @@ class FeishuSender:
 
             if result.get("StatusCode") == 0 or result.get("code") == 0:
                 print(f"[飞书推送] Webhook 发送成功: {title}")
-                return True
+                return True, None
             else:
                 print(f"[飞书推送] Webhook 发送失败: {result}")
-                return False
+                return False, rate_limit_delay(response.status_code, response.headers, result)
         except Exception as e:
             print(f"[飞书推送] Webhook 发送异常: {e}")
-            return False
+            return False, None
 
     def send_via_bot(self, content: str, title: str = "物流预警") -> bool:
         """
-        通过机器人发送消息到指定群聊
+        通过机器人发送消息到指定群聊（立即发送，不经过发送队列）
 
         Args:
             content: 消息内容（支持 Markdown）
@@ -118,74 +484,156 @@ class FeishuSender:
         Returns:
             是否发送成功
         """
+        return self._bot_once(content, title)[0]
+
+    def _bot_once(self, content: str, title: str, message_uuid: Optional[str] = None) -> Tuple[bool, Optional[float]]:
+        """
+        通过机器人发送一次（token 失效时换新 token 重试一次）
+
+        Args:
+            message_uuid: 幂等键，重发时飞书不会重复投递
+
+        Returns:
+            (是否成功, 被限流时建议等待的秒数；未被限流为 None)
+        """
         if not self.chat_id:
             print("[飞书推送] 未配置 chat_id")
-            return False
+            return False, None
 
         # 获取 access_token
-        if not self.tenant_access_token:
-            if not self.get_tenant_access_token():
-                return False
+        if not self.get_tenant_access_token():
+            return False, None
 
-        url = "https://open.feishu.cn/open-apis/im/v1/messages"
+        result, retry_after = self._post_message(content, title, message_uuid)
+        if result and result.get("code") in TOKEN_EXPIRED_CODES:
+            # token 在有效期内被飞书判定失效（如在别处被刷新），强制换新后重试一次
+            print(f"[飞书推送] ⚠️ token 已失效（{result.get('code')}），重新获取后重试")
+            if not self.get_tenant_access_token(rejected_token=self.tenant_access_token):
+                return False, None
+            result, retry_after = self._post_message(content, title, message_uuid)
+
+        if result and result.get("code") == 0:
+            print(f"[飞书推送] 机器人发送成功: {title}")
+            return True, None
+        if result is not None:
+            print(f"[飞书推送] 机器人发送失败: {result}")
+        return False, retry_after
+
+    def _post_message(self, content: str, title: str,
+                      message_uuid: Optional[str] = None) -> Tuple[Optional[Dict], Optional[float]]:
+        """
+        调用 im/v1/messages 发送一条卡片消息
+
+        Returns:
+            (飞书返回的结果，请求异常时为 None；被限流时建议等待的秒数)
+        """
+        url = f"{self.api_base}/im/v1/messages"
         headers = {
             "Authorization": f"Bearer {self.tenant_access_token}",
             "Content-Type": "application/json"
         }
 
-        data = {
-            "receive_id": self.chat_id,
-            "msg_type": "interactive",
-            "content": json.dumps({
-                "header": {
-                    "title": {
-                        "tag": "plain_text",
-                        "content": title
-                    }
-                },
-                "elements": [
-                    {
-                        "tag": "markdown",
-                        "content": content
-                    }
-                ]
-            })
-        }
+        data = bot_payload(self.chat_id, content, title, message_uuid)
 
         params = {"receive_id_type": "chat_id"}
 
         try:
             response = requests.post(url, headers=headers, params=params, json=data, timeout=10)
             result = response.json()
-
-            if result.get("code") == 0:
-                print(f"[飞书推送] 机器人发送成功: {title}")
-                return True
-            else:
-                print(f"[飞书推送] 机器人发送失败: {result}")
-                return False
+            return result, rate_limit_delay(response.status_code, response.headers, result)
         except Exception as e:
             print(f"[飞书推送] 机器人发送异常: {e}")
-            return False
+            return None, None
 
-    def send_message(self, content: str, title: str = "物流预警") -> bool:
+    @property
+    def destination(self) -> Optional[str]:
+        """消息的实际去向（webhook 优先），同一去向共用发送队列和限速"""
+        if self.webhook_url:
+            return self.webhook_url
+        if self.app_id and self.app_secret and self.chat_id:
+            return f"chat:{self.app_id}:{self.chat_id}"
+        return None
+
+    def send_once(self, content: str, title: str,
+                  message_uuid: Optional[str] = None) -> Tuple[bool, Optional[float]]:
+        """
+        按配置的方式发送一次，不排队、不重试（发送队列调用）
+
+        Args:
+            message_uuid: 幂等键（仅机器人方式支持，webhook 忽略）
+
+        Returns:
+            (是否成功, 被限流时建议等待的秒数；未被限流为 None)
+        """
+        if self.webhook_url:
+            return self._webhook_once(content, title)
+        return self._bot_once(content, title, message_uuid)
+
+    def payload_size(self, content: str, title: str) -> int:
+        """卡片按当前推送方式序列化后的请求体字节数"""
+        if self.webhook_url:
+            payload = webhook_payload(content, title)
+        else:
+            payload = bot_payload(self.chat_id or "", content, title)
+        return len(json.dumps(payload).encode("utf-8"))
+
+    def fits(self, content: str, title: str) -> bool:
+        """卡片是否在大小限制内"""
+        return self.payload_size(content, title) <= self.max_card_bytes
+
+    def split_cards(self, content: str, title: str) -> List[Tuple[str, str]]:
+        """
+        超过卡片大小限制时拆分为多张带编号的卡片
+
+        Returns:
+            [(内容, 标题)]，未超限时只有一张
+        """
+        cards = split_report(content, title, self.fits)
+        if len(cards) > 1:
+            print(f"[飞书推送] 报告 {self.payload_size(content, title)} 字节超过 {self.max_card_bytes} 字节，"
+                  f"拆分为 {len(cards)} 张卡片: {title}")
+        return cards
+
+    def card_uuids(self, count: int, idempotency_key: Optional[str]) -> List[Optional[str]]:
+        """
+        同一报告各张卡片的飞书 uuid（同步和异步推送共用）
+
+        Returns:
+            机器人方式下第 i 张为 "<键>-<i>"；webhook 不支持 uuid，或没有幂等键时为 None
+        """
+        if idempotency_key and not self.webhook_url:
+            return [f"{idempotency_key}-{idx}" for idx in range(1, count + 1)]
+        return [None] * count
+
+    def send_message(self, content: str, title: str = "物流预警", idempotency_key: Optional[str] = None) -> bool:
         """
         发送消息（自动选择 webhook 或机器人方式）
 
+        超过卡片大小限制的报告在章节/条目边界拆分为多张卡片按顺序发送；启用限速时经过发送队列：
+        按去向限速，被限流时退避重试，排队中的同去向消息在不超限的前提下合并为一张卡片
+
         Args:
             content: 消息内容
             title: 消息标题
+            idempotency_key: 幂等键（如发件箱条目 id），机器人方式下第 i 张卡片以 "<键>-<i>" 作为飞书 uuid，
+                             重发同一报告时已送达的卡片不会重复投递
 
         Returns:
-            是否发送成功
+            是否全部发送成功
         """
-        # 优先使用 webhook（更简单）
-        if self.webhook_url:
-            return self.send_via_webhook(content, title)
+        if not self.destination:
+            print("[飞书推送] 未配置任何推送方式（webhook 或 机器人）")
+            return False
 
-        # 否则使用机器人
-        if self.app_id and self.app_secret and self.chat_id:
-            return self.send_via_bot(content, title)
+        cards = self.split_cards(content, title)
+        uuids = self.card_uuids(len(cards), idempotency_key)
+        if self.queue:
+            return self.queue.send(self, cards, uuids)
 
-        print("[飞书推送] 未配置任何推送方式（webhook 或 机器人）")
-        return False
+        ok = True
+        for (card_content, card_title), message_uuid in zip(cards, uuids):
+            if not self.send_once(card_content, card_title, message_uuid)[0]:
+                ok = False
+                if len(cards) > 1:
+                    print(f"[飞书推送] ❌ 未送达: {card_title}")
+        return ok
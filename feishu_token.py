@@ -0,0 +1,105 @@
+"""
+飞书 token 缓存模块 - tenant_access_token 及其过期时间同时缓存在内存和磁盘，多进程通过文件锁共享，临近过期时提前刷新
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from file_lock import file_lock
+
+# 飞书返回这些错误码时说明 token 已失效（过期、被刷新或格式错误），需要重新获取
+TOKEN_EXPIRED_CODES = {99991663, 99991664, 99991668, 99991677}
+
+
+class TokenCache:
+    """按 app_id 缓存 tenant_access_token（不保存 app_secret）"""
+
+    def __init__(self, cache_file: str = "feishu_token.json", refresh_margin: float = 600):
+        """
+        初始化
+
+        Args:
+            cache_file: 缓存文件路径，为空时只缓存在内存中
+            refresh_margin: 距过期不足该秒数时提前刷新
+        """
+        self.cache_file = cache_file
+        self.refresh_margin = refresh_margin
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def _fresh(self, entry: Optional[Dict]) -> bool:
+        return bool(entry) and entry.get("expires_at", 0) - time.time() > self.refresh_margin
+
+    def _load(self) -> Dict[str, Dict]:
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"[飞书 token] 读取缓存文件失败: {e}")
+            return {}
+
+    def _save(self, entries: Dict[str, Dict]) -> bool:
+        """原子写入缓存文件（仅属主可读写）"""
+        directory = os.path.dirname(os.path.abspath(self.cache_file))
+        fd, tmp_path = tempfile.mkstemp(prefix=".feishu_token.", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.cache_file)
+            return True
+        except Exception as e:
+            print(f"[飞书 token] 保存缓存文件失败: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def get(self, app_id: str, fetch: Callable[[], Optional[Tuple[str, float]]],
+            rejected_token: Optional[str] = None) -> Optional[str]:
+        """
+        获取 token：内存 -> 磁盘 -> 调用 fetch 重新获取
+
+        获取过程持有文件锁，多个进程同时过期时只有一个真正请求飞书，其余读取它写入的结果
+
+        Args:
+            app_id: 应用 ID
+            fetch: 请求新 token 的函数，返回 (token, 有效秒数)，失败返回 None
+            rejected_token: 被飞书判定失效的 token，缓存中是它时视为过期
+                            （已被其他请求或进程换成新 token 时直接使用新的）
+
+        Returns:
+            token 或 None
+        """
+        def usable(entry: Optional[Dict]) -> bool:
+            return self._fresh(entry) and entry["token"] != rejected_token
+
+        with self._lock:
+            if usable(self.entries.get(app_id)):
+                return self.entries[app_id]["token"]
+
+            if not self.cache_file:
+                return self._fetch(app_id, fetch, {})
+
+            with file_lock(self.cache_file + ".lock"):
+                stored = self._load()
+                if usable(stored.get(app_id)):
+                    self.entries[app_id] = stored[app_id]
+                    return stored[app_id]["token"]
+                return self._fetch(app_id, fetch, stored)
+
+    def _fetch(self, app_id: str, fetch: Callable[[], Optional[Tuple[str, float]]],
+               stored: Dict[str, Dict]) -> Optional[str]:
+        fetched = fetch()
+        if not fetched:
+            return None
+        token, expire = fetched
+        entry = {"token": token, "expires_at": time.time() + expire}
+        self.entries[app_id] = entry
+        if self.cache_file:
+            stored[app_id] = entry
+            self._save(stored)
+        return token
@@ -0,0 +1,26 @@
+"""
+文件锁模块 - 多个进程（定时任务、手动运行）共享状态文件时的互斥
+"""
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，退化为不加锁
+    fcntl = None
+
+
+@contextmanager
+def file_lock(lock_path: str):
+    """
+    对 lock_path 加排他锁，退出时释放
+
+    不支持 fcntl 的平台上不加锁（仅单进程运行时安全）
+    """
+    with open(lock_path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,67 @@
+"""
+指纹模块 - 标题归一化、URL 规范化与 64 位指纹
+"""
+import hashlib
+import re
+import unicodedata
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 不影响页面内容的跟踪参数
+TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "cmpid", "ocid"}
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_title(title: str) -> str:
+    """标题归一化：NFKC、忽略大小写、合并空白"""
+    if not title:
+        return ""
+    title = unicodedata.normalize("NFKC", title).casefold()
+    return _WHITESPACE.sub(" ", title).strip()
+
+
+def canonical_url(url: str) -> str:
+    """
+    URL 规范化，用于判断两个链接是否指向同一篇文章
+
+    统一协议和域名大小写、去掉 www. 前缀、默认端口、片段、跟踪参数和末尾斜杠，查询参数按键排序
+    """
+    if not url:
+        return ""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url.strip()
+
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    port = parts.port if parts.port not in (None, 80, 443) else None
+    netloc = f"{host}:{port}" if port else host
+
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip("/") or "/"
+
+    return urlunsplit((scheme, netloc, path, urlencode(query), ""))
+
+
+def fingerprint64(text: str) -> int:
+    """64 位有符号指纹（可直接放入 array('q')），空字符串返回 0"""
+    if not text:
+        return 0
+    digest = hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little", signed=True)
+
+
+def title_fingerprint(title: str) -> int:
+    """归一化标题的指纹"""
+    return fingerprint64(normalize_title(title))
+
+
+def url_fingerprint(url: str) -> int:
+    """规范化 URL 的指纹"""
+    return fingerprint64(canonical_url(url))
@@ -0,0 +1,116 @@
+"""
+条件请求模块 - 带 ETag/Last-Modified 的 GET，源未变化时复用上次解析的结果
+"""
+import json
+import os
+import tempfile
+import threading
+from typing import Callable, Dict, IO, List, Tuple
+
+import requests
+
+from file_lock import file_lock
+
+
+class ConditionalFetcher:
+    """按 URL 记录校验信息和上次解析结果；服务器返回 304 或请求失败时直接使用缓存结果"""
+
+    def __init__(self, cache_file: str = "feed_cache.json", connect_timeout: float = 5,
+                 read_timeout: float = 30, session: requests.Session = None):
+        """
+        初始化
+
+        Args:
+            cache_file: 校验信息和解析结果的缓存文件
+            connect_timeout: 建立连接超时（秒）
+            read_timeout: 读取响应超时（秒）
+            session: 复用的 HTTP 会话，默认新建
+        """
+        self.cache_file = cache_file
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = session or requests.Session()
+        self.stats = {"fetched": 0, "not_modified": 0, "failed": 0}
+        self._lock = threading.Lock()
+        self.entries = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"[条件请求] 读取缓存文件失败: {e}")
+            return {}
+
+    def _save(self) -> bool:
+        """合并其他进程写入的条目后原子写入缓存文件"""
+        directory = os.path.dirname(os.path.abspath(self.cache_file))
+        with file_lock(self.cache_file + ".lock"):
+            merged = dict(self._load(), **self.entries)
+            fd, tmp_path = tempfile.mkstemp(prefix=".feed_cache.", dir=directory)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(merged, f, ensure_ascii=False)
+                os.replace(tmp_path, self.cache_file)
+                return True
+            except Exception as e:
+                print(f"[条件请求] 保存缓存文件失败: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return False
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def fetch(self, url: str, parse: Callable[[IO[bytes]], List[Dict]],
+              headers: Dict = None) -> Tuple[List[Dict], bool]:
+        """
+        条件 GET 并解析
+
+        Args:
+            url: 地址
+            parse: 解析函数，接收响应字节流（流式读取，不整体载入内存），返回条目列表
+            headers: 额外的请求头
+
+        Returns:
+            (条目列表, 是否有更新)；未变化或失败时返回上次的结果和 False
+        """
+        with self._lock:
+            entry = dict(self.entries.get(url, {}))
+
+        request_headers = dict(headers or {})
+        if entry.get("etag"):
+            request_headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            request_headers["If-Modified-Since"] = entry["last_modified"]
+
+        try:
+            with self.session.get(url, headers=request_headers, timeout=self.timeout, stream=True) as response:
+                if response.status_code == 304:
+                    self._count("not_modified")
+                    return entry.get("items", []), False
+                response.raise_for_status()
+                response.raw.decode_content = True
+                items = parse(response.raw)
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        except Exception as e:
+            self._count("failed")
+            print(f"[条件请求] ⚠️ 获取失败，使用上次结果: {url} ({e})")
+            return entry.get("items", []), False
+
+        self._count("fetched")
+        with self._lock:
+            self.entries[url] = {"etag": etag, "last_modified": last_modified, "items": items}
+            self._save()
+        return items, True
+
+    def summary(self) -> str:
+        return (f"更新 {self.stats['fetched']} 个，未变化 {self.stats['not_modified']} 个，"
+                f"失败 {self.stats['failed']} 个")
+
+    def close(self):
+        """关闭 HTTP 会话"""
+        self.session.close()
@@ -6,15 +6,20 @@
 import json
 import sys
 import os
-import requests
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict
 
 # 导入自定义模块
 from weather_monitor import format_weather_report, get_weather_search_config
+from weather_feeds import get_weather_alerts
+from news_sources import build_news_sources, collect_news
 from news_monitor import format_news_report, extract_news_items, get_news_search_config
-from feishu_sender import FeishuSender
-from storage import NewsStorage
+from classifier import configure_taxonomy
+from feishu_router import FeishuRouter, tag_news, tag_weather_alert, tag_weather_result
+from storage import NewsStorage, create_storage
+from tavily_client import QueryBudget, TavilyClient, get_tavily_client
 
 
 def load_config(config_file: str = "config.json") -> Dict:
@@ -27,53 +32,8 @@ def load_config(config_file: str = "config.json") -> Dict:
         sys.exit(1)
 
 
-def tavily_search(api_key: str, query: str, time_range: str = "day", max_results: int = 10) -> List[Dict]:
-    """
-    使用 Tavily API 执行搜索
-
-    Args:
-        api_key: Tavily API Key
-        query: 搜索查询
-        time_range: 时间范围 (day, week, month)
-        max_results: 最大结果数
-
-    Returns:
-        搜索结果列表
-    """
-    url = "https://api.tavily.com/search"
-
-    payload = {
-        "api_key": api_key,
-        "query": query,
-        "search_depth": "basic",
-        "include_raw_content": False,
-        "max_results": max_results,
-        "time_range": time_range
-    }
-
-    try:
-        print(f"[Tavily] 搜索: {query[:80]}...")
-        response = requests.post(url, json=payload, timeout=30)
-        response.raise_for_status()
-
-        data = response.json()
-        results = data.get("results", [])
-
-        print(f"[Tavily] 找到 {len(results)} 条结果")
-        return results
-
-    except requests.exceptions.Timeout:
-        print("[Tavily] ❌ 搜索超时")
-        return []
-    except requests.exceptions.RequestException as e:
-        print(f"[Tavily] ❌ 搜索失败: {e}")
-        return []
-    except Exception as e:
-        print(f"[Tavily] ❌ 未知错误: {e}")
-        return []
-
-
-def check_weather_alerts(config: Dict, feishu: FeishuSender, tavily_key: str):
+def check_weather_alerts(config: Dict, feishu: FeishuRouter, tavily: TavilyClient,
+                         budget: QueryBudget = None):
     """
     检查天气预警并推送
     """
@@ -81,22 +41,21 @@ def check_weather_alerts(config: Dict, feishu: FeishuSender, tavily_key: str):
     print(f"[天气预警检查] {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*60}\n")
 
-    # 获取搜索配置
-    weather_config = get_weather_search_config(config)
-
-    # 执行 Tavily 搜索
-    weather_results = tavily_search(
-        api_key=tavily_key,
-        query=weather_config["query"],
-        time_range=weather_config.get("time_range", "day"),
-        max_results=weather_config.get("max_results", 10)
-    )
-
-    # 格式化报告
-    report = format_weather_report(weather_results)
-
-    # 推送到飞书（每日推送）
-    if feishu.send_message(report, title="欧洲物流天气预警"):
+    # 优先使用官方预警源（weather_feeds.enabled），否则走关键词搜索
+    alerts = get_weather_alerts(config)
+    weather_results = []
+    if alerts is None:
+        # 执行 Tavily 搜索（配置了分片时按国家并发搜索并合并）
+        weather_results = tavily.run(get_weather_search_config(config), budget)
+
+    # 按去向过滤、格式化报告并推送到飞书（每日推送）
+    if alerts is not None:
+        sent = feishu.dispatch("weather", alerts, lambda subset: format_weather_report([], subset),
+                               "欧洲物流天气预警", tag_weather_alert)
+    else:
+        sent = feishu.dispatch("weather", weather_results, format_weather_report,
+                               "欧洲物流天气预警", tag_weather_result)
+    if sent:
         print("[天气预警] ✅ 推送成功")
         return True
     else:
@@ -104,7 +63,8 @@ def check_weather_alerts(config: Dict, feishu: FeishuSender, tavily_key: str):
         return False
 
 
-def check_logistics_news(config: Dict, feishu: FeishuSender, storage: NewsStorage, tavily_key: str):
+def check_logistics_news(config: Dict, feishu: FeishuRouter, storage: NewsStorage, tavily: TavilyClient,
+                         budget: QueryBudget = None):
     """
     检查物流新闻并推送（仅推送新增）
     """
@@ -115,39 +75,44 @@ def check_logistics_news(config: Dict, feishu: FeishuSender, storage: NewsStorag
     # 获取搜索配置
     news_config = get_news_search_config(config)
 
-    # 执行 Tavily 搜索
-    news_results = tavily_search(
-        api_key=tavily_key,
-        query=news_config["query"],
-        time_range=news_config.get("time_range", "day"),
-        max_results=news_config.get("max_results", 15)
+    # 从各新闻来源获取条目：Tavily 搜索（分片/自适应深度）和配置的 RSS/Atom 订阅源并发执行
+    sources = build_news_sources(
+        config, tavily, news_config, budget,
+        lambda results: len(storage.get_new_news(extract_news_items(results)))
     )
+    all_news = collect_news(sources)
 
-    # 提取新闻条目
-    all_news = extract_news_items(news_results)
-
-    # 过滤出新增新闻
-    new_news = storage.get_new_news(all_news)
+    # 过滤出新增新闻（已在发件箱中等待重发的不再重复推送）
+    new_news = feishu.exclude_pending(storage.get_new_news(all_news))
 
     print(f"[物流新闻] 总共: {len(all_news)} 条，新增: {len(new_news)} 条")
 
     # 只有新增新闻时才推送
     if new_news and len(new_news) > 0:
-        report = format_news_report(new_news)
-
-        if report:
-            if feishu.send_message(report, title="欧洲物流突发事件预警"):
-                storage.add_sent_news(new_news)
-                print("[物流新闻] ✅ 推送成功，已记录新闻")
-                return True
-            else:
-                print("[物流新闻] ❌ 推送失败")
-                return False
+        # 每个去向只推送与其国家/事件类型匹配的新闻，送达后记录
+        if feishu.dispatch("news", new_news, format_news_report, "欧洲物流突发事件预警", tag_news, storage):
+            tavily.commit_watermarks(news_config)
+            print("[物流新闻] ✅ 推送成功，已记录新闻")
+            return True
+        else:
+            if feishu.outbox:
+                # 未送达的报告已留在发件箱，下次运行直接重发，无需重新搜索
+                tavily.commit_watermarks(news_config)
+            print("[物流新闻] ❌ 推送失败")
+            return False
     else:
+        tavily.commit_watermarks(news_config)
         print("[物流新闻] ℹ️ 没有新增新闻，跳过推送")
         return True
 
 
+def run_timed(func, *args):
+    """执行一条检查流水线，返回 (是否成功, 耗时秒数)"""
+    start = time.perf_counter()
+    success = func(*args)
+    return success, time.perf_counter() - start
+
+
 def main():
     """主函数"""
     print("="*60)
@@ -157,6 +122,7 @@ def main():
 
     # 加载配置
     config = load_config()
+    configure_taxonomy(config.get("classifier", {}))
 
     # 检查 Tavily API Key
     tavily_key = config.get("tavily_api_key") or os.getenv("TAVILY_API_KEY")
@@ -166,38 +132,64 @@ def main():
         print("注册地址: https://tavily.com\n")
         sys.exit(1)
 
-    # 初始化组件
-    feishu = FeishuSender(config["feishu"])
-    storage = NewsStorage(config["storage"]["sent_news_file"])
+    # 解析命令行参数（--no-cache 不读写搜索缓存，--refresh 跳过缓存读取强制重新搜索）
+    flags = {arg for arg in sys.argv[1:] if arg.startswith("--")}
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    check_type = args[0] if args else "both"
 
-    # 清理旧新闻记录
-    storage.cleanup_old_news(config["storage"].get("max_history_days", 30))
+    if check_type not in ["weather", "news", "both"] or flags - {"--no-cache", "--refresh"}:
+        print("用法: python logistics_alert.py [weather|news|both] [--no-cache] [--refresh]")
+        sys.exit(1)
 
-    # 解析命令行参数
-    check_type = sys.argv[1] if len(sys.argv) > 1 else "both"
+    # 初始化组件
+    tavily = get_tavily_client(tavily_key, config.get("search"),
+                               use_cache="--no-cache" not in flags, refresh="--refresh" in flags)
+    budget = QueryBudget(config.get("search", {}).get("sharding", {}).get("query_budget"))
+    feishu = FeishuRouter(config["feishu"], config["feishu"].get("max_concurrency", 4))
+    storage = create_storage(config["storage"])
+
+    # 要执行的检查：(名称, 函数, 参数)
+    pipelines = []
+    if check_type in ["weather", "both"]:
+        pipelines.append(("天气预警", check_weather_alerts, (config, feishu, tavily, budget)))
+    if check_type in ["news", "both"]:
+        pipelines.append(("物流新闻", check_logistics_news, (config, feishu, storage, tavily, budget)))
 
-    if check_type not in ["weather", "news", "both"]:
-        print("用法: python logistics_alert.py [weather|news|both]")
-        sys.exit(1)
+    # 执行检查（本次运行的存储变更在结束时统一写入一次，中途异常时仍写入已送达的记录，只回滚其余变更）
+    start = time.perf_counter()
 
-    # 执行检查
-    results = []
+    with storage.transaction():
+        # 清理旧新闻记录
+        storage.cleanup_old_news(config["storage"].get("max_history_days", 30))
 
-    if check_type in ["weather", "both"]:
-        success = check_weather_alerts(config, feishu, tavily_key)
-        results.append(("天气预警", success))
+        # 先重发发件箱中上次未送达的报告
+        feishu.drain(storage)
 
-    if check_type in ["news", "both"]:
-        success = check_logistics_news(config, feishu, storage, tavily_key)
-        results.append(("物流新闻", success))
+        if len(pipelines) > 1:
+            # both 模式：天气和新闻两条流水线并发执行，慢的一方不会拖住另一方
+            with ThreadPoolExecutor(max_workers=len(pipelines), thread_name_prefix="pipeline") as pool:
+                futures = [pool.submit(run_timed, func, *args) for _, func, args in pipelines]
+                timings = [future.result() for future in futures]
+        else:
+            timings = [run_timed(func, *args) for _, func, args in pipelines]
+
+    total_elapsed = time.perf_counter() - start
+    results = [(name, success, elapsed) for (name, _, _), (success, elapsed) in zip(pipelines, timings)]
 
     # 输出汇总
     print(f"\n{'='*60}")
     print("执行汇总")
     print("="*60)
-    for name, success in results:
+    for name, success, elapsed in results:
         status = "✅ 成功" if success else "❌ 失败"
-        print(f"{name}: {status}")
+        print(f"{name}: {status}（耗时 {elapsed:.1f} 秒）")
+    print(f"总耗时: {total_elapsed:.1f} 秒")
+    print(f"搜索预算: {budget.summary()}")
+    print(f"搜索缓存: {tavily.cache.summary() if tavily.cache else '未启用'}")
+    print(f"搜索额度: {tavily.governor.summary() if tavily.governor else '未启用'}")
+    print("飞书推送:")
+    for line in feishu.summary() or ["无"]:
+        print(f"  - {line}")
     print("="*60)
 
 
@@ -5,14 +5,14 @@
 """
 import json
 import sys
-import requests
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict
 
 from weather_monitor import format_weather_report
 from news_monitor import format_news_report, extract_news_items
 from feishu_sender import FeishuSender
-from storage import NewsStorage
+from storage import NewsStorage, create_storage
+from tavily_client import get_tavily_client
 
 
 def load_config():
@@ -25,57 +25,6 @@ def load_config():
         sys.exit(1)
 
 
-def search_with_tavily(api_key: str, query: str, time_range: str = "day", max_results: int = 10) -> List[Dict]:
-    """
-    使用 Tavily API 执行搜索
-
-    Args:
-        api_key: Tavily API Key
-        query: 搜索查询
-        time_range: 时间范围
-        max_results: 最大结果数
-
-    Returns:
-        搜索结果列表
-    """
-    url = "https://api.tavily.com/search"
-    headers = {"Content-Type": "application/json"}
-    data = {
-        "api_key": api_key,
-        "query": query,
-        "search_depth": "basic",
-        "max_results": max_results,
-        "include_raw_content": False
-    }
-
-    # 时间范围映射
-    if time_range == "day":
-        data["days"] = 1
-    elif time_range == "week":
-        data["days"] = 7
-
-    try:
-        print(f"[Tavily] 正在搜索: {query[:60]}...")
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-
-        if response.status_code == 200:
-            result = response.json()
-            results = result.get("results", [])
-            print(f"[Tavily] ✅ 搜索成功，找到 {len(results)} 条结果")
-            return results
-        else:
-            print(f"[Tavily] ❌ 搜索失败，状态码: {response.status_code}")
-            print(f"[Tavily] 响应: {response.text}")
-            return []
-
-    except requests.exceptions.Timeout:
-        print("[Tavily] ❌ 请求超时")
-        return []
-    except Exception as e:
-        print(f"[Tavily] ❌ 搜索异常: {e}")
-        return []
-
-
 def check_weather(config: Dict, feishu: FeishuSender):
     """检查天气预警并推送"""
     print("\n" + "="*60)
@@ -91,8 +40,8 @@ def check_weather(config: Dict, feishu: FeishuSender):
     query = f"({countries_str}) logistics transport weather {keywords_str}"
 
     # 执行搜索
-    api_key = config["tavily_api_key"]
-    results = search_with_tavily(api_key, query, time_range="day", max_results=10)
+    tavily = get_tavily_client(config["tavily_api_key"], config.get("search"))
+    results = tavily.search(query, time_range="day", max_results=10)
 
     # 格式化报告
     report = format_weather_report(results)
@@ -120,8 +69,8 @@ def check_news(config: Dict, feishu: FeishuSender, storage: NewsStorage):
     query = f"({countries_str}) logistics ({keywords_str})"
 
     # 执行搜索
-    api_key = config["tavily_api_key"]
-    results = search_with_tavily(api_key, query, time_range="day", max_results=15)
+    tavily = get_tavily_client(config["tavily_api_key"], config.get("search"))
+    results = tavily.search(query, time_range="day", max_results=15)
 
     # 提取新闻
     all_news = extract_news_items(results)
@@ -171,20 +120,24 @@ def main():
 
     # 初始化组件
     feishu = FeishuSender(config["feishu"])
-    storage = NewsStorage(config["storage"]["sent_news_file"])
+    storage = create_storage(config["storage"])
 
-    # 清理旧记录
-    storage.cleanup_old_news(config["storage"].get("max_history_days", 30))
+    # 执行检查（存储变更在结束时统一写入一次，中途异常时仍写入已送达的记录，只回滚其余变更）
+    with storage.transaction():
+        # 清理旧记录
+        storage.cleanup_old_news(config["storage"].get("max_history_days", 30))
 
-    # 执行检查
-    if check_type in ["weather", "both"]:
-        check_weather(config, feishu)
+        if check_type in ["weather", "both"]:
+            check_weather(config, feishu)
 
-    if check_type in ["news", "both"]:
-        check_news(config, feishu, storage)
+        if check_type in ["news", "both"]:
+            check_news(config, feishu, storage)
 
     print("\n" + "="*60)
     print("检查完成")
+    governor = get_tavily_client(config["tavily_api_key"], config.get("search")).governor
+    if governor:
+        print(f"搜索额度: {governor.summary()}")
     print("="*60 + "\n")
 
 
@@ -5,14 +5,14 @@ GitHub Actions 版本 - 从环境变量读取配置
 import json
 import sys
 import os
-import requests
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict
 
 from weather_monitor import format_weather_report
 from news_monitor import format_news_report, extract_news_items
 from feishu_sender import FeishuSender
-from storage import NewsStorage
+from storage import NewsStorage, create_storage
+from tavily_client import get_tavily_client
 
 
 def load_config_from_env() -> Dict:
@@ -45,35 +45,6 @@ def load_config_from_env() -> Dict:
     return config
 
 
-def search_with_tavily(api_key: str, query: str, max_results: int = 10) -> List[Dict]:
-    """使用 Tavily API 搜索"""
-    url = "https://api.tavily.com/search"
-    headers = {"Content-Type": "application/json"}
-    data = {
-        "api_key": api_key,
-        "query": query,
-        "search_depth": "basic",
-        "max_results": max_results,
-        "days": 1
-    }
-
-    try:
-        print(f"[Tavily] 搜索: {query[:60]}...")
-        response = requests.post(url, headers=headers, json=data, timeout=30)
-
-        if response.status_code == 200:
-            result = response.json()
-            results = result.get("results", [])
-            print(f"[Tavily] ✅ 找到 {len(results)} 条结果")
-            return results
-        else:
-            print(f"[Tavily] ❌ 失败: {response.status_code}")
-            return []
-    except Exception as e:
-        print(f"[Tavily] ❌ 异常: {e}")
-        return []
-
-
 def check_weather(config: Dict, feishu: FeishuSender):
     """检查天气预警"""
     print("\n" + "="*60)
@@ -84,7 +55,8 @@ def check_weather(config: Dict, feishu: FeishuSender):
     keywords = " ".join(config["monitoring"]["weather_keywords"])
     query = f"({countries}) logistics transport weather {keywords}"
 
-    results = search_with_tavily(config["tavily_api_key"], query, 10)
+    tavily = get_tavily_client(config["tavily_api_key"], config.get("search"))
+    results = tavily.search(query, time_range="day", max_results=10)
     report = format_weather_report(results)
 
     print("\n[天气预警] 推送到飞书...")
@@ -104,7 +76,8 @@ def check_news(config: Dict, feishu: FeishuSender, storage: NewsStorage):
     keywords = " OR ".join(config["monitoring"]["news_keywords"])
     query = f"({countries}) logistics ({keywords})"
 
-    results = search_with_tavily(config["tavily_api_key"], query, 15)
+    tavily = get_tavily_client(config["tavily_api_key"], config.get("search"))
+    results = tavily.search(query, time_range="day", max_results=15)
     all_news = extract_news_items(results)
     new_news = storage.get_new_news(all_news)
 
@@ -136,18 +109,23 @@ def main():
 
     # 初始化组件
     feishu = FeishuSender(config["feishu"])
-    storage = NewsStorage(config["storage"]["sent_news_file"])
-    storage.cleanup_old_news(30)
+    storage = create_storage(config["storage"])
+
+    # 执行检查（存储变更在结束时统一写入一次，中途异常时仍写入已送达的记录，只回滚其余变更）
+    with storage.transaction():
+        storage.cleanup_old_news(30)
 
-    # 执行检查
-    if check_type in ["weather", "both"]:
-        check_weather(config, feishu)
+        if check_type in ["weather", "both"]:
+            check_weather(config, feishu)
 
-    if check_type in ["news", "both"]:
-        check_news(config, feishu, storage)
+        if check_type in ["news", "both"]:
+            check_news(config, feishu, storage)
 
     print("\n" + "="*60)
     print("完成")
+    governor = get_tavily_client(config["tavily_api_key"], config.get("search")).governor
+    if governor:
+        print(f"搜索额度: {governor.summary()}")
     print("="*60)
 
 
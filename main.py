@@ -9,13 +9,17 @@ import sys
 import schedule
 import time
 from datetime import datetime
-from typing import Dict, List
+from typing import Callable, Dict, List
 
 # 导入自定义模块
 from weather_monitor import get_weather_search_config, format_weather_report
+from weather_feeds import get_weather_alerts
+from news_sources import build_news_sources, collect_news
 from news_monitor import get_news_search_config, format_news_report, extract_news_items
-from feishu_sender import FeishuSender
-from storage import NewsStorage
+from classifier import configure_taxonomy
+from feishu_router import FeishuRouter, tag_news, tag_weather_alert, tag_weather_result
+from storage import NewsStorage, create_storage
+from tavily_client import QueryBudget, get_tavily_client, merge_results
 
 
 def load_config(config_file: str = "config.json") -> Dict:
@@ -28,31 +32,44 @@ def load_config(config_file: str = "config.json") -> Dict:
         sys.exit(1)
 
 
-def perform_tavily_search(query: str, time_range: str = "day", max_results: int = 10) -> List[Dict]:
+def perform_tavily_search(config: Dict, search_config: Dict,
+                          count_new: Callable[[List[Dict]], int] = None) -> List[Dict]:
     """
-    执行 Tavily 搜索（此函数需要手动调用 MCP 工具）
+    执行 Tavily 搜索（使用共享的 Tavily 客户端，配置了分片时并发执行子查询）
 
-    注意：在实际使用中，需要通过 Claude Code 的 Tavily MCP 工具来执行搜索
-    这里返回搜索参数供参考
+    未配置 Tavily API Key 时返回空列表，可改为通过 Claude Code 的 Tavily MCP 工具手动搜索
 
     Args:
-        query: 搜索查询
-        time_range: 时间范围
-        max_results: 最大结果数
+        config: 主配置字典
+        search_config: get_weather_search_config / get_news_search_config 生成的搜索配置
+        count_new: 统计去重后新增条数的函数，提供时按自适应深度搜索
 
     Returns:
         搜索结果列表
     """
-    print(f"\n[搜索] 查询: {query}")
-    print(f"[搜索] 时间范围: {time_range}, 最大结果数: {max_results}")
-    print("[提示] 请在实际运行时通过 Tavily MCP 工具执行此搜索\n")
-
-    # 实际使用时，这里应该调用 Tavily API 或 MCP 工具
-    # 示例返回空列表
+    tavily_key = config.get("tavily_api_key") or os.getenv("TAVILY_API_KEY")
+    if tavily_key:
+        tavily = get_tavily_client(tavily_key, config.get("search"))
+        budget = QueryBudget(config.get("search", {}).get("sharding", {}).get("query_budget"))
+        if count_new:
+            results = tavily.run_adaptive(search_config, count_new, budget)
+        else:
+            results = tavily.run(search_config, budget)
+        print(f"[搜索] 预算: {budget.summary()}")
+        return results
+
+    print("[提示] 未配置 Tavily API Key，请在实际运行时通过 Tavily MCP 工具执行此搜索\n")
     return []
 
 
-def check_weather_alerts(config: Dict, feishu: FeishuSender):
+def commit_search_watermarks(config: Dict, search_config: Dict):
+    """流水线成功后推进增量搜索水位线（未配置 Tavily API Key 时无操作）"""
+    tavily_key = config.get("tavily_api_key") or os.getenv("TAVILY_API_KEY")
+    if tavily_key:
+        get_tavily_client(tavily_key, config.get("search")).commit_watermarks(search_config)
+
+
+def check_weather_alerts(config: Dict, feishu: FeishuRouter):
     """
     检查天气预警并推送（每日推送）
     """
@@ -60,27 +77,29 @@ def check_weather_alerts(config: Dict, feishu: FeishuSender):
     print(f"[天气预警检查] 开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"{'='*60}\n")
 
-    # 获取搜索配置
-    search_config = get_weather_search_config(config)
-
-    # 提示：实际使用时需要通过 Tavily MCP 执行搜索
-    print("[提示] 实际部署时，请使用以下参数调用 Tavily 搜索：")
-    print(f"  - query: {search_config['query']}")
-    print(f"  - time_range: {search_config['time_range']}")
-    print(f"  - max_results: {search_config['max_results']}")
-
-    # 模拟搜索结果（实际使用时替换为真实搜索）
-    search_results = perform_tavily_search(
-        query=search_config["query"],
-        time_range=search_config.get("time_range", "day"),
-        max_results=search_config.get("max_results", 10)
-    )
-
-    # 格式化报告
-    report = format_weather_report(search_results)
-
-    # 推送到飞书（每日推送，即使没有预警）
-    success = feishu.send_message(report, title="欧洲物流天气预警")
+    # 优先使用官方预警源（weather_feeds.enabled），否则走关键词搜索
+    alerts = get_weather_alerts(config)
+    search_results = []
+    if alerts is None:
+        # 获取搜索配置
+        search_config = get_weather_search_config(config)
+
+        # 搜索参数
+        print("[搜索] 参数：")
+        print(f"  - query: {search_config['query']}")
+        print(f"  - time_range: {search_config['time_range']}")
+        print(f"  - max_results: {search_config['max_results']}")
+
+        # 执行 Tavily 搜索
+        search_results = perform_tavily_search(config, search_config)
+
+    # 按去向过滤、格式化报告并推送到飞书（每日推送，即使没有预警）
+    if alerts is not None:
+        success = feishu.dispatch("weather", alerts, lambda subset: format_weather_report([], subset),
+                                  "欧洲物流天气预警", tag_weather_alert)
+    else:
+        success = feishu.dispatch("weather", search_results, format_weather_report,
+                                  "欧洲物流天气预警", tag_weather_result)
 
     if success:
         print("[天气预警] ✅ 推送成功")
@@ -88,7 +107,7 @@ def check_weather_alerts(config: Dict, feishu: FeishuSender):
         print("[天气预警] ❌ 推送失败")
 
 
-def check_logistics_news(config: Dict, feishu: FeishuSender, storage: NewsStorage):
+def check_logistics_news(config: Dict, feishu: FeishuRouter, storage: NewsStorage):
     """
     检查物流新闻并推送（仅推送新增新闻）
     """
@@ -99,44 +118,52 @@ def check_logistics_news(config: Dict, feishu: FeishuSender, storage: NewsStorag
     # 获取搜索配置
     search_config = get_news_search_config(config)
 
-    # 提示：实际使用时需要通过 Tavily MCP 执行搜索
-    print("[提示] 实际部署时，请使用以下参数调用 Tavily 搜索：")
+    # 搜索参数
+    print("[搜索] 参数：")
     print(f"  - query: {search_config['query']}")
     print(f"  - time_range: {search_config['time_range']}")
     print(f"  - max_results: {search_config['max_results']}")
 
-    # 模拟搜索结果（实际使用时替换为真实搜索）
+    # 执行 Tavily 搜索（查询饱和时自动加大深度）
     search_results = perform_tavily_search(
-        query=search_config["query"],
-        time_range=search_config.get("time_range", "day"),
-        max_results=search_config.get("max_results", 15)
+        config, search_config, lambda results: len(storage.get_new_news(extract_news_items(results)))
     )
 
-    # 提取新闻条目
-    all_news = extract_news_items(search_results)
+    # 提取新闻条目，并与 RSS/Atom 订阅源的条目合并
+    all_news = merge_results([extract_news_items(search_results), collect_news(build_news_sources(config))])
 
-    # 过滤出新增新闻
-    new_news = storage.get_new_news(all_news)
+    # 过滤出新增新闻（已在发件箱中等待重发的不再重复推送）
+    new_news = feishu.exclude_pending(storage.get_new_news(all_news))
 
     print(f"[物流新闻] 总共检查: {len(all_news)} 条，新增: {len(new_news)} 条")
 
     # 只有新增新闻时才推送
     if new_news and len(new_news) > 0:
-        report = format_news_report(new_news)
-
-        if report:
-            success = feishu.send_message(report, title="欧洲物流突发事件预警")
-
-            if success:
-                # 推送成功后，记录这些新闻
-                storage.add_sent_news(new_news)
-                print("[物流新闻] ✅ 推送成功，已记录新闻")
-            else:
-                print("[物流新闻] ❌ 推送失败")
+        # 每个去向只推送与其国家/事件类型匹配的新闻，送达后记录
+        success = feishu.dispatch("news", new_news, format_news_report, "欧洲物流突发事件预警", tag_news, storage)
+
+        if success:
+            commit_search_watermarks(config, search_config)
+            print("[物流新闻] ✅ 推送成功，已记录新闻")
+        else:
+            if feishu.outbox:
+                # 未送达的报告已留在发件箱，稍后直接重发，无需重新搜索
+                commit_search_watermarks(config, search_config)
+            print("[物流新闻] ❌ 推送失败")
     else:
+        commit_search_watermarks(config, search_config)
         print("[物流新闻] ℹ️ 没有新增新闻，跳过推送")
 
 
+def run_storage_job(job: Callable, storage: NewsStorage, **kwargs):
+    """
+    在存储事务中执行一次定时任务 job(storage=storage, **kwargs)：本次的存储变更结束时统一写入一次，
+    任务中途异常时仍写入已送达的记录
+    """
+    with storage.transaction():
+        return job(storage=storage, **kwargs)
+
+
 def run_scheduled_tasks(config: Dict):
     """
     运行定时任务
@@ -147,12 +174,14 @@ def run_scheduled_tasks(config: Dict):
     print(f"[配置] 监控国家: {', '.join(config['monitoring']['countries'])}")
 
     # 初始化组件
-    feishu = FeishuSender(config["feishu"])
-    storage = NewsStorage(config["storage"]["sent_news_file"])
+    feishu = FeishuRouter(config["feishu"], config["feishu"].get("max_concurrency", 4))
+    storage = create_storage(config["storage"])
 
-    # 清理旧新闻记录
-    max_history_days = config["storage"].get("max_history_days", 30)
-    storage.cleanup_old_news(max_history_days)
+    # 清理旧新闻记录，并重发发件箱中上次未送达的报告（存储变更统一写入一次）
+    with storage.transaction():
+        storage.cleanup_old_news(config["storage"].get("max_history_days", 30))
+        if feishu.outbox:
+            feishu.drain(storage)
 
     # 设置定时任务
     weather_time = config["monitoring"]["weather_check_time"]
@@ -163,9 +192,17 @@ def run_scheduled_tasks(config: Dict):
     )
 
     schedule.every().day.at(news_time).do(
-        check_logistics_news, config=config, feishu=feishu, storage=storage
+        run_storage_job, check_logistics_news, storage, config=config, feishu=feishu
     )
 
+    # 机器人推送的 token 约 2 小时过期，常驻进程定时检查，临近过期时提前刷新
+    schedule.every(30).minutes.do(feishu.refresh_tokens)
+
+    # 定时重发发件箱中未送达的报告（各报告按自己的退避时间到期后才重发）
+    if feishu.outbox:
+        drain_minutes = config["feishu"].get("outbox", {}).get("drain_interval_minutes", 5)
+        schedule.every(drain_minutes).minutes.do(run_storage_job, feishu.drain, storage)
+
     print(f"\n[就绪] 定时任务已设置")
     print(f"  - 天气预警: 每天 {weather_time}")
     print(f"  - 新闻监控: 每天 {news_time}\n")
@@ -186,14 +223,19 @@ def run_manual_check(config: Dict):
     """
     print("[手动检查] 开始执行...\n")
 
-    feishu = FeishuSender(config["feishu"])
-    storage = NewsStorage(config["storage"]["sent_news_file"])
+    feishu = FeishuRouter(config["feishu"], config["feishu"].get("max_concurrency", 4))
+    storage = create_storage(config["storage"])
+
+    # 存储变更在结束时统一写入一次，中途异常时仍写入已送达的记录，只回滚其余变更
+    with storage.transaction():
+        # 先重发发件箱中上次未送达的报告
+        feishu.drain(storage)
 
-    # 执行天气检查
-    check_weather_alerts(config, feishu)
+        # 执行天气检查
+        check_weather_alerts(config, feishu)
 
-    # 执行新闻检查
-    check_logistics_news(config, feishu, storage)
+        # 执行新闻检查
+        check_logistics_news(config, feishu, storage)
 
     print("\n[手动检查] 完成")
 
@@ -202,6 +244,7 @@ def main():
     """主函数"""
     # 加载配置
     config = load_config()
+    configure_taxonomy(config.get("classifier", {}))
 
     # 检查命令行参数
     if len(sys.argv) > 1 and sys.argv[1] == "--manual":
@@ -12,7 +12,7 @@ from typing import Dict, List
 from weather_monitor import format_weather_report
 from news_monitor import format_news_report, extract_news_items
 from feishu_sender import FeishuSender
-from storage import NewsStorage
+from storage import NewsStorage, create_storage
 
 
 def load_config(config_file: str = "config.json") -> Dict:
@@ -142,7 +142,7 @@ def main():
 
     # 初始化组件
     feishu = FeishuSender(config["feishu"])
-    storage = NewsStorage(config["storage"]["sent_news_file"])
+    storage = create_storage(config["storage"])
 
     # 清理旧新闻记录
     max_history_days = config["storage"].get("max_history_days", 30)
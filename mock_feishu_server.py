@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+飞书开放平台本地替身服务 - 实现自定义机器人 webhook、tenant_access_token 和 im/v1/messages，
+可配置响应延迟、错误注入和按去向限流，用于离线测量 FeishuSender 的吞吐、重试和限流处理
+用法: python mock_feishu_server.py [--port 8766] [--latency-ms 100] [--jitter-ms 30] [--error-rate 0.02]
+                                 [--rate-per-second 5] [--burst 5] [--token-ttl 7200]
+然后设置 FEISHU_API_BASE=http://127.0.0.1:8766/open-apis（机器人方式），
+或把 feishu.webhook_url 设为 http://127.0.0.1:8766/open-apis/bot/v2/hook/<任意 ID>（webhook 方式）
+"""
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from rate_limit import TokenBucket
+
+WEBHOOK_PREFIX = "/open-apis/bot/v2/hook/"
+TOKEN_PATH = "/open-apis/auth/v3/tenant_access_token/internal"
+MESSAGES_PATH = "/open-apis/im/v1/messages"
+
+
+class MockFeishuServer(ThreadingHTTPServer):
+    """飞书开放平台的本地替身"""
+
+    daemon_threads = True
+
+    def __init__(self, address, latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0,
+                 rate_per_second: float = 0, burst: int = 5, token_ttl: int = 7200, seed: Optional[int] = None):
+        """
+        Args:
+            address: (host, port)
+            latency_ms: 平均响应延迟（毫秒）
+            jitter_ms: 延迟抖动（毫秒，均匀分布）
+            error_rate: 返回 5xx 的概率（token 请求除外）
+            rate_per_second: 每个去向（webhook ID 或 chat_id）每秒允许的消息数，0 表示不限流；
+                             超出时 webhook 返回 code 9499，im/v1/messages 返回 HTTP 429 和 code 99991400
+            burst: 限流令牌桶容量
+            token_ttl: 下发的 tenant_access_token 有效秒数，过期后发消息返回 99991663
+            seed: 随机种子
+        """
+        super().__init__(address, MockFeishuHandler)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.token_ttl = token_ttl
+        self.random = random.Random(seed)
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.tokens: Dict[str, float] = {}
+        self.seen_uuids = set()
+        self.stats = {"token": 0, "webhook": 0, "messages": 0, "delivered": 0, "duplicates": 0,
+                      "rate_limited": 0, "errors": 0, "invalid_token": 0}
+        self._lock = threading.Lock()
+
+    def count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def roll(self) -> float:
+        with self._lock:
+            return self.random.random()
+
+    def delay(self) -> float:
+        """本次请求的模拟延迟（秒）"""
+        with self._lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def allow(self, destination: str) -> bool:
+        """按去向限流，未超出频率时返回 True"""
+        if not self.rate_per_second:
+            return True
+        with self._lock:
+            bucket = self.buckets.get(destination)
+            if bucket is None:
+                bucket = self.buckets[destination] = TokenBucket(self.rate_per_second, self.burst)
+        return bucket.try_acquire()
+
+    def retry_after(self) -> str:
+        """限流响应中建议等待的秒数"""
+        return str(max(1, round(1 / self.rate_per_second))) if self.rate_per_second else "1"
+
+    def issue_token(self) -> str:
+        token = f"t-mock-{uuid.uuid4().hex}"
+        with self._lock:
+            self.tokens[token] = time.time() + self.token_ttl
+        return token
+
+    def token_valid(self, token: str) -> bool:
+        with self._lock:
+            return self.tokens.get(token, 0) > time.time()
+
+    def first_delivery(self, message_uuid: Optional[str]) -> bool:
+        """按 uuid 去重：同一 uuid 只投递一次"""
+        if not message_uuid:
+            return True
+        with self._lock:
+            if message_uuid in self.seen_uuids:
+                return False
+            self.seen_uuids.add(message_uuid)
+            return True
+
+
+class MockFeishuHandler(BaseHTTPRequestHandler):
+    """处理 POST /open-apis/bot/v2/hook/<ID>、/open-apis/auth/v3/tenant_access_token/internal 和 /open-apis/im/v1/messages"""
+
+    server: MockFeishuServer
+
+    def _send_json(self, status: int, body: Dict, headers: Dict = None):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _inject_error(self) -> bool:
+        """按 error_rate 返回 5xx"""
+        if self.server.roll() >= self.server.error_rate:
+            return False
+        self.server.count("errors")
+        self._send_json(503, {"code": 1, "msg": "service unavailable"})
+        return True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"code": 9499, "msg": "invalid json"})
+            return
+
+        delay = self.server.delay()
+        if delay:
+            time.sleep(delay)
+
+        path = urlsplit(self.path).path
+        if path.startswith(WEBHOOK_PREFIX):
+            self._webhook(path[len(WEBHOOK_PREFIX):])
+        elif path == TOKEN_PATH:
+            self._token(request)
+        elif path == MESSAGES_PATH:
+            self._message(request)
+        else:
+            self._send_json(404, {"code": 404, "msg": "not found"})
+
+    def _webhook(self, hook_id: str):
+        self.server.count("webhook")
+        if self._inject_error():
+            return
+        if not self.server.allow(f"hook:{hook_id}"):
+            self.server.count("rate_limited")
+            self._send_json(200, {"code": 9499, "msg": "too many request", "data": {}})
+            return
+        self.server.count("delivered")
+        self._send_json(200, {"StatusCode": 0, "StatusMessage": "success", "code": 0, "msg": "success"})
+
+    def _token(self, request: Dict):
+        self.server.count("token")
+        if not request.get("app_id") or not request.get("app_secret"):
+            self._send_json(400, {"code": 10003, "msg": "invalid param"})
+            return
+        self._send_json(200, {"code": 0, "msg": "ok", "tenant_access_token": self.server.issue_token(),
+                              "expire": self.server.token_ttl})
+
+    def _message(self, request: Dict):
+        self.server.count("messages")
+        token = (self.headers.get("Authorization") or "").replace("Bearer ", "", 1)
+        if not self.server.token_valid(token):
+            self.server.count("invalid_token")
+            self._send_json(400, {"code": 99991663, "msg": "Invalid access token for authorization."})
+            return
+        if self._inject_error():
+            return
+        if not self.server.allow(f"chat:{request.get('receive_id')}"):
+            self.server.count("rate_limited")
+            self._send_json(429, {"code": 99991400, "msg": "request trigger frequency limit"},
+                            {"x-ogw-ratelimit-reset": self.server.retry_after()})
+            return
+        if self.server.first_delivery(request.get("uuid")):
+            self.server.count("delivered")
+        else:
+            self.server.count("duplicates")
+        self._send_json(200, {"code": 0, "msg": "success",
+                              "data": {"message_id": f"om_{uuid.uuid4().hex}", "chat_id": request.get("receive_id")}})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, **options) -> MockFeishuServer:
+    """
+    在后台线程中启动替身服务（port=0 时自动分配端口）
+
+    Returns:
+        已启动的服务，server.server_address 为实际监听地址，用完调用 shutdown()
+    """
+    server = MockFeishuServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="mock-feishu", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="飞书开放平台本地替身服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency-ms", type=float, default=0, help="平均响应延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="延迟抖动（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 503 的概率")
+    parser.add_argument("--rate-per-second", type=float, default=0, help="每个去向每秒允许的消息数，0 为不限流")
+    parser.add_argument("--burst", type=int, default=5, help="限流令牌桶容量")
+    parser.add_argument("--token-ttl", type=int, default=7200, help="tenant_access_token 有效秒数")
+    parser.add_argument("--seed", type=int, help="随机种子")
+    args = parser.parse_args()
+
+    server = MockFeishuServer(
+        (args.host, args.port), latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, rate_per_second=args.rate_per_second, burst=args.burst,
+        token_ttl=args.token_ttl, seed=args.seed
+    )
+    base = f"http://{args.host}:{server.server_address[1]}"
+    print(f"[飞书替身] 监听 {base}")
+    print(f"[飞书替身] 机器人方式: FEISHU_API_BASE={base}/open-apis python logistics_alert.py both")
+    print(f"[飞书替身] webhook 方式: feishu.webhook_url = {base}{WEBHOOK_PREFIX}<任意 ID>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n[飞书替身] 已停止，统计: {server.stats}")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
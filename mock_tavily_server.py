@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Tavily 本地替身服务 - 离线回放录制的响应，或按配置的数量、延迟和错误率合成结果
+用法: python mock_tavily_server.py [--port 8765] [--replay recorded.jsonl] [--results 10]
+                                 [--latency-ms 200] [--jitter-ms 50] [--error-rate 0.05]
+然后设置 TAVILY_BASE_URL=http://127.0.0.1:8765（或 config.json 的 search.base_url）运行 logistics_alert.py
+预警源: GET /feeds/<文件名> 提供 --feeds-dir 下的 CAP/Atom 样例（支持 ETag/Last-Modified 条件请求），
+        例如 weather_feeds.feeds.Germany = http://127.0.0.1:8765/feeds/meteoalarm-germany.xml
+录制: 在 config.json 的 search.record_file 中指定文件，真实运行时会把请求和响应追加到该文件
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+from search_cache import make_cache_key
+
+# 默认的预警源样例目录
+FIXTURE_FEEDS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "feeds")
+
+# 合成结果使用的素材
+COUNTRIES = {
+    "Germany": ["Hamburg", "Bremerhaven", "Duisburg", "Frankfurt", "Munich"],
+    "France": ["Le Havre", "Marseille", "Lyon", "Paris", "Lille"],
+    "Netherlands": ["Rotterdam", "Amsterdam", "Venlo", "Tilburg", "Eindhoven"],
+    "Belgium": ["Antwerp", "Zeebrugge", "Liege", "Ghent", "Brussels"],
+    "Poland": ["Gdansk", "Gdynia", "Warsaw", "Poznan", "Lodz"],
+}
+NEWS_EVENTS = [
+    "dock workers strike halts container handling",
+    "warehouse fire disrupts parcel distribution",
+    "rail freight disruption after signal failure",
+    "port closure delays vessel berthing",
+    "truck drivers protest blocks motorway access",
+    "customs system outage causes border delays",
+]
+WEATHER_EVENTS = [
+    "storm warning issued, trucks advised to avoid bridges",
+    "heavy snow closes mountain passes to freight traffic",
+    "extreme rain floods motorway near logistics hub",
+    "high wind alert suspends crane operations",
+    "heatwave prompts driving restrictions for heavy goods vehicles",
+]
+
+
+def _load_recordings(replay_file: str) -> Dict[str, Dict]:
+    """读取 TavilyClient 录制的 JSON-lines 文件，按规范化请求建立索引"""
+    recordings = {}
+    with open(replay_file, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            recordings[make_cache_key(record["request"])] = record["response"]
+    print(f"[Tavily替身] 已加载 {len(recordings)} 条录制响应: {replay_file}")
+    return recordings
+
+
+class MockTavilyServer(ThreadingHTTPServer):
+    """Tavily /search 的本地替身"""
+
+    daemon_threads = True
+
+    def __init__(self, address, replay_file: Optional[str] = None, results: int = 10,
+                 latency_ms: float = 0, jitter_ms: float = 0, error_rate: float = 0.0,
+                 pool_size: int = 200, seed: Optional[int] = None,
+                 feeds_dir: str = FIXTURE_FEEDS_DIR):
+        """
+        Args:
+            address: (host, port)
+            replay_file: 录制文件，命中的请求按原样回放，未命中的请求改为合成
+            results: 每次合成的结果数上限（不超过请求中的 max_results）
+            latency_ms: 平均响应延迟（毫秒）
+            jitter_ms: 延迟抖动（毫秒，均匀分布）
+            error_rate: 返回 429/5xx 的概率
+            pool_size: 每个查询可能出现的不同文章数，决定多次运行间的重复率
+            seed: 随机种子
+            feeds_dir: GET /feeds/<文件名> 提供的预警源文件目录
+        """
+        super().__init__(address, MockTavilyHandler)
+        self.recordings = _load_recordings(replay_file) if replay_file else {}
+        self.results = results
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.pool_size = pool_size
+        self.feeds_dir = feeds_dir
+        self.random = random.Random(seed)
+        self.stats = {"requests": 0, "replayed": 0, "synthesized": 0, "errors": 0, "webhook": 0,
+                      "feeds": 0, "feeds_not_modified": 0}
+        self._lock = threading.Lock()
+
+    def count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def roll(self) -> float:
+        with self._lock:
+            return self.random.random()
+
+    def delay(self) -> float:
+        """本次请求的模拟延迟（秒）"""
+        with self._lock:
+            jitter = self.random.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def synthesize(self, request: Dict) -> Dict:
+        """按查询中的国家和主题合成一组结果"""
+        query = request.get("query", "")
+        countries = [c for c in COUNTRIES if re.search(c, query, re.IGNORECASE)] or list(COUNTRIES)
+        events = WEATHER_EVENTS if re.search(r"weather|storm|snow", query, re.IGNORECASE) else NEWS_EVENTS
+        count = min(self.results, int(request.get("max_results", 10)))
+
+        now = datetime.now(timezone.utc)
+        # 发布时间落在请求的时间窗口内（start_date 或最近 24 小时）
+        window_minutes = 1440
+        if request.get("start_date"):
+            start = datetime.strptime(request["start_date"], "%Y-%m-%d").replace(tzinfo=timezone.utc)
+            window_minutes = max(5, int((now - start).total_seconds() // 60))
+        results = []
+        with self._lock:
+            picks = self.random.sample(range(self.pool_size), min(count, self.pool_size))
+            for article_id in picks:
+                country = countries[article_id % len(countries)]
+                city = COUNTRIES[country][article_id % len(COUNTRIES[country])]
+                event = events[article_id % len(events)]
+                slug = re.sub(r"[^a-z0-9]+", "-", f"{city} {event}".lower()).strip("-")
+                results.append({
+                    "title": f"{city}, {country}: {event} (#{article_id})",
+                    "url": f"https://news.example.com/{country.lower()}/{slug}-{article_id}",
+                    "content": f"{event.capitalize()} in {city}, {country}. Shippers report delays "
+                               f"and carriers are rerouting freight while the situation develops.",
+                    "score": round(self.random.uniform(0.3, 0.99), 3),
+                    "published_date": (now - timedelta(minutes=self.random.randint(5, window_minutes))).isoformat(),
+                })
+        results.sort(key=lambda r: r["score"], reverse=True)
+        return {"query": query, "results": results, "response_time": 0}
+
+
+class MockTavilyHandler(BaseHTTPRequestHandler):
+    """处理 POST /search、GET /feeds/<文件名>（以及供基准测试使用的 POST /webhook 飞书回执）"""
+
+    server: MockTavilyServer
+
+    def _send_json(self, status: int, body: Dict, headers: Dict = None):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if not self.path.startswith("/feeds/"):
+            self._send_json(404, {"detail": "not found"})
+            return
+
+        name = os.path.basename(self.path[len("/feeds/"):].split("?", 1)[0])
+        path = os.path.join(self.server.feeds_dir, name)
+        if not name or not os.path.isfile(path):
+            self._send_json(404, {"detail": "feed not found"})
+            return
+
+        with open(path, "rb") as f:
+            body = f.read()
+        etag = '"%s"' % hashlib.sha1(body).hexdigest()
+        mtime = int(os.path.getmtime(path))
+
+        not_modified = self.headers.get("If-None-Match") == etag
+        if not not_modified and self.headers.get("If-Modified-Since") and not self.headers.get("If-None-Match"):
+            try:
+                not_modified = parsedate_to_datetime(self.headers["If-Modified-Since"]).timestamp() >= mtime
+            except (TypeError, ValueError):
+                pass
+
+        self.send_response(304 if not_modified else 200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", formatdate(mtime, usegmt=True))
+        if not_modified:
+            self.server.count("feeds_not_modified")
+            self.end_headers()
+            return
+        self.server.count("feeds")
+        self.send_header("Content-Type", "application/xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send_json(400, {"detail": "invalid json"})
+            return
+
+        if self.path.startswith("/webhook"):
+            self.server.count("webhook")
+            self._send_json(200, {"StatusCode": 0, "StatusMessage": "success", "code": 0})
+            return
+
+        if self.path.rstrip("/") != "/search":
+            self._send_json(404, {"detail": "not found"})
+            return
+
+        self.server.count("requests")
+        delay = self.server.delay()
+        if delay:
+            time.sleep(delay)
+
+        if self.server.roll() < self.server.error_rate:
+            self.server.count("errors")
+            if self.server.roll() < 0.5:
+                self._send_json(429, {"detail": "rate limited"}, {"Retry-After": "0"})
+            else:
+                self._send_json(503, {"detail": "service unavailable"})
+            return
+
+        request.pop("api_key", None)
+        response = self.server.recordings.get(make_cache_key(request))
+        if response is not None:
+            self.server.count("replayed")
+        else:
+            self.server.count("synthesized")
+            response = self.server.synthesize(request)
+        self._send_json(200, response)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(host: str = "127.0.0.1", port: int = 0, **options) -> MockTavilyServer:
+    """
+    在后台线程中启动替身服务（port=0 时自动分配端口）
+
+    Returns:
+        已启动的服务，server.server_address 为实际监听地址，用完调用 shutdown()
+    """
+    server = MockTavilyServer((host, port), **options)
+    threading.Thread(target=server.serve_forever, name="mock-tavily", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tavily API 本地替身服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--replay", help="TavilyClient 录制的 JSON-lines 文件")
+    parser.add_argument("--results", type=int, default=10, help="每次合成的结果数")
+    parser.add_argument("--pool", type=int, default=200, help="每个查询的文章池大小")
+    parser.add_argument("--latency-ms", type=float, default=0, help="平均响应延迟（毫秒）")
+    parser.add_argument("--jitter-ms", type=float, default=0, help="延迟抖动（毫秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回 429/503 的概率")
+    parser.add_argument("--seed", type=int, help="随机种子")
+    parser.add_argument("--feeds-dir", default=FIXTURE_FEEDS_DIR, help="GET /feeds/ 提供的预警源目录")
+    args = parser.parse_args()
+
+    server = MockTavilyServer(
+        (args.host, args.port), replay_file=args.replay, results=args.results,
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        pool_size=args.pool, seed=args.seed, feeds_dir=args.feeds_dir
+    )
+    print(f"[Tavily替身] 监听 http://{args.host}:{server.server_address[1]}")
+    print(f"[Tavily替身] 使用方式: TAVILY_BASE_URL=http://{args.host}:{server.server_address[1]} "
+          f"python logistics_alert.py both")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n[Tavily替身] 已停止，统计: {server.stats}")
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
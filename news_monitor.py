@@ -4,14 +4,27 @@
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from classifier import get_classifier
 
-def search_logistics_news(countries: List[str] = None, keywords: List[str] = None) -> Dict:
+
+def _split_keywords(keywords: List[str], groups: int) -> List[List[str]]:
+    """把关键词尽量均匀地分成若干组"""
+    if not keywords:
+        return [[]]
+    groups = max(1, min(groups, len(keywords)))
+    return [keywords[i::groups] for i in range(groups)]
+
+
+def search_logistics_news(countries: List[str] = None, keywords: List[str] = None,
+                          sharding: Dict = None) -> Dict:
     """
     搜索欧洲物流相关新闻（罢工、火灾、交通中断等）
 
     Args:
         countries: 要监控的国家列表
         keywords: 搜索关键词列表
+        sharding: 分片搜索配置（config.json 中的 search.sharding），enabled 时按国家
+            （以及可选的关键词组 keyword_groups）拆分子查询
 
     Returns:
         包含搜索配置的字典
@@ -29,13 +42,41 @@ def search_logistics_news(countries: List[str] = None, keywords: List[str] = Non
 
     print(f"[新闻监控] 搜索查询: {query}")
 
-    return {
+    search_config = {
         "query": query,
         "time_range": "day",  # 最近24小时
         "max_results": 15,
-        "search_type": "logistics_news"
+        "search_type": "logistics_news",
+        "incremental": True  # 只搜索上次成功以来的新闻，推送成功后由调用方 commit_watermarks
     }
 
+    if sharding and sharding.get("enabled"):
+        keyword_groups = _split_keywords(keywords, sharding.get("keyword_groups", 1))
+        # 先保证每个国家都有第一组关键词的查询，预算不足时优先跳过靠后的关键词组
+        shards = []
+        for group in keyword_groups:
+            group_str = f" ({' OR '.join(group)})" if group else ""
+            for country in countries:
+                shards.append({
+                    "label": f"{country} / {group[0]}" if group else country,
+                    "query": f"{country} logistics{group_str}"
+                })
+        search_config.update({
+            "shards": shards,
+            "max_results_per_shard": sharding.get("max_results_per_shard", 5),
+            "max_concurrency": sharding.get("max_concurrency", 4),
+            "max_merged_results": sharding.get("max_merged_results", 30)
+        })
+        print(f"[新闻监控] 分片搜索: {len(shards)} 个子查询")
+    else:
+        # 合并查询饱和时（已达最大深度）按国家追加的子查询
+        search_config["followups"] = [
+            {"label": country, "query": f"{country} logistics ({keywords_str})"}
+            for country in countries
+        ]
+
+    return search_config
+
 
 def format_news_report(new_news: List[Dict]) -> Optional[str]:
     """
@@ -64,40 +105,17 @@ def format_news_report(new_news: List[Dict]) -> Optional[str]:
     medium_count = sum(1 for n in new_news if 0.5 < n.get("score", 0) <= 0.8)
     low_count = len(new_news) - high_count - medium_count
 
-    # 事件类型分析
+    # 国家和事件类型分析（每条新闻只扫描一次）
+    classifier = get_classifier()
     countries_affected = set()
-    event_types = {}
+    event_counts = {}
 
     for news in new_news:
-        title = news.get("title", "").lower()
-        content = news.get("content", "").lower()
-        full_text = title + " " + content
-
-        # 国家
-        if "germany" in full_text or "german" in full_text or "hamburg" in full_text:
-            countries_affected.add("德国")
-        if "france" in full_text or "french" in full_text:
-            countries_affected.add("法国")
-        if "netherlands" in full_text or "dutch" in full_text or "rotterdam" in full_text:
-            countries_affected.add("荷兰")
-        if "belgium" in full_text or "belgian" in full_text:
-            countries_affected.add("比利时")
-        if "poland" in full_text or "polish" in full_text:
-            countries_affected.add("波兰")
-
-        # 事件类型
-        if "strike" in full_text:
-            event_types["罢工"] = event_types.get("罢工", 0) + 1
-        if "fire" in full_text:
-            event_types["火灾"] = event_types.get("火灾", 0) + 1
-        if "port" in full_text or "harbour" in full_text or "harbor" in full_text:
-            event_types["港口问题"] = event_types.get("港口问题", 0) + 1
-        if "warehouse" in full_text:
-            event_types["仓库事故"] = event_types.get("仓库事故", 0) + 1
-        if "disruption" in full_text or "delay" in full_text:
-            event_types["运输中断"] = event_types.get("运输中断", 0) + 1
-        if "closure" in full_text or "closed" in full_text:
-            event_types["关闭/封闭"] = event_types.get("关闭/封闭", 0) + 1
+        tags = classifier.classify(news)
+        countries_affected.update(tags.countries)
+        for event in classifier.news_events:
+            if event in tags.events:
+                event_counts[event] = event_counts.get(event, 0) + 1
 
     # 生成中文总结
     report += "## 📋 今日总结\n\n"
@@ -115,11 +133,12 @@ def format_news_report(new_news: List[Dict]) -> Optional[str]:
 
     # 涉及国家
     if countries_affected:
-        report += f"**涉及国家：** {' | '.join(sorted(countries_affected))}\n\n"
+        report += f"**涉及国家：** {' | '.join(classifier.country_labels(countries_affected))}\n\n"
 
     # 事件类型
-    if event_types:
-        type_list = [f"{k}({v}条)" for k, v in sorted(event_types.items(), key=lambda x: x[1], reverse=True)]
+    if event_counts:
+        type_list = [f"{classifier.news_events[k]}({v}条)"
+                     for k, v in sorted(event_counts.items(), key=lambda x: x[1], reverse=True)]
         report += f"**事件类型：** {' | '.join(type_list)}\n\n"
 
     # 整体描述
@@ -127,17 +146,17 @@ def format_news_report(new_news: List[Dict]) -> Optional[str]:
 
     summary_parts = []
 
-    # 按类型生成描述
-    if "罢工" in event_types:
-        summary_parts.append(f"监控到 {event_types['罢工']} 起罢工事件，可能影响港口和运输效率")
+    # 按类型生成描述（按 taxonomy.json 中的事件键判断，不依赖中文名）
+    if "strike" in event_counts:
+        summary_parts.append(f"监控到 {event_counts['strike']} 起罢工事件，可能影响港口和运输效率")
 
-    if "火灾" in event_types:
-        summary_parts.append(f"发生 {event_types['火灾']} 起仓库或设施火灾，相关物流节点受影响")
+    if "fire" in event_counts:
+        summary_parts.append(f"发生 {event_counts['fire']} 起仓库或设施火灾，相关物流节点受影响")
 
-    if "港口问题" in event_types:
-        summary_parts.append(f"{event_types['港口问题']} 个港口出现运营问题，可能导致货物延误")
+    if "port" in event_counts:
+        summary_parts.append(f"{event_counts['port']} 个港口出现运营问题，可能导致货物延误")
 
-    if "运输中断" in event_types or "关闭/封闭" in event_types:
+    if "disruption" in event_counts or "closure" in event_counts:
         summary_parts.append("部分运输路线或设施受阻，建议寻找替代方案")
 
     for part in summary_parts:
@@ -199,8 +218,9 @@ def get_news_search_config(config: Dict) -> Dict:
     monitoring = config.get("monitoring", {})
     countries = monitoring.get("countries", ["Germany"])
     keywords = monitoring.get("news_keywords", [])
+    sharding = config.get("search", {}).get("sharding")
 
-    return search_logistics_news(countries, keywords)
+    return search_logistics_news(countries, keywords, sharding)
 
 
 def extract_news_items(search_results: List[Dict]) -> List[Dict]:
@@ -0,0 +1,250 @@
+"""
+新闻来源模块 - 可插拔的新闻来源（Tavily 搜索、RSS/Atom 订阅源），统一输出 extract_news_items 的条目格式
+"""
+import html
+import re
+import xml.etree.ElementTree as ET
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, IO, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from http_fetch import ConditionalFetcher
+from news_monitor import extract_news_items
+from search_state import parse_published_date
+from tavily_client import QueryBudget, TavilyClient, merge_results
+
+_TAGS = re.compile(r"<[^>]+>")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class NewsSource(ABC):
+    """新闻来源接口：fetch() 返回 {title, url, content, score} 条目列表；用完后 close()（或用 with）释放连接"""
+
+    name = "source"
+
+    @abstractmethod
+    def fetch(self) -> List[Dict]:
+        """获取条目"""
+
+    def close(self):
+        """释放来源持有的资源（默认无需释放）"""
+
+    def __enter__(self) -> "NewsSource":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class TavilyNewsSource(NewsSource):
+    """Tavily 搜索来源（配置了 count_new 时按自适应深度搜索）"""
+
+    name = "Tavily"
+
+    def __init__(self, client: TavilyClient, search_config: Dict, budget: QueryBudget = None,
+                 count_new: Callable[[List[Dict]], int] = None):
+        """
+        Args:
+            client: Tavily 客户端
+            search_config: get_news_search_config 生成的搜索配置
+            budget: 本次运行的查询预算
+            count_new: 统计去重后新增条数的函数
+        """
+        self.client = client
+        self.search_config = search_config
+        self.budget = budget
+        self.count_new = count_new
+
+    def fetch(self) -> List[Dict]:
+        if self.count_new:
+            results = self.client.run_adaptive(self.search_config, self.count_new, self.budget)
+        else:
+            results = self.client.run(self.search_config, self.budget)
+        return extract_news_items(results)
+
+
+def _clean_text(value: str, limit: int = 500) -> str:
+    """去掉 HTML 标签和多余空白"""
+    text = _WHITESPACE.sub(" ", html.unescape(_TAGS.sub(" ", value or ""))).strip()
+    return text[:limit]
+
+
+def parse_feed(stream: IO[bytes]) -> List[Dict]:
+    """
+    流式解析 RSS 2.0 / Atom 订阅源，每处理完一个 item/entry 即释放
+
+    Returns:
+        条目列表：title, url, content, published_date
+    """
+    entries = []
+    fields: Dict[str, str] = {}
+    in_item = False
+    # 当前元素的祖先链：RSS 的 item 挂在 channel 下，Atom 的 entry 挂在 feed 下
+    parents: List[ET.Element] = []
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        name = elem.tag.rsplit("}", 1)[-1]
+        if event == "start":
+            parents.append(elem)
+            if name in ("item", "entry"):
+                fields, in_item = {}, True
+            continue
+
+        parents.pop()
+        if not in_item:
+            continue
+
+        if not in_item:
+            continue
+
+        if name in ("item", "entry"):
+            if fields.get("title") and fields.get("link"):
+                entries.append({
+                    "title": _clean_text(fields["title"], 300),
+                    "url": fields["link"].strip(),
+                    "content": _clean_text(fields.get("description") or fields.get("summary")
+                                           or fields.get("content", "")),
+                    "published_date": fields.get("pubDate") or fields.get("published")
+                                      or fields.get("updated") or fields.get("date", ""),
+                })
+            fields, in_item = {}, False
+            # 释放处理完的条目，并从父元素（channel/feed）上摘除已处理的子元素
+            elem.clear()
+            if parents:
+                parents[-1].clear()
+        elif name == "link" and elem.get("href"):
+            # Atom：优先 rel="alternate"（缺省即 alternate）
+            if elem.get("rel", "alternate") == "alternate":
+                fields.setdefault("link", elem.get("href"))
+        elif elem.text and elem.text.strip():
+            fields.setdefault(name, elem.text.strip())
+
+    return entries
+
+
+class RSSFeedSource(NewsSource):
+    """RSS/Atom 订阅源：有界线程池并发拉取，条件 GET，按关键词和时间过滤"""
+
+    name = "RSS"
+
+    def __init__(self, feeds: List[Dict], fetcher: ConditionalFetcher, keywords: List[str] = None,
+                 max_age_hours: float = 48, max_concurrency: int = 8):
+        """
+        Args:
+            feeds: 订阅源列表，每项包含 name、url，可选 score（默认 0.6）和 filter（是否按关键词过滤，默认 True）
+            fetcher: 条件请求器
+            keywords: 过滤关键词（标题或摘要包含任一关键词才保留），为空时不过滤
+            max_age_hours: 只保留该时间内发布的条目（没有发布时间的条目保留）
+            max_concurrency: 同时拉取的订阅源数
+        """
+        self.feeds = feeds
+        self.fetcher = fetcher
+        self.max_age = timedelta(hours=max_age_hours)
+        self.max_concurrency = max_concurrency
+        self.keyword_pattern = re.compile(
+            "|".join(re.escape(k) for k in keywords), re.IGNORECASE
+        ) if keywords else None
+
+    def _fetch_feed(self, feed: Dict) -> List[Dict]:
+        entries, changed = self.fetcher.fetch(feed["url"], parse_feed)
+        cutoff = datetime.now(timezone.utc) - self.max_age
+        items = []
+        for entry in entries:
+            published = parse_published_date(entry.get("published_date", ""))
+            if published is not None and published < cutoff:
+                continue
+            if (self.keyword_pattern and feed.get("filter", True)
+                    and not self.keyword_pattern.search(f"{entry['title']} {entry['content']}")):
+                continue
+            items.append({
+                "title": entry["title"],
+                "url": entry["url"],
+                "content": entry["content"],
+                "score": feed.get("score", 0.6),
+            })
+        print(f"[RSS] {feed.get('name', feed['url'])}: {len(entries)} 条，保留 {len(items)} 条"
+              f"{'' if changed else '（沿用上次结果）'}")
+        return items
+
+    def fetch(self) -> List[Dict]:
+        if not self.feeds:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(self.feeds))),
+                                thread_name_prefix="rss-feed") as pool:
+            return [item for items in pool.map(self._fetch_feed, self.feeds) for item in items]
+
+    def close(self):
+        """关闭订阅源专用的 HTTP 会话"""
+        self.fetcher.close()
+
+
+def build_news_sources(config: Dict, tavily: Optional[TavilyClient] = None, search_config: Dict = None,
+                       budget: QueryBudget = None,
+                       count_new: Callable[[List[Dict]], int] = None) -> List[NewsSource]:
+    """
+    按 config.json 的 news_sources 配置创建新闻来源
+
+    Args:
+        config: 主配置字典
+        tavily: Tavily 客户端，None 时不使用 Tavily 来源
+        search_config: get_news_search_config 生成的搜索配置
+        budget: 本次运行的查询预算
+        count_new: 统计去重后新增条数的函数（用于 Tavily 自适应深度）
+
+    Returns:
+        新闻来源列表
+    """
+    source_config = config.get("news_sources", {})
+    sources: List[NewsSource] = []
+
+    if tavily and search_config and source_config.get("tavily", {}).get("enabled", True):
+        sources.append(TavilyNewsSource(tavily, search_config, budget, count_new))
+
+    rss_config = source_config.get("rss", {})
+    if rss_config.get("enabled") and rss_config.get("feeds"):
+        max_concurrency = rss_config.get("max_concurrency", 8)
+        session = requests.Session()
+        session.mount("https://", HTTPAdapter(pool_maxsize=max_concurrency))
+        session.mount("http://", HTTPAdapter(pool_maxsize=max_concurrency))
+        session.headers.update({"User-Agent": "logistics-alert/1.0 (+RSS reader)"})
+        fetcher = ConditionalFetcher(rss_config.get("cache_file", "feed_cache.json"),
+                                     read_timeout=rss_config.get("timeout", 20), session=session)
+        keywords = config.get("monitoring", {}).get("news_keywords", []) if rss_config.get("filter_keywords", True) else []
+        sources.append(RSSFeedSource(rss_config["feeds"], fetcher, keywords,
+                                     rss_config.get("max_age_hours", 48), max_concurrency))
+
+    return sources
+
+
+def collect_news(sources: List[NewsSource]) -> List[Dict]:
+    """
+    并发执行所有来源，按规范化 URL 合并去重，完成后关闭各来源
+
+    Returns:
+        合并后的新闻条目（extract_news_items 格式），按得分降序
+    """
+    if not sources:
+        return []
+
+    def fetch(source: NewsSource) -> List[Dict]:
+        try:
+            return source.fetch()
+        except Exception as e:
+            print(f"[新闻来源] ❌ {source.name} 获取失败: {e}")
+            return []
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(sources), thread_name_prefix="news-source") as pool:
+            item_lists = list(pool.map(fetch, sources))
+    finally:
+        for source in sources:
+            source.close()
+
+    merged = merge_results(item_lists)
+    counts = "，".join(f"{source.name} {len(items)} 条" for source, items in zip(sources, item_lists))
+    print(f"[新闻来源] {counts}，合并后 {len(merged)} 条")
+    return merged
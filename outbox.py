@@ -0,0 +1,169 @@
+"""
+发件箱模块 - 推送前先把渲染好的报告写入磁盘，送达后删除；失败的报告按退避时间重试，不必重新搜索
+
+报告送达但其中的新闻尚未确认写入存储时，条目标记为已送达并保留，之后只补记新闻、不再重发
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional
+
+from file_lock import file_lock
+from fingerprint import url_fingerprint
+
+# 正在发送的报告在该时间（秒）内不会被其他进程重复取出
+SEND_LEASE_SECONDS = 300
+
+
+class Outbox:
+    """持久化的待发报告，多个进程共用同一个发件箱文件"""
+
+    def __init__(self, outbox_file: str = "outbox.json", backoff_base: float = 60, backoff_max: float = 3600,
+                 max_age_hours: float = 72):
+        """
+        Args:
+            outbox_file: 发件箱文件路径
+            backoff_base: 首次重试前等待的秒数，之后每次失败翻倍
+            backoff_max: 重试等待上限（秒）
+            max_age_hours: 超过该时间仍未送达的报告放弃重试（会输出日志），add 时可按报告单独指定
+        """
+        self.outbox_file = outbox_file
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_age = max_age_hours * 3600
+        self._lock = threading.Lock()
+
+    def _load(self) -> List[Dict]:
+        if not os.path.exists(self.outbox_file):
+            return []
+        try:
+            with open(self.outbox_file, "r", encoding="utf-8") as f:
+                return json.load(f).get("entries", [])
+        except Exception as e:
+            print(f"[发件箱] 读取发件箱文件失败: {e}")
+            return []
+
+    def _save(self, entries: List[Dict]) -> bool:
+        """原子写入发件箱文件"""
+        directory = os.path.dirname(os.path.abspath(self.outbox_file))
+        fd, tmp_path = tempfile.mkstemp(prefix=".outbox.", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "entries": entries}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.outbox_file)
+            return True
+        except Exception as e:
+            print(f"[发件箱] 保存发件箱文件失败: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def _modify(self, func: Callable[[List[Dict]], Any]) -> Any:
+        """在文件锁内重新读取、修改并写回（保留其他进程的改动）"""
+        with self._lock:
+            with file_lock(self.outbox_file + ".lock"):
+                entries = self._load()
+                result = func(entries)
+                self._save(entries)
+                return result
+
+    def add(self, destination: str, title: str, content: str, news: List[Dict] = None,
+            max_age_hours: Optional[float] = None) -> Dict:
+        """
+        推送前写入一份报告
+
+        Args:
+            destination: 去向名称
+            title: 卡片标题
+            content: 渲染好的报告
+            news: 报告包含的新闻条目，送达后记录为已推送
+            max_age_hours: 该报告超过多久未送达即放弃重试，None 表示使用发件箱的 max_age_hours
+                           （时效短的报告如每日天气预警应设置较短的时间）
+
+        Returns:
+            发件箱条目，其 id 作为推送的幂等键
+        """
+        now = time.time()
+        entry = {
+            "id": uuid.uuid4().hex,
+            "destination": destination,
+            "title": title,
+            "content": content,
+            "news": news or [],
+            "created_at": now,
+            "expires_at": now + (self.max_age if max_age_hours is None else max_age_hours * 3600),
+            "attempts": 0,
+            "delivered": False,
+            "next_attempt_at": now + SEND_LEASE_SECONDS,
+        }
+        self._modify(lambda entries: entries.append(entry))
+        return entry
+
+    def remove(self, entry_id: str):
+        """送达后删除"""
+        def remove(entries):
+            entries[:] = [e for e in entries if e["id"] != entry_id]
+        self._modify(remove)
+
+    def mark_delivered(self, entry_id: str):
+        """
+        报告送达后立即标记（写盘），之后 due 取出该条目时不再重发，只补记其中的新闻
+
+        webhook 方式没有幂等键，送达后、新闻写入存储前中断时靠这个标记避免重复推送
+        """
+        def mark(entries):
+            for entry in entries:
+                if entry["id"] == entry_id:
+                    entry["delivered"] = True
+        self._modify(mark)
+
+    def fail(self, entry_id: str):
+        """记录一次失败，按指数退避安排下次重试"""
+        def fail(entries):
+            for entry in entries:
+                if entry["id"] == entry_id:
+                    entry["attempts"] += 1
+                    delay = min(self.backoff_max, self.backoff_base * 2 ** (entry["attempts"] - 1))
+                    entry["next_attempt_at"] = time.time() + delay
+                    print(f"[发件箱] ⚠️ {entry['destination']} · {entry['title']} 未送达，"
+                          f"{delay:.0f} 秒后重试（第 {entry['attempts']} 次失败）")
+        self._modify(fail)
+
+    def due(self) -> List[Dict]:
+        """
+        取出到了重试时间的条目和已送达待补记的条目（超过有效期仍未送达的条目直接放弃），
+        取出的条目在发送期间不会被其他进程再次取出
+
+        Returns:
+            按写入顺序排列的条目，已送达的条目 delivered 为 True
+        """
+        now = time.time()
+
+        def due(entries):
+            expired = [e for e in entries if not e.get("delivered")
+                       and now > e.get("expires_at", e["created_at"] + self.max_age)]
+            for entry in expired:
+                max_age = entry.get("expires_at", entry["created_at"] + self.max_age) - entry["created_at"]
+                print(f"[发件箱] ❌ 放弃重试（超过 {max_age / 3600:.0f} 小时未送达）: "
+                      f"{entry['destination']} · {entry['title']}，包含新闻 {len(entry['news'])} 条")
+            entries[:] = [e for e in entries if e not in expired]
+            ready = [e for e in entries if e.get("delivered") or e["next_attempt_at"] <= now]
+            for entry in ready:
+                entry["next_attempt_at"] = now + SEND_LEASE_SECONDS
+            return [dict(e) for e in ready]
+
+        return self._modify(due)
+
+    def pending_urls(self) -> set:
+        """仍在发件箱中的新闻 URL 指纹（这些新闻已经有报告在等待重试）"""
+        with self._lock:
+            entries = self._load()
+        return {url_fingerprint(news.get("url", "")) for entry in entries for news in entry["news"]}
+
+    def size(self) -> int:
+        """发件箱中的报告数"""
+        with self._lock:
+            return len(self._load())
@@ -0,0 +1,52 @@
+"""
+限速模块 - 线程安全的令牌桶
+"""
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """令牌桶：以 rate 个/秒的速度补充令牌，最多积攒 capacity 个，允许短时突发"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Args:
+            rate: 每秒补充的令牌数
+            capacity: 桶容量（允许的突发请求数），默认等于 max(1, rate)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self) -> bool:
+        """立即尝试取一个令牌，没有可用令牌时返回 False"""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return True
+            return False
+
+    def acquire(self) -> float:
+        """
+        取一个令牌，不够时阻塞等待
+
+        Returns:
+            实际等待的秒数
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            # 先预扣令牌再在锁外等待，并发调用方按到达顺序依次排队
+            self.tokens -= 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        if wait > 0:
+            time.sleep(wait)
+        return wait
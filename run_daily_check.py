@@ -11,9 +11,13 @@ from typing import Dict, List
 
 # 导入自定义模块
 from weather_monitor import format_weather_report, get_weather_search_config
+from weather_feeds import get_weather_alerts
+from news_sources import build_news_sources, collect_news
 from news_monitor import format_news_report, extract_news_items, get_news_search_config
-from feishu_sender import FeishuSender
-from storage import NewsStorage
+from classifier import configure_taxonomy
+from feishu_router import FeishuRouter, tag_news, tag_weather_alert, tag_weather_result
+from storage import create_storage
+from tavily_client import QueryBudget, get_tavily_client
 
 
 def load_config(config_file: str = "config.json") -> Dict:
@@ -41,89 +45,102 @@ def main(check_type: str = "both"):
 
     # 加载配置
     config = load_config()
+    configure_taxonomy(config.get("classifier", {}))
 
     # 初始化组件
-    feishu = FeishuSender(config["feishu"])
-    storage = NewsStorage(config["storage"]["sent_news_file"])
-
-    # 清理旧新闻记录
-    storage.cleanup_old_news(config["storage"].get("max_history_days", 30))
-
-    # ========== 天气预警检查 ==========
-    if check_type in ["weather", "both"]:
-        print("\n[1/2] 检查天气预警...")
-
-        weather_config = get_weather_search_config(config)
-
-        print(f"\n⚠️ 注意：此脚本需要集成 Tavily API")
-        print(f"搜索参数：")
-        print(f"  - Query: {weather_config['query']}")
-        print(f"  - Time Range: {weather_config['time_range']}")
-        print(f"  - Max Results: {weather_config['max_results']}")
-        print(f"\n请在实际部署时：")
-        print(f"  1. 注册 Tavily API (https://tavily.com)")
-        print(f"  2. 在配置文件中添加 TAVILY_API_KEY")
-        print(f"  3. 取消注释下方的搜索代码\n")
-
-        # TODO: 取消注释以启用实际搜索
-        # import requests
-        # tavily_key = config.get("tavily_api_key")
-        # response = requests.post(
-        #     "https://api.tavily.com/search",
-        #     json={
-        #         "api_key": tavily_key,
-        #         "query": weather_config["query"],
-        #         "search_depth": "basic",
-        #         "max_results": weather_config["max_results"]
-        #     }
-        # )
-        # weather_results = response.json().get("results", [])
-
-        # 示例：使用空结果（实际部署时替换）
-        weather_results = []
-        weather_report = format_weather_report(weather_results)
-
-        # 推送到飞书
-        if feishu.send_message(weather_report, title="欧洲物流天气预警"):
-            print("[天气预警] ✅ 推送成功")
-        else:
-            print("[天气预警] ❌ 推送失败")
-
-    # ========== 物流新闻检查 ==========
-    if check_type in ["news", "both"]:
-        print("\n[2/2] 检查物流新闻...")
-
-        news_config = get_news_search_config(config)
-
-        print(f"\n搜索参数：")
-        print(f"  - Query: {news_config['query']}")
-        print(f"  - Time Range: {news_config['time_range']}")
-        print(f"  - Max Results: {news_config['max_results']}\n")
-
-        # TODO: 取消注释以启用实际搜索
-        # news_results = []  # 替换为实际 Tavily API 调用
-
-        # 示例：使用空结果
-        news_results = []
-        all_news = extract_news_items(news_results)
-        new_news = storage.get_new_news(all_news)
-
-        print(f"[物流新闻] 总共检查: {len(all_news)} 条，新增: {len(new_news)} 条")
-
-        if new_news and len(new_news) > 0:
-            news_report = format_news_report(new_news)
-
-            if news_report:
-                if feishu.send_message(news_report, title="欧洲物流突发事件预警"):
-                    storage.add_sent_news(new_news)
+    feishu = FeishuRouter(config["feishu"], config["feishu"].get("max_concurrency", 4))
+    storage = create_storage(config["storage"])
+    tavily_key = config.get("tavily_api_key") or os.getenv("TAVILY_API_KEY")
+    tavily = get_tavily_client(tavily_key, config.get("search")) if tavily_key else None
+    budget = QueryBudget(config.get("search", {}).get("sharding", {}).get("query_budget"))
+
+    # 本次运行的存储变更在结束时统一写入一次，中途异常时仍写入已送达的记录，只回滚其余变更
+    with storage.transaction():
+        # 清理旧新闻记录
+        storage.cleanup_old_news(config["storage"].get("max_history_days", 30))
+
+        # 先重发发件箱中上次未送达的报告
+        feishu.drain(storage)
+
+        # ========== 天气预警检查 ==========
+        if check_type in ["weather", "both"]:
+            print("\n[1/2] 检查天气预警...")
+
+            weather_config = get_weather_search_config(config)
+            alerts = get_weather_alerts(config)
+
+            if alerts is None:
+                print(f"搜索参数：")
+                print(f"  - Query: {weather_config['query']}")
+                print(f"  - Time Range: {weather_config['time_range']}")
+                print(f"  - Max Results: {weather_config['max_results']}")
+
+            if alerts is not None:
+                weather_results = []
+            elif tavily:
+                weather_results = tavily.run(weather_config, budget)
+            else:
+                print(f"\n⚠️ 注意：未配置 Tavily API Key，使用空结果")
+                print(f"  1. 注册 Tavily API (https://tavily.com)")
+                print(f"  2. 在配置文件中添加 tavily_api_key 或设置环境变量 TAVILY_API_KEY\n")
+                weather_results = []
+
+            # 按去向过滤、格式化报告并推送到飞书
+            if alerts is not None:
+                sent = feishu.dispatch("weather", alerts, lambda subset: format_weather_report([], subset),
+                                       "欧洲物流天气预警", tag_weather_alert)
+            else:
+                sent = feishu.dispatch("weather", weather_results, format_weather_report,
+                                       "欧洲物流天气预警", tag_weather_result)
+            if sent:
+                print("[天气预警] ✅ 推送成功")
+            else:
+                print("[天气预警] ❌ 推送失败")
+
+        # ========== 物流新闻检查 ==========
+        if check_type in ["news", "both"]:
+            print("\n[2/2] 检查物流新闻...")
+
+            news_config = get_news_search_config(config)
+
+            print(f"\n搜索参数：")
+            print(f"  - Query: {news_config['query']}")
+            print(f"  - Time Range: {news_config['time_range']}")
+            print(f"  - Max Results: {news_config['max_results']}\n")
+
+            # Tavily 搜索与 RSS/Atom 订阅源并发获取，未配置 Tavily 时只使用订阅源
+            sources = build_news_sources(
+                config, tavily, news_config, budget,
+                lambda results: len(storage.get_new_news(extract_news_items(results)))
+            )
+            all_news = collect_news(sources)
+            new_news = feishu.exclude_pending(storage.get_new_news(all_news))
+
+            print(f"[物流新闻] 总共检查: {len(all_news)} 条，新增: {len(new_news)} 条")
+
+            if new_news and len(new_news) > 0:
+                if feishu.dispatch("news", new_news, format_news_report, "欧洲物流突发事件预警", tag_news, storage):
+                    if tavily:
+                        tavily.commit_watermarks(news_config)
                     print("[物流新闻] ✅ 推送成功，已记录新闻")
                 else:
+                    # 未送达的报告已留在发件箱，下次运行直接重发，无需重新搜索
+                    if tavily and feishu.outbox:
+                        tavily.commit_watermarks(news_config)
                     print("[物流新闻] ❌ 推送失败")
-        else:
-            print("[物流新闻] ℹ️ 没有新增新闻，跳过推送")
+            else:
+                if tavily:
+                    tavily.commit_watermarks(news_config)
+                print("[物流新闻] ℹ️ 没有新增新闻，跳过推送")
 
     print("\n" + "="*60)
     print("检查完成")
+    if tavily:
+        print(f"搜索预算: {budget.summary()}")
+        if tavily.governor:
+            print(f"搜索额度: {tavily.governor.summary()}")
+    for line in feishu.summary():
+        print(f"飞书推送: {line}")
     print("="*60)
 
 
@@ -6,16 +6,15 @@
 import json
 import sys
 import os
-import requests
 import schedule
 import time
 from datetime import datetime
-from typing import Dict, List
 
 from weather_monitor import format_weather_report
 from news_monitor import format_news_report, extract_news_items
 from feishu_sender import FeishuSender
-from storage import NewsStorage
+from storage import create_storage
+from tavily_client import QueryBudget, get_tavily_client
 
 
 def load_config():
@@ -28,27 +27,6 @@ def load_config():
         sys.exit(1)
 
 
-def search_with_tavily(api_key: str, query: str, max_results: int = 10) -> List[Dict]:
-    """Tavily 搜索"""
-    url = "https://api.tavily.com/search"
-    data = {
-        "api_key": api_key,
-        "query": query,
-        "search_depth": "basic",
-        "max_results": max_results,
-        "days": 1
-    }
-
-    try:
-        response = requests.post(url, headers={"Content-Type": "application/json"}, json=data, timeout=30)
-        if response.status_code == 200:
-            return response.json().get("results", [])
-        return []
-    except Exception as e:
-        print(f"[搜索异常] {e}")
-        return []
-
-
 def check_weather():
     """天气检查任务"""
     print("\n" + "="*60)
@@ -62,7 +40,10 @@ def check_weather():
     keywords = " ".join(config["monitoring"]["weather_keywords"])
     query = f"({countries}) logistics transport weather {keywords}"
 
-    results = search_with_tavily(config["tavily_api_key"], query, 10)
+    tavily = get_tavily_client(config["tavily_api_key"], config.get("search"))
+    budget = QueryBudget(config.get("search", {}).get("sharding", {}).get("query_budget"))
+    results = tavily.search(query, time_range="day", max_results=10, budget=budget)
+    print(f"搜索预算: {budget.summary()}")
     report = format_weather_report(results)
 
     if feishu.send_message(report, title="欧洲物流天气预警"):
@@ -79,13 +60,16 @@ def check_news():
 
     config = load_config()
     feishu = FeishuSender(config["feishu"])
-    storage = NewsStorage(config["storage"]["sent_news_file"])
+    storage = create_storage(config["storage"])
 
     countries = " OR ".join(config["monitoring"]["countries"])
     keywords = " OR ".join(config["monitoring"]["news_keywords"])
     query = f"({countries}) logistics ({keywords})"
 
-    results = search_with_tavily(config["tavily_api_key"], query, 15)
+    tavily = get_tavily_client(config["tavily_api_key"], config.get("search"))
+    budget = QueryBudget(config.get("search", {}).get("sharding", {}).get("query_budget"))
+    results = tavily.search(query, time_range="day", max_results=15, budget=budget)
+    print(f"搜索预算: {budget.summary()}")
     all_news = extract_news_items(results)
     new_news = storage.get_new_news(all_news)
 
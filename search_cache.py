@@ -0,0 +1,108 @@
+"""
+搜索缓存模块 - Tavily 响应的磁盘 TTL 缓存（LRU 淘汰）
+"""
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+def make_cache_key(request: Dict) -> str:
+    """
+    根据规范化后的请求参数生成缓存键
+
+    查询字符串忽略大小写和多余空白，其余参数按键排序后参与哈希
+    """
+    normalized = dict(request)
+    normalized["query"] = " ".join(str(request.get("query", "")).split()).casefold()
+    payload = json.dumps(normalized, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SearchCache:
+    """基于 SQLite 的搜索响应缓存：条目超过 TTL 即失效，条目数超过上限时淘汰最久未使用的"""
+
+    def __init__(self, cache_file: str = "search_cache.db", ttl_seconds: float = 3600,
+                 max_entries: int = 500):
+        """
+        初始化缓存
+
+        Args:
+            cache_file: SQLite 缓存文件路径
+            ttl_seconds: 缓存有效期（秒）
+            max_entries: 最多保留的条目数
+        """
+        self.cache_file = cache_file
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(cache_file, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS search_cache ("
+                "key TEXT PRIMARY KEY, "
+                "response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, "
+                "last_access REAL NOT NULL)"
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_search_cache_last_access ON search_cache(last_access)"
+            )
+
+    def get(self, key: str) -> Optional[List[Dict]]:
+        """读取未过期的缓存结果，未命中返回 None"""
+        now = time.time()
+        with self._lock:
+            try:
+                row = self.conn.execute(
+                    "SELECT response, created_at FROM search_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None or now - row[1] > self.ttl_seconds:
+                    if row is not None:
+                        with self.conn:
+                            self.conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                    self.misses += 1
+                    return None
+
+                with self.conn:
+                    self.conn.execute("UPDATE search_cache SET last_access = ? WHERE key = ?", (now, key))
+                self.hits += 1
+                return json.loads(row[0])
+            except Exception as e:
+                print(f"[搜索缓存] 读取失败: {e}")
+                self.misses += 1
+                return None
+
+    def put(self, key: str, results: List[Dict]):
+        """写入缓存，并在超过容量时按最近访问时间淘汰"""
+        now = time.time()
+        with self._lock:
+            try:
+                with self.conn:
+                    self.conn.execute(
+                        "INSERT OR REPLACE INTO search_cache (key, response, created_at, last_access) "
+                        "VALUES (?, ?, ?, ?)",
+                        (key, json.dumps(results, ensure_ascii=False), now, now)
+                    )
+                    self.conn.execute(
+                        "DELETE FROM search_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+                    )
+                    self.conn.execute(
+                        "DELETE FROM search_cache WHERE key IN ("
+                        "SELECT key FROM search_cache ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                        (self.max_entries,)
+                    )
+            except Exception as e:
+                print(f"[搜索缓存] 写入失败: {e}")
+
+    def summary(self) -> str:
+        return f"命中 {self.hits} 次，未命中 {self.misses} 次"
+
+    def close(self):
+        """关闭缓存文件"""
+        self.conn.close()
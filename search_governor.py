@@ -0,0 +1,188 @@
+"""
+搜索额度模块 - 跨进程持久化的每日/每月调用计数、令牌桶限速与额度不足时的降级策略
+"""
+import json
+import math
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from file_lock import file_lock
+from rate_limit import TokenBucket
+
+# 额度状态
+LEVEL_NORMAL = "normal"          # 正常搜索
+LEVEL_DEGRADED = "degraded"      # 额度将尽：减少分片和每次结果数
+LEVEL_CACHE_ONLY = "cache_only"  # 额度用完：只读缓存，不再请求 API
+
+LEVEL_NAMES = {
+    LEVEL_NORMAL: "正常",
+    LEVEL_DEGRADED: "降级",
+    LEVEL_CACHE_ONLY: "仅缓存",
+}
+
+
+class SearchGovernor:
+    """Tavily 调用额度管理：所有入口共用同一个计数文件，额度按 UTC 日/月重置"""
+
+    def __init__(self, state_file: str = "search_quota.json", daily_limit: Optional[int] = None,
+                 monthly_limit: Optional[int] = 1000, rate_per_second: float = 2.0,
+                 burst: float = 4, degrade_at: float = 0.8):
+        """
+        初始化额度管理器
+
+        Args:
+            state_file: 计数文件路径
+            daily_limit: 每日调用上限，None 表示不限
+            monthly_limit: 每月调用上限，None 表示不限
+            rate_per_second: 令牌桶速率（次/秒）
+            burst: 令牌桶容量（允许的突发次数）
+            degrade_at: 日/月用量达到上限的该比例后进入降级模式
+        """
+        self.state_file = state_file
+        self.daily_limit = daily_limit
+        self.monthly_limit = monthly_limit
+        self.degrade_at = degrade_at
+        self.bucket = TokenBucket(rate_per_second, burst)
+        self.used = 0
+        self.denied = 0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _periods() -> Dict[str, str]:
+        now = datetime.now(timezone.utc)
+        return {"day": now.strftime("%Y-%m-%d"), "month": now.strftime("%Y-%m")}
+
+    def _load_state(self) -> Dict:
+        """读取计数文件，跨日/跨月时对应计数归零"""
+        periods = self._periods()
+        state = {}
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+            except Exception as e:
+                print(f"[搜索额度] 读取计数文件失败: {e}")
+
+        if state.get("day") != periods["day"]:
+            state["day"], state["day_count"] = periods["day"], 0
+        if state.get("month") != periods["month"]:
+            state["month"], state["month_count"] = periods["month"], 0
+        return state
+
+    def _save_state(self, state: Dict) -> bool:
+        """原子写入计数文件"""
+        directory = os.path.dirname(os.path.abspath(self.state_file))
+        fd, tmp_path = tempfile.mkstemp(prefix=".search_quota.", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(state, f)
+            os.replace(tmp_path, self.state_file)
+            return True
+        except Exception as e:
+            print(f"[搜索额度] 保存计数文件失败: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def _level_of(self, state: Dict) -> str:
+        level = LEVEL_NORMAL
+        for count, limit in ((state["day_count"], self.daily_limit),
+                             (state["month_count"], self.monthly_limit)):
+            if limit is None:
+                continue
+            if count >= limit:
+                return LEVEL_CACHE_ONLY
+            if count >= limit * self.degrade_at:
+                level = LEVEL_DEGRADED
+        return level
+
+    def level(self) -> str:
+        """当前额度状态：normal / degraded / cache_only"""
+        with self._lock:
+            return self._level_of(self._load_state())
+
+    def acquire(self) -> bool:
+        """
+        申请一次 API 调用：额度用完返回 False，否则计数并按令牌桶限速
+
+        Returns:
+            是否允许发出请求
+        """
+        with self._lock:
+            with file_lock(self.state_file + ".lock"):
+                state = self._load_state()
+                if self._level_of(state) == LEVEL_CACHE_ONLY:
+                    self.denied += 1
+                    return False
+                state["day_count"] += 1
+                state["month_count"] += 1
+                self._save_state(state)
+            self.used += 1
+
+        waited = self.bucket.acquire()
+        with self._lock:
+            self.waited += waited
+        return True
+
+    def plan(self, search_config: Dict) -> Dict:
+        """
+        按当前额度状态调整搜索配置：降级时分片数和每次结果数减半
+
+        Args:
+            search_config: get_weather_search_config / get_news_search_config 生成的配置
+
+        Returns:
+            调整后的配置（不修改原配置）
+        """
+        level = self.level()
+        if level == LEVEL_NORMAL:
+            return search_config
+
+        if level == LEVEL_CACHE_ONLY:
+            print("[搜索额度] ⚠️ 额度已用完，本次只使用缓存结果")
+            return search_config
+
+        planned = dict(search_config)
+        planned["max_results"] = max(3, math.ceil(search_config.get("max_results", 10) / 2))
+        if search_config.get("shards"):
+            shards = search_config["shards"]
+            planned["shards"] = shards[:max(1, math.ceil(len(shards) / 2))]
+            planned["max_results_per_shard"] = max(
+                3, math.ceil(search_config.get("max_results_per_shard", 5) / 2)
+            )
+        print(f"[搜索额度] ⚠️ 额度将尽，降级搜索: 最大结果数 {planned['max_results']}"
+              + (f"，分片 {len(planned['shards'])}/{len(search_config['shards'])}"
+                 if search_config.get("shards") else ""))
+        return planned
+
+    def summary(self) -> str:
+        state = self._load_state()
+        day_limit = "不限" if self.daily_limit is None else self.daily_limit
+        month_limit = "不限" if self.monthly_limit is None else self.monthly_limit
+        return (f"{LEVEL_NAMES[self._level_of(state)]}，今日 {state['day_count']}/{day_limit}，"
+                f"本月 {state['month_count']}/{month_limit}，本次调用 {self.used} 次，"
+                f"拒绝 {self.denied} 次，限速等待 {self.waited:.1f} 秒")
+
+
+def create_governor(quota_config: Optional[Dict]) -> Optional[SearchGovernor]:
+    """
+    根据 config.json 的 search.quota 配置创建额度管理器
+
+    Returns:
+        SearchGovernor 实例；enabled 为 false 时返回 None
+    """
+    quota_config = quota_config or {}
+    if not quota_config.get("enabled", True):
+        return None
+    return SearchGovernor(
+        quota_config.get("file", "search_quota.json"),
+        daily_limit=quota_config.get("daily_limit"),
+        monthly_limit=quota_config.get("monthly_limit", 1000),
+        rate_per_second=quota_config.get("rate_per_second", 2.0),
+        burst=quota_config.get("burst", 4),
+        degrade_at=quota_config.get("degrade_at", 0.8)
+    )
@@ -0,0 +1,100 @@
+"""
+搜索状态模块 - 按查询持久化的增量水位线（上次成功搜索的时间）等状态
+"""
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from file_lock import file_lock
+
+
+def query_key(query: str) -> str:
+    """查询归一化：忽略大小写和多余空白"""
+    return " ".join(query.split()).casefold()
+
+
+def parse_published_date(value: str) -> Optional[datetime]:
+    """
+    解析搜索结果的发布时间（ISO 8601 或 RFC 2822），无时区时按 UTC 处理
+
+    Returns:
+        带时区的 datetime，无法解析时返回 None
+    """
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+class SearchState:
+    """按查询保存的搜索状态，多个进程共用同一个状态文件"""
+
+    def __init__(self, state_file: str = "search_state.json"):
+        """
+        Args:
+            state_file: 状态文件路径
+        """
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self.queries = self._load()
+
+    def _load(self) -> Dict[str, Dict]:
+        if not os.path.exists(self.state_file):
+            return {}
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                return json.load(f).get("queries", {})
+        except Exception as e:
+            print(f"[搜索状态] 读取状态文件失败: {e}")
+            return {}
+
+    def _save(self) -> bool:
+        """原子写入状态文件"""
+        directory = os.path.dirname(os.path.abspath(self.state_file))
+        fd, tmp_path = tempfile.mkstemp(prefix=".search_state.", dir=directory)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": 1, "queries": self.queries}, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.state_file)
+            return True
+        except Exception as e:
+            print(f"[搜索状态] 保存状态文件失败: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def get(self, query: str) -> Dict:
+        """读取某个查询的状态，没有记录时返回空字典"""
+        with self._lock:
+            return dict(self.queries.get(query_key(query), {}))
+
+    def last_success(self, query: str) -> Optional[datetime]:
+        """某个查询上次成功搜索的时间（UTC）"""
+        value = self.get(query).get("last_success")
+        return datetime.fromisoformat(value) if value else None
+
+    def update(self, updates: Dict[str, Dict]) -> bool:
+        """
+        合并更新多个查询的状态并落盘（先重新读取文件，保留其他进程写入的查询）
+
+        Args:
+            updates: 查询 -> 要更新的字段
+        """
+        if not updates:
+            return True
+        with self._lock:
+            with file_lock(self.state_file + ".lock"):
+                self.queries = self._load()
+                for query, fields in updates.items():
+                    self.queries.setdefault(query_key(query), {}).update(fields)
+                return self._save()
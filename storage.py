@@ -3,16 +3,122 @@
 """
 import json
 import os
+import sqlite3
+import tempfile
+import threading
+import time
+from array import array
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import List, Dict, Set
+from typing import List, Dict, Optional, Set
+
+from fingerprint import title_fingerprint, url_fingerprint
+
+
+SECONDS_PER_DAY = 86400
+
+
+def _day_of(timestamp: float) -> int:
+    """epoch 时间戳所在的日桶编号（UTC 天数）"""
+    return int(timestamp // SECONDS_PER_DAY)
+
+
+def _parse_sent_at(sent_at: str) -> int:
+    """把旧版 ISO 格式的 sent_at 转为 epoch 秒"""
+    try:
+        return int(datetime.fromisoformat(sent_at).timestamp())
+    except (TypeError, ValueError):
+        return 0
+
+
+class _DayBucket:
+    """单日记录：标题指纹、URL 指纹和发送时间分别存放在 64 位定长数组中"""
+
+    __slots__ = ("title_fps", "url_fps", "sent_ts")
+
+    def __init__(self):
+        self.title_fps = array("q")
+        self.url_fps = array("q")
+        self.sent_ts = array("q")
+
+    def __len__(self) -> int:
+        return len(self.sent_ts)
+
+    def append(self, title_fp: int, url_fp: int, sent_ts: int):
+        self.title_fps.append(title_fp)
+        self.url_fps.append(url_fp)
+        self.sent_ts.append(sent_ts)
+
+    def to_dict(self) -> Dict:
+        return {
+            "title_fp": self.title_fps.tolist(),
+            "url_fp": self.url_fps.tolist(),
+            "sent_ts": self.sent_ts.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "_DayBucket":
+        bucket = cls()
+        bucket.title_fps.fromlist(data.get("title_fp", []))
+        bucket.url_fps.fromlist(data.get("url_fp", []))
+        bucket.sent_ts.fromlist(data.get("sent_ts", []))
+        return bucket
 
 
 class NewsStorage:
-    """管理已推送新闻的存储和去重"""
+    """
+    管理已推送新闻的存储和去重
+
+    内存中只保留归一化标题和规范化 URL 的 64 位指纹及 epoch 发送时间，按天分桶，过期时整桶删除。
+    原文（标题、URL）仅在 keep_text 开启时按天追加写入磁盘归档。
+    """
 
-    def __init__(self, storage_file: str = "sent_news.json"):
+    def __init__(self, storage_file: str = "sent_news.json", journal: bool = False,
+                 compact_bytes: int = 1024 * 1024, compact_age_hours: float = 24,
+                 keep_text: bool = False):
+        """
+        初始化 JSON 存储
+
+        Args:
+            storage_file: 快照文件路径
+            journal: 是否启用追加日志模式（新增记录以 JSON 行追加，不重写整个快照）
+            compact_bytes: 日志文件超过该大小后压缩为新快照
+            compact_age_hours: 日志最早记录超过该时长后压缩为新快照
+            keep_text: 是否在 <storage_file>.text/ 下按天归档推送过的标题和 URL 原文
+        """
         self.storage_file = storage_file
-        self.sent_news = self._load_storage()
+        self.journal_file = storage_file + ".journal"
+        self.text_dir = storage_file + ".text"
+        self.journal = journal
+        self.keep_text = keep_text
+        self.compact_bytes = compact_bytes
+        self.compact_age_seconds = compact_age_hours * 3600
+        self._lock = threading.RLock()
+        self._journal_seq = 0
+        self._journal_started = None
+        self._compaction_thread = None
+        # 事务（单次刷盘）状态：嵌套深度、待写日志条目、已送达的新增记录、待写原文归档
+        self._tx_depth = 0
+        self._tx_dirty = False
+        self._tx_journal: List[Dict] = []
+        self._tx_sent: List[Dict] = []
+        self._tx_text: List = []
+
+        # 日桶编号 -> 当天的记录；低水位为最早日桶编号
+        self._buckets: Dict[int, _DayBucket] = {}
+        self._low_watermark: Optional[int] = None
+        self._title_index: Set[int] = set()
+        self._url_index: Set[int] = set()
+
+        data = self._load_storage()
+        self._journal_seq = data.get("journal_seq", 0)
+        self._load_buckets(data)
+        replayed = self._replay_journal()
+        self._rebuild_index()
+
+        # 关闭日志模式后，把遗留的日志并入快照
+        if replayed and not self.journal:
+            self._compact()
 
     def _load_storage(self) -> Dict:
         """加载已推送新闻记录"""
@@ -25,54 +131,592 @@ class NewsStorage:
                 return {"news": []}
         return {"news": []}
 
+    def _load_buckets(self, data: Dict):
+        """从快照恢复日桶；旧版（原文记录）格式在此一次性转换为指纹"""
+        if data.get("version", 1) >= 3:
+            for day, bucket in data.get("buckets", {}).items():
+                if bucket.get("sent_ts"):
+                    self._buckets[int(day)] = _DayBucket.from_dict(bucket)
+        else:
+            for news in _iter_legacy_snapshot(data):
+                self._insert(
+                    title_fingerprint(news["title"]),
+                    url_fingerprint(news["url"]),
+                    news["sent_ts"]
+                )
+        self._low_watermark = min(self._buckets) if self._buckets else None
+
+    def _snapshot(self) -> Dict:
+        """生成快照内容"""
+        return {
+            "version": 3,
+            "journal_seq": self._journal_seq,
+            "low_watermark": self._low_watermark,
+            "buckets": {str(day): self._buckets[day].to_dict() for day in sorted(self._buckets)}
+        }
+
     def _save_storage(self):
-        """保存新闻记录到文件"""
+        """保存新闻记录到文件（先写临时文件再原子替换）"""
+        directory = os.path.dirname(os.path.abspath(self.storage_file))
+        tmp_file = None
         try:
-            with open(self.storage_file, 'w', encoding='utf-8') as f:
-                json.dump(self.sent_news, f, ensure_ascii=False, indent=2)
+            fd, tmp_file = tempfile.mkstemp(prefix=".sent_news.", suffix=".tmp", dir=directory)
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._snapshot(), f, separators=(",", ":"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, self.storage_file)
+            return True
         except Exception as e:
             print(f"保存存储文件失败: {e}")
+            if tmp_file and os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            return False
+
+    def _replay_journal(self) -> int:
+        """在快照之上重放追加日志，返回重放的条目数"""
+        if not os.path.exists(self.journal_file):
+            return 0
+
+        replayed = 0
+        try:
+            with open(self.journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # 崩溃时可能残留不完整的最后一行
+                        continue
+                    seq = entry.get("seq", 0)
+                    if seq <= self._journal_seq:
+                        continue
+                    self._apply_journal_entry(entry)
+                    self._journal_seq = seq
+                    if self._journal_started is None:
+                        self._journal_started = entry.get("ts", time.time())
+                    replayed += 1
+        except Exception as e:
+            print(f"重放存储日志失败: {e}")
+        return replayed
+
+    def _apply_journal_entry(self, entry: Dict):
+        """将单条日志应用到内存记录"""
+        if entry.get("op") == "add":
+            if "title_fp" in entry:
+                title_fp, url_fp = entry["title_fp"], entry.get("url_fp", 0)
+            else:
+                title_fp = title_fingerprint(entry.get("title", ""))
+                url_fp = url_fingerprint(entry.get("url", ""))
+            sent_ts = entry.get("sent_ts")
+            if sent_ts is None:
+                sent_ts = _parse_sent_at(entry.get("sent_at", "1970-01-01"))
+            self._insert(title_fp, url_fp, sent_ts)
+        elif entry.get("op") == "cleanup":
+            before_day = entry.get("before_day")
+            if before_day is None:
+                before_day = _day_of(_parse_sent_at(entry.get("cutoff")))
+            self._drop_buckets_before(before_day)
+
+    def _append_journal(self, entries: List[Dict]) -> bool:
+        """追加日志条目（一次 fsync），必要时触发后台压缩"""
+        now = time.time()
+        lines = []
+        for entry in entries:
+            self._journal_seq += 1
+            entry["seq"] = self._journal_seq
+            entry["ts"] = now
+            lines.append(json.dumps(entry, ensure_ascii=False) + "\n")
+
+        try:
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+        except Exception as e:
+            print(f"写入存储日志失败: {e}")
+            return False
+
+        if self._journal_started is None:
+            self._journal_started = now
+        self._maybe_compact()
+        return True
+
+    def _maybe_compact(self):
+        """日志超过大小或时长阈值时，在后台线程中压缩为新快照"""
+        try:
+            journal_size = os.path.getsize(self.journal_file)
+        except OSError:
+            return
+        journal_age = time.time() - (self._journal_started or time.time())
+        if journal_size < self.compact_bytes and journal_age < self.compact_age_seconds:
+            return
+        if self._compaction_thread and self._compaction_thread.is_alive():
+            return
+
+        # 非守护线程：进程退出前会等待压缩完成
+        self._compaction_thread = threading.Thread(target=self._compact, name="storage-compaction")
+        self._compaction_thread.start()
+
+    def _compact(self):
+        """把内存记录写成新快照并删除已并入的日志"""
+        with self._lock:
+            # 事务进行中时内存里有未提交的变更，推迟到下次追加后再压缩
+            if self._tx_depth:
+                return
+            if not self._save_storage():
+                return
+            try:
+                if os.path.exists(self.journal_file):
+                    os.remove(self.journal_file)
+                self._journal_started = None
+            except OSError as e:
+                print(f"删除存储日志失败: {e}")
+
+    def wait_for_compaction(self):
+        """等待后台压缩结束"""
+        if self._compaction_thread:
+            self._compaction_thread.join()
+
+    def _reload(self):
+        """丢弃内存状态，按磁盘上的快照和日志重新加载"""
+        self._buckets = {}
+        self._low_watermark = None
+        self._journal_started = None
+        data = self._load_storage()
+        self._journal_seq = data.get("journal_seq", 0)
+        self._load_buckets(data)
+        self._replay_journal()
+        self._rebuild_index()
+
+    def _persist(self, journal_entries: List[Dict]):
+        """持久化一次变更：事务内只缓冲，事务外立即写日志或快照"""
+        if self._tx_depth:
+            self._tx_dirty = True
+            self._tx_journal.extend(journal_entries)
+        elif self.journal:
+            self._append_journal(journal_entries)
+        else:
+            self._save_storage()
+
+    @contextmanager
+    def transaction(self):
+        """
+        单次刷盘的工作单元
+
+        事务内的 add_sent_news / cleanup_old_news 只修改内存，退出时统一写入一次
+        （日志模式一次追加 + fsync，快照模式写临时文件后原子替换）；
+        块内抛出异常时仍写入已送达的记录（add_sent_news），只回滚其余变更（如 cleanup_old_news），
+        一条流水线出错不会撤销另一条已推送报告的记录
+        """
+        with self._lock:
+            self._tx_depth += 1
+        try:
+            yield self
+        except BaseException:
+            with self._lock:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    self._rollback()
+            raise
+        else:
+            with self._lock:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    self._commit()
+
+    def _commit(self):
+        """事务结束时统一刷盘"""
+        if not self._tx_dirty:
+            return
+        for day, items in self._tx_text:
+            self._archive_text(day, items)
+        if self.journal:
+            self._append_journal(self._tx_journal)
+        else:
+            self._save_storage()
+        self._reset_tx()
+
+    def _rollback(self):
+        """事务异常结束：按磁盘状态回滚，再单独写入事务内已送达的记录"""
+        if not self._tx_dirty:
+            self._reset_tx()
+            return
+        sent, text = self._tx_sent, self._tx_text
+        self._reload()
+        self._reset_tx()
+        for news in sent:
+            self._insert(news["title_fp"], news["url_fp"], news["sent_ts"])
+        for day, items in text:
+            self._archive_text(day, items)
+        if sent:
+            self._persist([dict(news, op="add") for news in sent])
+        print(f"[存储] 运行中断，已写入 {len(sent)} 条已送达的记录，回滚其余未提交的变更")
+
+    def _reset_tx(self):
+        self._tx_dirty = False
+        self._tx_journal = []
+        self._tx_sent = []
+        self._tx_text = []
+
+    def _archive_text(self, day: int, items: List[Dict]):
+        """按天追加归档推送过的标题和 URL 原文（仅 keep_text 开启时）"""
+        try:
+            os.makedirs(self.text_dir, exist_ok=True)
+            with open(os.path.join(self.text_dir, f"{day}.jsonl"), 'a', encoding='utf-8') as f:
+                for item in items:
+                    f.write(json.dumps(item, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"写入原文归档失败: {e}")
+
+    def _insert(self, title_fp: int, url_fp: int, sent_ts: int):
+        """把记录放入所属日桶并加入索引"""
+        day = _day_of(sent_ts)
+        bucket = self._buckets.get(day)
+        if bucket is None:
+            bucket = self._buckets[day] = _DayBucket()
+        bucket.append(title_fp, url_fp, sent_ts)
+        if self._low_watermark is None or day < self._low_watermark:
+            self._low_watermark = day
+        self._index(title_fp, url_fp)
+
+    def _drop_buckets_before(self, before_day: int) -> int:
+        """整桶删除早于 before_day 的记录（连同原文归档），返回删除的记录数"""
+        expired = [day for day in self._buckets if day < before_day]
+        dropped = sum(len(self._buckets.pop(day)) for day in expired)
+        self._low_watermark = min(self._buckets) if self._buckets else None
+        if dropped:
+            self._rebuild_index()
+
+        if os.path.isdir(self.text_dir):
+            for name in os.listdir(self.text_dir):
+                day = name.split(".")[0]
+                if day.isdigit() and int(day) < before_day:
+                    os.remove(os.path.join(self.text_dir, name))
+        return dropped
+
+    def iter_records(self):
+        """按时间顺序遍历所有记录，产出 (title_fp, url_fp, sent_ts)"""
+        for day in sorted(self._buckets):
+            bucket = self._buckets[day]
+            yield from zip(bucket.title_fps, bucket.url_fps, bucket.sent_ts)
+
+    def _rebuild_index(self):
+        """根据当前记录重建标题和URL指纹索引"""
+        self._title_index = set()
+        self._url_index = set()
+        for bucket in self._buckets.values():
+            self._title_index.update(bucket.title_fps)
+            self._url_index.update(bucket.url_fps)
+        self._url_index.discard(0)
+
+    def _index(self, title_fp: int, url_fp: int):
+        """将单条记录加入索引"""
+        self._title_index.add(title_fp)
+        if url_fp:
+            self._url_index.add(url_fp)
 
     def is_news_sent(self, news_title: str, news_url: str = None) -> bool:
-        """检查新闻是否已推送（基于标题和URL）"""
-        for news in self.sent_news.get("news", []):
-            # 标题匹配或URL匹配都认为是重复
-            if news.get("title") == news_title:
-                return True
-            if news_url and news.get("url") == news_url:
-                return True
+        """检查新闻是否已推送（基于归一化标题和规范化URL的指纹，O(1) 哈希查找）"""
+        # 标题匹配或URL匹配都认为是重复
+        if title_fingerprint(news_title) in self._title_index:
+            return True
+        if news_url and url_fingerprint(news_url) in self._url_index:
+            return True
         return False
 
     def add_sent_news(self, news_items: List[Dict]):
         """添加已推送的新闻"""
-        if "news" not in self.sent_news:
-            self.sent_news["news"] = []
+        with self._lock:
+            sent_ts = int(time.time())
+            added = []
+            for item in news_items:
+                title_fp = title_fingerprint(item.get("title", ""))
+                url_fp = url_fingerprint(item.get("url", ""))
+                self._insert(title_fp, url_fp, sent_ts)
+                added.append({"title_fp": title_fp, "url_fp": url_fp, "sent_ts": sent_ts})
 
-        timestamp = datetime.now().isoformat()
-        for item in news_items:
-            self.sent_news["news"].append({
-                "title": item.get("title", ""),
-                "url": item.get("url", ""),
-                "sent_at": timestamp
-            })
+            if self.keep_text and news_items:
+                text_items = [
+                    {"title": item.get("title", ""), "url": item.get("url", ""), "sent_ts": sent_ts}
+                    for item in news_items
+                ]
+                if self._tx_depth:
+                    self._tx_text.append((_day_of(sent_ts), text_items))
+                else:
+                    self._archive_text(_day_of(sent_ts), text_items)
 
-        self._save_storage()
+            if self._tx_depth:
+                self._tx_sent.extend(added)
+            self._persist([dict(news, op="add") for news in added])
 
     def cleanup_old_news(self, days: int = 30):
-        """清理超过指定天数的旧新闻记录"""
-        cutoff_date = datetime.now() - timedelta(days=days)
+        """
+        清理超过指定天数的旧新闻记录
 
-        if "news" in self.sent_news:
-            self.sent_news["news"] = [
-                news for news in self.sent_news["news"]
-                if datetime.fromisoformat(news.get("sent_at", "1970-01-01")) > cutoff_date
-            ]
-            self._save_storage()
+        按天整桶过期：低水位仍在保留期内时直接返回，不解析记录也不写文件
+        """
+        before_day = _day_of(time.time() - days * SECONDS_PER_DAY)
+
+        with self._lock:
+            if self._low_watermark is None or self._low_watermark >= before_day:
+                return
+
+            if not self._drop_buckets_before(before_day):
+                return
+
+            self._persist([{"op": "cleanup", "before_day": before_day}])
 
     def get_new_news(self, all_news: List[Dict]) -> List[Dict]:
         """过滤出未推送的新闻"""
         new_news = []
-        for news in all_news:
-            if not self.is_news_sent(news.get("title", ""), news.get("url")):
-                new_news.append(news)
+        with self._lock:
+            for news in all_news:
+                if not self.is_news_sent(news.get("title", ""), news.get("url")):
+                    new_news.append(news)
         return new_news
+
+
+def _iter_legacy_snapshot(data: Dict):
+    """遍历旧版快照中的原文记录：{"news": [...]}（v1）或按天分桶的记录列表（v2）"""
+    if "buckets" in data:
+        for records in data["buckets"].values():
+            for news in records:
+                yield {
+                    "title": news.get("title", ""),
+                    "url": news.get("url", ""),
+                    "sent_ts": news.get("sent_ts", 0)
+                }
+    else:
+        for news in data.get("news", []):
+            yield {
+                "title": news.get("title", ""),
+                "url": news.get("url", ""),
+                "sent_ts": _parse_sent_at(news.get("sent_at", "1970-01-01"))
+            }
+
+
+class SQLiteNewsStorage:
+    """基于 SQLite 的已推送新闻存储（与 NewsStorage 接口一致）"""
+
+    def __init__(self, db_file: str = "sent_news.db", legacy_json_file: str = "sent_news.json"):
+        """
+        初始化 SQLite 存储
+
+        Args:
+            db_file: SQLite 数据库文件路径
+            legacy_json_file: 旧版 JSON 记录文件，首次打开时自动导入
+        """
+        self.db_file = db_file
+        self.legacy_json_file = legacy_json_file
+        # 允许并发流水线在不同线程中访问，由 _lock 串行化
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._tx_depth = 0
+        # 事务内新增的记录，事务异常结束时回滚后单独写入
+        self._tx_rows: List = []
+        self._init_schema()
+        self._migrate_from_json()
+
+    def _init_schema(self):
+        """创建表和索引，启用 WAL 模式；旧版数据库补充指纹列"""
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS sent_news ("
+                "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+                "title TEXT NOT NULL, "
+                "url TEXT NOT NULL DEFAULT '', "
+                "sent_at TEXT NOT NULL, "
+                "title_fp INTEGER NOT NULL DEFAULT 0, "
+                "url_fp INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(sent_news)")}
+            if "title_fp" not in columns:
+                # 旧版按原文去重，补充与 JSON 后端相同的归一化指纹
+                self.conn.execute("ALTER TABLE sent_news ADD COLUMN title_fp INTEGER NOT NULL DEFAULT 0")
+                self.conn.execute("ALTER TABLE sent_news ADD COLUMN url_fp INTEGER NOT NULL DEFAULT 0")
+                rows = self.conn.execute("SELECT id, title, url FROM sent_news").fetchall()
+                self.conn.executemany(
+                    "UPDATE sent_news SET title_fp = ?, url_fp = ? WHERE id = ?",
+                    [(title_fingerprint(title), url_fingerprint(url), row_id) for row_id, title, url in rows]
+                )
+            self.conn.execute("DROP INDEX IF EXISTS idx_sent_news_title")
+            self.conn.execute("DROP INDEX IF EXISTS idx_sent_news_url")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_sent_news_title_fp ON sent_news(title_fp)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_sent_news_url_fp ON sent_news(url_fp)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_sent_news_sent_at ON sent_news(sent_at)")
+            self.conn.execute(
+                "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+            )
+
+    def _migrate_from_json(self):
+        """
+        首次打开时导入 JSON 存储（任意版本的快照和追加日志）中的记录
+
+        v3 快照只保存指纹，因此直接导入指纹（原文列留空）；早期版本只按原文导入过、
+        没有 migrated_fingerprints 标记的数据库会补充导入，已存在的标题指纹不重复写入
+        """
+        if self.conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_fingerprints'").fetchone():
+            return
+
+        imported = 0
+        if self.legacy_json_file and (os.path.exists(self.legacy_json_file)
+                                      or os.path.exists(self.legacy_json_file + ".journal")):
+            try:
+                # 以日志模式打开只读取快照并重放日志，不会压缩或改写旧文件
+                legacy = NewsStorage(self.legacy_json_file, journal=True)
+                rows = [(title_fp, url_fp, datetime.fromtimestamp(sent_ts).isoformat(), title_fp)
+                        for title_fp, url_fp, sent_ts in legacy.iter_records()]
+                with self.conn:
+                    for row in rows:
+                        cursor = self.conn.execute(
+                            "INSERT INTO sent_news (title, url, title_fp, url_fp, sent_at) "
+                            "SELECT '', '', ?, ?, ? WHERE NOT EXISTS "
+                            "(SELECT 1 FROM sent_news WHERE title_fp = ?)", row
+                        )
+                        imported += cursor.rowcount
+                print(f"[存储] 已从 {self.legacy_json_file} 导入 {imported} 条记录")
+            except Exception as e:
+                print(f"导入旧版存储文件失败: {e}")
+                return
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('migrated_fingerprints', ?)",
+                (f"{self.legacy_json_file or ''}:{imported}",)
+            )
+
+    def is_news_sent(self, news_title: str, news_url: str = None) -> bool:
+        """检查新闻是否已推送（与 JSON 后端相同：比较归一化标题和规范化 URL 的指纹，走索引查询）"""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT 1 FROM sent_news WHERE title_fp = ? LIMIT 1", (title_fingerprint(news_title),)
+            ).fetchone()
+            if row:
+                return True
+            url_fp = url_fingerprint(news_url) if news_url else 0
+            if url_fp:
+                row = self.conn.execute(
+                    "SELECT 1 FROM sent_news WHERE url_fp = ? LIMIT 1", (url_fp,)
+                ).fetchone()
+                return row is not None
+            return False
+
+    def add_sent_news(self, news_items: List[Dict]):
+        """添加已推送的新闻（单个事务批量写入）"""
+        with self._lock:
+            timestamp = datetime.now().isoformat()
+            rows = [(item.get("title", ""), item.get("url") or "", timestamp,
+                     title_fingerprint(item.get("title", "")), url_fingerprint(item.get("url") or ""))
+                    for item in news_items]
+            try:
+                self.conn.executemany(
+                    "INSERT INTO sent_news (title, url, sent_at, title_fp, url_fp) VALUES (?, ?, ?, ?, ?)", rows
+                )
+                if self._tx_depth:
+                    self._tx_rows.extend(rows)
+                self._commit_unless_tx()
+            except Exception as e:
+                print(f"保存存储记录失败: {e}")
+                self._rollback_unless_tx()
+
+    def cleanup_old_news(self, days: int = 30):
+        """清理超过指定天数的旧新闻记录（按 sent_at 索引范围删除）"""
+        with self._lock:
+            cutoff_date = (datetime.now() - timedelta(days=days)).isoformat()
+            try:
+                oldest = self.conn.execute("SELECT MIN(sent_at) FROM sent_news").fetchone()[0]
+                if oldest is None or oldest > cutoff_date:
+                    return
+                self.conn.execute("DELETE FROM sent_news WHERE sent_at <= ?", (cutoff_date,))
+                self._commit_unless_tx()
+            except Exception as e:
+                print(f"清理存储记录失败: {e}")
+                self._rollback_unless_tx()
+
+    def get_new_news(self, all_news: List[Dict]) -> List[Dict]:
+        """过滤出未推送的新闻"""
+        with self._lock:
+            return [
+                news for news in all_news
+                if not self.is_news_sent(news.get("title", ""), news.get("url"))
+            ]
+
+    def _commit_unless_tx(self):
+        """事务外的写操作立即提交，事务内留到 transaction 结束统一提交"""
+        if not self._tx_depth:
+            self.conn.commit()
+
+    def _rollback_unless_tx(self):
+        if not self._tx_depth:
+            self.conn.rollback()
+
+    @contextmanager
+    def transaction(self):
+        """
+        单次提交的工作单元（与 NewsStorage.transaction 语义一致）：
+        块内抛出异常时回滚，再单独提交事务内已送达的记录
+        """
+        with self._lock:
+            self._tx_depth += 1
+        try:
+            yield self
+        except BaseException:
+            with self._lock:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    self._rollback()
+            raise
+        else:
+            with self._lock:
+                self._tx_depth -= 1
+                if self._tx_depth == 0:
+                    self.conn.commit()
+                    self._tx_rows = []
+
+    def _rollback(self):
+        """事务异常结束：回滚全部变更后重新写入已送达的记录"""
+        rows, self._tx_rows = self._tx_rows, []
+        self.conn.rollback()
+        try:
+            if rows:
+                self.conn.executemany(
+                    "INSERT INTO sent_news (title, url, sent_at, title_fp, url_fp) VALUES (?, ?, ?, ?, ?)", rows
+                )
+                self.conn.commit()
+        except Exception as e:
+            print(f"保存存储记录失败: {e}")
+            self.conn.rollback()
+        print(f"[存储] 运行中断，已写入 {len(rows)} 条已送达的记录，回滚其余未提交的变更")
+
+    def close(self):
+        """关闭数据库连接"""
+        self.conn.close()
+
+
+def create_storage(storage_config: Dict):
+    """
+    根据配置创建存储后端
+
+    Args:
+        storage_config: config.json 中的 storage 配置，backend 可选 "json"（默认）或 "sqlite"；
+            json 后端可通过 journal 开启追加日志模式
+
+    Returns:
+        NewsStorage 或 SQLiteNewsStorage 实例
+    """
+    backend = storage_config.get("backend", "json")
+    json_file = storage_config.get("sent_news_file", "sent_news.json")
+
+    if backend == "sqlite":
+        return SQLiteNewsStorage(storage_config.get("sqlite_file", "sent_news.db"), json_file)
+    if backend != "json":
+        print(f"[存储] 未知的存储后端 {backend}，使用 json")
+    return NewsStorage(
+        json_file,
+        journal=storage_config.get("journal", False),
+        compact_bytes=storage_config.get("journal_compact_bytes", 1024 * 1024),
+        compact_age_hours=storage_config.get("journal_compact_hours", 24),
+        keep_text=storage_config.get("keep_text", False)
+    )
@@ -0,0 +1,605 @@
+"""
+Tavily 搜索客户端 - 所有入口共用的连接池、超时和重试策略
+"""
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional, TypedDict
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from fingerprint import canonical_url
+from search_cache import SearchCache, make_cache_key
+from search_governor import SearchGovernor, create_governor
+from search_state import SearchState, parse_published_date
+
+TAVILY_BASE_URL = "https://api.tavily.com"
+
+# 可重试的 HTTP 状态码：限流和服务端错误
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# time_range 对应的最大时间窗口，增量搜索的窗口不会超过它
+TIME_RANGE_WINDOWS = {
+    "day": timedelta(days=1),
+    "week": timedelta(days=7),
+    "month": timedelta(days=30),
+    "year": timedelta(days=365),
+}
+
+# Tavily 单次请求的 max_results 上限
+MAX_RESULTS_LIMIT = 20
+
+# 自适应深度的默认参数（config.json 的 search.adaptive）
+DEFAULT_ADAPTIVE = {
+    "enabled": True,
+    "saturation_ratio": 0.6,  # 返回条数达到请求上限且新增占比超过该值时视为饱和
+    "quiet_ratio": 0.2,       # 新增占比低于该值时下次减小深度
+    "min_results": 5,
+    "max_results_cap": MAX_RESULTS_LIMIT,
+    "max_expansions": 2,      # 单次运行最多追加搜索的轮数
+}
+
+
+class SearchResult(TypedDict, total=False):
+    """单条搜索结果"""
+    title: str
+    url: str
+    content: str
+    score: float
+    published_date: str
+
+
+def _to_result(raw: Dict) -> SearchResult:
+    """把 Tavily 原始结果规整为 SearchResult"""
+    result: SearchResult = {
+        "title": raw.get("title") or "",
+        "url": raw.get("url") or "",
+        "content": raw.get("content") or "",
+        "score": float(raw.get("score") or 0),
+    }
+    if raw.get("published_date"):
+        result["published_date"] = raw["published_date"]
+    return result
+
+
+class QueryBudget:
+    """单次运行的查询预算（线程安全），用完后其余分片查询直接跳过"""
+
+    def __init__(self, max_queries: Optional[int] = None):
+        """
+        Args:
+            max_queries: 本次运行最多发出的查询数，None 表示不限
+        """
+        self.max_queries = max_queries
+        self.used = 0
+        self.skipped = 0
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """占用一次查询额度，额度不足时返回 False"""
+        with self._lock:
+            if self.max_queries is not None and self.used >= self.max_queries:
+                self.skipped += 1
+                return False
+            self.used += 1
+            return True
+
+    def release(self):
+        """退还一次已占用但没有发出的查询（如被调用额度管理拒绝）"""
+        with self._lock:
+            self.used = max(0, self.used - 1)
+
+    def summary(self) -> str:
+        limit = "不限" if self.max_queries is None else self.max_queries
+        return f"已用 {self.used}/{limit} 次查询，跳过 {self.skipped} 个分片"
+
+
+def merge_results(result_lists: List[List[SearchResult]], limit: Optional[int] = None) -> List[SearchResult]:
+    """
+    合并多个分片的结果：按规范化 URL 去重（保留得分最高的一条），再按得分降序排列
+
+    Args:
+        result_lists: 各分片的结果列表
+        limit: 合并后最多保留的条数，None 表示全部保留
+
+    Returns:
+        合并后的结果列表
+    """
+    best: Dict[str, SearchResult] = {}
+    for results in result_lists:
+        for result in results:
+            key = canonical_url(result.get("url", "")) or result.get("title", "")
+            current = best.get(key)
+            if current is None or result.get("score", 0) > current.get("score", 0):
+                best[key] = result
+
+    merged = sorted(best.values(), key=lambda r: r.get("score", 0), reverse=True)
+    return merged[:limit] if limit else merged
+
+
+class TavilyClient:
+    """复用 HTTP 连接的 Tavily 搜索客户端（keep-alive + 连接池 + 抖动指数退避重试）"""
+
+    def __init__(self, api_key: str, connect_timeout: float = 5, read_timeout: float = 30,
+                 max_retries: int = 3, backoff_base: float = 1.0, backoff_max: float = 20.0,
+                 pool_size: int = 10, cache: SearchCache = None, refresh: bool = False,
+                 governor: SearchGovernor = None, base_url: str = TAVILY_BASE_URL,
+                 record_file: Optional[str] = None, state: SearchState = None,
+                 watermark_overlap: float = 1800, use_watermarks: bool = True, adaptive: Dict = None,
+                 async_io: bool = False):
+        """
+        初始化搜索客户端
+
+        Args:
+            api_key: Tavily API Key
+            connect_timeout: 建立连接超时（秒）
+            read_timeout: 读取响应超时（秒）
+            max_retries: 429/5xx/网络错误时的最大重试次数
+            backoff_base: 退避基数（秒），第 n 次重试最多等待 base * 2^n
+            backoff_max: 单次退避上限（秒）
+            pool_size: 连接池大小（并发搜索时的最大连接数）
+            cache: 搜索响应缓存，None 表示不使用缓存
+            refresh: 为 True 时跳过缓存读取，但仍把新结果写入缓存
+            governor: 跨进程共享的调用额度与限速管理，None 表示不限
+            base_url: API 地址，可指向本地替身服务（mock_tavily_server.py）
+            record_file: 把每次成功的请求和响应追加记录到该 JSON-lines 文件，供替身服务回放
+            state: 按查询保存的搜索状态（增量水位线、自适应深度），None 表示都不启用
+            watermark_overlap: 增量窗口向前多覆盖的秒数，容忍索引延迟和时钟偏差
+            use_watermarks: 是否启用增量搜索
+            adaptive: 自适应结果深度参数（见 DEFAULT_ADAPTIVE），深度记录在 state 中
+            async_io: 分片搜索改用 asyncio 引擎（async_clients.py，需要 aiohttp）在一个事件循环中并发执行
+        """
+        self.api_key = api_key
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.cache = cache
+        self.refresh = refresh
+        self.governor = governor
+        self.search_url = f"{base_url.rstrip('/')}/search"
+        self.record_file = record_file
+        self._record_lock = threading.Lock()
+        self.state = state
+        self.watermark_overlap = timedelta(seconds=watermark_overlap)
+        self.use_watermarks = use_watermarks
+        # 本次运行已成功搜索、等待流水线成功后提交的水位线：查询 -> 搜索开始时间
+        self._pending_watermarks: Dict[str, str] = {}
+        self._pending_lock = threading.Lock()
+        self.adaptive = dict(DEFAULT_ADAPTIVE, **(adaptive or {}))
+        self.async_io = async_io
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Content-Type": "application/json"})
+
+    def _backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """计算重试等待时间：优先遵循 Retry-After，否则全抖动指数退避"""
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _since(self, query: str, time_range: str) -> Optional[datetime]:
+        """增量搜索的起点：上次成功时间减去重叠量，且不早于 time_range 的窗口"""
+        last_success = self.state.last_success(query)
+        if last_success is None:
+            return None
+        window = TIME_RANGE_WINDOWS.get(time_range, TIME_RANGE_WINDOWS["day"])
+        return max(last_success - self.watermark_overlap, datetime.now(timezone.utc) - window)
+
+    def search(self, query: str, time_range: str = "day", max_results: int = 10,
+               search_depth: str = "basic", budget: "QueryBudget" = None,
+               incremental: bool = False) -> List[SearchResult]:
+        """
+        执行搜索（先查缓存，未命中时才占用查询预算并请求 API）
+
+        Args:
+            query: 搜索查询
+            time_range: 时间范围 (day, week, month, year)
+            max_results: 最大结果数
+            search_depth: 搜索深度 (basic, advanced)
+            budget: 本次运行的查询预算，None 表示不限
+            incremental: 只搜索该查询上次成功以来的内容（需要配置 state）
+
+        Returns:
+            搜索结果列表，失败时返回空列表
+        """
+        plan = self._prepare(query, time_range, max_results, search_depth, budget, incremental)
+        if "results" in plan:
+            return plan["results"]
+
+        if not self._acquire_quota(plan):
+            return []
+
+        return self._complete(plan, self._post_search(dict(plan["request"], api_key=self.api_key)))
+
+    def _prepare(self, query: str, time_range: str, max_results: int, search_depth: str,
+                 budget: Optional["QueryBudget"], incremental: bool) -> Dict:
+        """
+        构建请求并处理不需要访问 API 的情况（缓存命中、预算用完），同步和异步客户端共用
+
+        Returns:
+            搜索计划；已得出结果时包含 results 键
+        """
+        request = {
+            "query": query,
+            "search_depth": search_depth,
+            "include_raw_content": False,
+            "max_results": max_results,
+            "time_range": time_range
+        }
+        plan = {"query": query, "request": request, "since": None, "started_at": None, "budget": None}
+
+        if incremental and self.use_watermarks and self.state is not None:
+            plan["started_at"] = datetime.now(timezone.utc)
+            plan["since"] = self._since(query, time_range)
+            if plan["since"] is not None:
+                # Tavily 的 start_date 精确到天，更细的过滤在拿到结果后按发布时间完成
+                del request["time_range"]
+                request["start_date"] = plan["since"].strftime("%Y-%m-%d")
+
+        plan["cache_key"] = make_cache_key(request) if self.cache else None
+        if plan["cache_key"] and not self.refresh:
+            cached = self.cache.get(plan["cache_key"])
+            if cached is not None:
+                print(f"[Tavily] 缓存命中: {query[:80]}... ({len(cached)} 条结果)")
+                # 缓存命中不推进水位线：缓存内容可能早于本次运行
+                plan["results"] = self._filter_since(cached, plan["since"])
+                return plan
+
+        if budget:
+            if not budget.try_acquire():
+                print(f"[Tavily] ⏭️ 查询预算已用完，跳过: {query[:80]}")
+                plan["results"] = []
+            else:
+                plan["budget"] = budget
+        return plan
+
+    def _acquire_quota(self, plan: Dict) -> bool:
+        """
+        占用一次调用额度（令牌桶可能阻塞等待），同步和异步客户端共用
+
+        Returns:
+            是否可以发出请求；额度用完时退还本次运行的预算，留给后面的分片
+        """
+        if self.governor and not self.governor.acquire():
+            if plan["budget"]:
+                plan["budget"].release()
+            print(f"[Tavily] ⏭️ 调用额度已用完，跳过: {plan['query'][:80]}")
+            return False
+        return True
+
+    def _complete(self, plan: Dict, results: Optional[List[SearchResult]]) -> List[SearchResult]:
+        """API 返回后：写缓存、录制、暂存水位线，再按增量起点过滤"""
+        if results is not None:
+            if plan["cache_key"]:
+                self.cache.put(plan["cache_key"], results)
+            if self.record_file:
+                self._record(plan["request"], results)
+            if plan["started_at"] is not None:
+                with self._pending_lock:
+                    self._pending_watermarks[plan["query"]] = plan["started_at"].isoformat()
+        return self._filter_since(results or [], plan["since"])
+
+    @staticmethod
+    def _filter_since(results: List[SearchResult], since: Optional[datetime]) -> List[SearchResult]:
+        """丢弃发布时间早于增量起点的结果（没有发布时间的结果保留，交给去重处理）"""
+        if since is None:
+            return results
+        kept = []
+        for result in results:
+            published = parse_published_date(result.get("published_date", ""))
+            if published is None or published >= since:
+                kept.append(result)
+        if len(kept) < len(results):
+            print(f"[Tavily] 增量过滤: 丢弃 {len(results) - len(kept)} 条早于 "
+                  f"{since.strftime('%Y-%m-%d %H:%M')} UTC 的结果")
+        return kept
+
+    def commit_watermarks(self, search_config: Dict) -> bool:
+        """
+        流水线成功后调用：把该搜索配置中各查询的水位线推进到本次搜索开始的时间
+
+        推送失败时不调用，下次运行会重新覆盖这段时间
+        """
+        if not self.state:
+            return True
+        # 自适应深度追加的 followups 子查询同样按查询记录水位线
+        queries = [search_config["query"]] + [shard["query"] for shard in search_config.get("shards", [])] \
+            + [followup["query"] for followup in search_config.get("followups", [])]
+        with self._pending_lock:
+            updates = {
+                query: {"last_success": self._pending_watermarks.pop(query)}
+                for query in queries if query in self._pending_watermarks
+            }
+        return self.state.update(updates)
+
+    def _record(self, request: Dict, results: List[SearchResult]):
+        """追加一条录制记录（不含 API Key）"""
+        line = json.dumps({"request": request, "response": {"results": results}}, ensure_ascii=False)
+        with self._record_lock:
+            try:
+                with open(self.record_file, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+            except Exception as e:
+                print(f"[Tavily] ⚠️ 写入录制文件失败: {e}")
+
+    def _post_search(self, payload: Dict) -> Optional[List[SearchResult]]:
+        """请求 Tavily API（带重试），失败时返回 None"""
+        print(f"[Tavily] 搜索: {payload['query'][:80]}...")
+
+        for attempt in range(self.max_retries + 1):
+            retry_after = None
+            try:
+                response = self.session.post(self.search_url, json=payload, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUS_CODES:
+                    try:
+                        body = response.json()
+                    except ValueError:
+                        body = None
+                    return self._parse_response(response.status_code, body)
+                error = f"HTTP {response.status_code}"
+                retry_after = response.headers.get("Retry-After")
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError) as e:
+                error = f"网络错误: {e.__class__.__name__}"
+            except requests.exceptions.RequestException as e:
+                print(f"[Tavily] ❌ 搜索失败: {e}")
+                return None
+
+            delay = self._retry_delay(attempt, error, retry_after)
+            if delay is None:
+                return None
+            time.sleep(delay)
+
+        return None
+
+    @staticmethod
+    def _parse_response(status: int, body: Optional[Dict]) -> Optional[List[SearchResult]]:
+        """
+        解析不需要重试的响应，同步和异步客户端共用
+
+        Args:
+            status: HTTP 状态码
+            body: 解析后的 JSON，不是合法 JSON 时为 None
+
+        Returns:
+            搜索结果，失败时返回 None
+        """
+        if status >= 400:
+            print(f"[Tavily] ❌ 搜索失败: HTTP {status}")
+            return None
+        if not isinstance(body, dict):
+            print("[Tavily] ❌ 响应解析失败: 不是合法的 JSON 对象")
+            return None
+        results = [_to_result(r) for r in body.get("results", [])]
+        print(f"[Tavily] 找到 {len(results)} 条结果")
+        return results
+
+    def _retry_delay(self, attempt: int, error: str, retry_after: Optional[str]) -> Optional[float]:
+        """
+        可重试的错误（429/5xx/网络错误）之后的等待时间，同步和异步客户端共用
+
+        Returns:
+            等待的秒数；重试次数已用完时返回 None
+        """
+        if attempt >= self.max_retries:
+            print(f"[Tavily] ❌ 搜索失败（已重试 {self.max_retries} 次）: {error}")
+            return None
+        delay = self._backoff(attempt, retry_after)
+        print(f"[Tavily] ⚠️ {error}，{delay:.1f} 秒后重试 ({attempt + 1}/{self.max_retries})")
+        return delay
+
+    def search_sharded(self, shards: List[Dict], time_range: str = "day", max_results: int = 5,
+                       max_concurrency: int = 4, budget: QueryBudget = None,
+                       merged_limit: Optional[int] = None, incremental: bool = False) -> List[SearchResult]:
+        """
+        分片搜索：并发执行多个子查询（按国家/关键词组拆分），合并、按 URL 去重并按得分排序
+
+        Args:
+            shards: 子查询列表，每项包含 query 和 label，按优先级排序（预算不足时靠后的先被跳过）
+            time_range: 时间范围
+            max_results: 每个子查询的最大结果数
+            max_concurrency: 同时进行的子查询数上限
+            budget: 本次运行的查询预算
+            merged_limit: 合并后最多保留的条数
+            incremental: 各子查询只搜索上次成功以来的内容
+
+        Returns:
+            合并后的搜索结果
+        """
+        if self.async_io:
+            # 延迟导入：aiohttp 只在启用异步引擎时需要
+            from async_clients import search_many
+            # 按优先级顺序创建任务，预算不足时靠后的分片先被跳过
+            result_lists = search_many(self, [shard["query"] for shard in shards], time_range=time_range,
+                                       max_results=max_results, budget=budget, incremental=incremental,
+                                       limit_per_host=max(1, max_concurrency))
+        else:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_concurrency, len(shards))),
+                                    thread_name_prefix="tavily-shard") as pool:
+                # 按优先级顺序提交，预算不足时靠后的分片先被跳过
+                result_lists = list(pool.map(
+                    lambda shard: self.search(shard["query"], time_range=time_range,
+                                              max_results=max_results, budget=budget,
+                                              incremental=incremental),
+                    shards
+                ))
+
+        merged = merge_results(result_lists, merged_limit)
+        total = sum(len(results) for results in result_lists)
+        print(f"[Tavily] 分片搜索完成: {len(shards)} 个分片，{total} 条结果，去重后 {len(merged)} 条")
+        return merged
+
+    def run(self, search_config: Dict, budget: QueryBudget = None) -> List[SearchResult]:
+        """
+        按 get_weather_search_config / get_news_search_config 生成的配置执行搜索
+
+        配置中带 shards 时走分片搜索，否则执行单个合并查询；额度将尽时先按 governor 降级；
+        配置中 incremental 为 True 时只搜索上次成功以来的内容，流水线成功后需调用 commit_watermarks
+        """
+        if self.governor:
+            search_config = self.governor.plan(search_config)
+
+        if search_config.get("shards"):
+            return self.search_sharded(
+                search_config["shards"],
+                time_range=search_config.get("time_range", "day"),
+                max_results=search_config.get("max_results_per_shard", 5),
+                max_concurrency=search_config.get("max_concurrency", 4),
+                budget=budget,
+                merged_limit=search_config.get("max_merged_results"),
+                incremental=search_config.get("incremental", False)
+            )
+
+        return self.search(
+            search_config["query"],
+            time_range=search_config.get("time_range", "day"),
+            max_results=search_config.get("max_results", 10),
+            budget=budget,
+            incremental=search_config.get("incremental", False)
+        )
+
+    def run_adaptive(self, search_config: Dict, count_new: Callable[[List[SearchResult]], int],
+                     budget: QueryBudget = None) -> List[SearchResult]:
+        """
+        自适应深度搜索：按上次记录的深度搜索，去重后新增占比过高（查询饱和）时
+        先加大 max_results，到达上限后再用 followups 子查询补充；安静时下次减小深度
+
+        Args:
+            search_config: 搜索配置（followups 为可选的追加子查询列表）
+            count_new: 统计结果中去重后新增条数的函数
+            budget: 本次运行的查询预算
+
+        Returns:
+            合并后的搜索结果
+        """
+        settings = self.adaptive
+        if not settings["enabled"] or not self.state:
+            return self.run(search_config, budget)
+
+        sharded = bool(search_config.get("shards"))
+        depth_key = "max_results_per_shard" if sharded else "max_results"
+        cap = min(settings["max_results_cap"], MAX_RESULTS_LIMIT)
+        floor = min(settings["min_results"], cap)
+        query = search_config["query"]
+
+        depth = self.state.get(query).get("depth", search_config.get(depth_key, 10))
+        depth = max(floor, min(cap, depth))
+        results = self.run(dict(search_config, **{depth_key: depth}), budget)
+
+        followups = [] if sharded else list(search_config.get("followups", []))
+        saturated = False
+        for _ in range(settings["max_expansions"]):
+            requested = depth * (len(search_config["shards"]) if sharded else 1)
+            if sharded and search_config.get("max_merged_results"):
+                # 分片结果合并后按 max_merged_results 截断，达到截断上限即视为返回满额
+                requested = min(requested, search_config["max_merged_results"])
+            new_count = count_new(results)
+            if not results or len(results) < requested or new_count / len(results) <= settings["saturation_ratio"]:
+                break
+
+            saturated = True
+            if depth < cap:
+                depth = min(cap, depth * 2)
+                print(f"[Tavily] ⚠️ 查询饱和（新增 {new_count}/{len(results)}），加大深度到 {depth}")
+                deeper = self.run(dict(search_config, **{depth_key: depth}), budget)
+            elif followups:
+                print(f"[Tavily] ⚠️ 查询饱和（新增 {new_count}/{len(results)}），追加 {len(followups)} 个子查询")
+                deeper = self.search_sharded(
+                    followups,
+                    time_range=search_config.get("time_range", "day"),
+                    max_results=cap,
+                    max_concurrency=search_config.get("max_concurrency", 4),
+                    budget=budget,
+                    incremental=search_config.get("incremental", False)
+                )
+                followups = []
+            else:
+                print(f"[Tavily] ⚠️ 查询饱和（新增 {new_count}/{len(results)}），已达深度上限 {cap}")
+                break
+            results = merge_results([results, deeper])
+
+        new_count = count_new(results)
+        if saturated:
+            next_depth = depth
+        elif not results or new_count / len(results) < settings["quiet_ratio"]:
+            next_depth = max(floor, depth * 3 // 4)
+        else:
+            next_depth = depth
+        print(f"[Tavily] 自适应深度: {'饱和' if saturated else '未饱和'}，新增 {new_count}/{len(results)}，"
+              f"下次深度 {next_depth}")
+        self.state.update({query: {"depth": next_depth, "saturated": saturated}})
+        return results
+
+    def close(self):
+        """关闭连接池"""
+        self.session.close()
+
+
+_clients: Dict[str, TavilyClient] = {}
+_clients_lock = threading.Lock()
+
+
+def get_tavily_client(api_key: str, search_config: Dict = None, use_cache: bool = True,
+                      refresh: bool = False) -> TavilyClient:
+    """
+    获取进程内共享的 Tavily 客户端（同一个 API Key 只建一次连接池，TLS 握手只付一次）
+
+    Args:
+        api_key: Tavily API Key
+        search_config: config.json 中的 search 配置（地址、超时、重试、缓存、额度等），可选
+            环境变量 TAVILY_BASE_URL 优先于 search.base_url
+        use_cache: 是否启用响应缓存（对应命令行 --no-cache）
+        refresh: 是否跳过缓存读取、强制重新请求（对应命令行 --refresh）
+
+    Returns:
+        TavilyClient 实例
+    """
+    search_config = search_config or {}
+    with _clients_lock:
+        client = _clients.get(api_key)
+        if client is None:
+            cache = None
+            cache_config = search_config.get("cache", {})
+            if use_cache and cache_config.get("enabled", True):
+                cache = SearchCache(
+                    cache_config.get("file", "search_cache.db"),
+                    ttl_seconds=cache_config.get("ttl_seconds", 3600),
+                    max_entries=cache_config.get("max_entries", 500)
+                )
+            state = None
+            incremental_config = search_config.get("incremental", {})
+            use_watermarks = incremental_config.get("enabled", True)
+            if use_watermarks or search_config.get("adaptive", {}).get("enabled", True):
+                state = SearchState(incremental_config.get("state_file", "search_state.json"))
+            client = TavilyClient(
+                api_key,
+                connect_timeout=search_config.get("connect_timeout", 5),
+                read_timeout=search_config.get("timeout", 30),
+                max_retries=search_config.get("max_retries", 3),
+                backoff_base=search_config.get("backoff_base", 1.0),
+                backoff_max=search_config.get("backoff_max", 20.0),
+                pool_size=search_config.get("pool_size", 10),
+                cache=cache,
+                refresh=refresh,
+                governor=create_governor(search_config.get("quota")),
+                base_url=os.getenv("TAVILY_BASE_URL") or search_config.get("base_url", TAVILY_BASE_URL),
+                record_file=search_config.get("record_file"),
+                state=state,
+                watermark_overlap=incremental_config.get("overlap_minutes", 30) * 60,
+                use_watermarks=use_watermarks,
+                adaptive=search_config.get("adaptive"),
+                async_io=search_config.get("sharding", {}).get("async_io", False)
+            )
+            _clients[api_key] = client
+        return client
@@ -0,0 +1,213 @@
+"""
+官方天气预警源模块 - 流式解析 CAP/Atom 预警源（如 MeteoAlarm 各国 Atom 源），输出结构化预警
+"""
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, IO, List, Optional, TypedDict
+
+from classifier import get_classifier
+from http_fetch import ConditionalFetcher
+
+# CAP 严重程度，由低到高
+SEVERITY_LEVELS = ["Unknown", "Minor", "Moderate", "Severe", "Extreme"]
+
+# MeteoAlarm awareness_type 参数编号 -> 灾害类型
+AWARENESS_TYPES = {
+    "1": "wind", "2": "snow_ice", "3": "thunderstorm", "4": "fog", "5": "heat",
+    "6": "cold", "7": "coastal", "8": "forest_fire", "9": "avalanche", "10": "rain",
+    "12": "flood", "13": "flood",
+}
+
+
+class WeatherAlert(TypedDict, total=False):
+    """一条结构化天气预警"""
+    identifier: str
+    country: str
+    region: str
+    severity: str
+    hazard: str
+    event: str
+    headline: str
+    onset: str
+    expires: str
+    url: str
+
+
+def _local(tag: str) -> str:
+    """去掉命名空间：{urn:...}areaDesc -> areaDesc"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def classify_hazard(event: str, awareness_type: str = "") -> str:
+    """
+    识别官方预警的灾害类型，优先使用 awareness_type 参数（如 "2; snow-ice"），
+    没有时按 taxonomy.json 的 hazards 词表整词识别事件名称（仅用于 CAP 的 event 字段，搜索结果用 classifier 打标签）
+    """
+    code = awareness_type.split(";", 1)[0].strip()
+    if code in AWARENESS_TYPES:
+        return AWARENESS_TYPES[code]
+    return get_classifier().primary_hazard(event)
+
+
+def _parse_time(value: str) -> Optional[datetime]:
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _alert_from_fields(fields: Dict[str, str], country: str) -> Optional[WeatherAlert]:
+    """由一个 Atom entry 或 CAP info 的字段生成预警；取消、测试类消息返回 None"""
+    if fields.get("status", "Actual") != "Actual":
+        return None
+    if fields.get("msgType", fields.get("message_type", "Alert")) == "Cancel":
+        return None
+
+    event = fields.get("event") or fields.get("title", "")
+    severity = fields.get("severity", "Unknown")
+    return {
+        "identifier": fields.get("identifier") or fields.get("id", ""),
+        "country": country,
+        "region": fields.get("areaDesc", ""),
+        "severity": severity if severity in SEVERITY_LEVELS else "Unknown",
+        "hazard": classify_hazard(event, fields.get("awareness_type", "")),
+        "event": event,
+        "headline": fields.get("headline") or fields.get("title", ""),
+        "onset": fields.get("onset") or fields.get("effective", ""),
+        "expires": fields.get("expires", ""),
+        "url": fields.get("web") or fields.get("link", ""),
+    }
+
+
+def parse_cap_feed(stream: IO[bytes], country: str) -> List[WeatherAlert]:
+    """
+    流式解析 CAP/Atom 预警源：每处理完一个 entry（Atom）或 info（CAP）就释放其元素，内存占用与源大小无关
+
+    同时支持带 cap: 扩展字段的 Atom 源和 CAP 1.2 alert 文档
+
+    Args:
+        stream: XML 字节流
+        country: 该预警源对应的国家
+
+    Returns:
+        结构化预警列表
+    """
+    alerts = []
+    header: Dict[str, str] = {}   # CAP alert 头部字段（identifier/status/msgType），对其下所有 info 生效
+    fields: Dict[str, str] = {}   # 当前 entry/info 的字段
+    areas: List[str] = []
+    value_name = ""
+    in_item = False
+    root = None
+
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        name = _local(elem.tag)
+        if event == "start":
+            if root is None:
+                root = elem
+            if name in ("entry", "info"):
+                fields, areas, in_item = {}, [], True
+            continue
+
+        text = (elem.text or "").strip()
+        if not in_item:
+            if name in ("identifier", "status", "msgType"):
+                header[name] = text
+        elif name == "areaDesc":
+            areas.append(text)
+        elif name == "valueName":
+            value_name = text
+        elif name == "value" and value_name == "awareness_type":
+            fields["awareness_type"] = text
+        elif name == "link" and elem.get("href") and elem.get("rel", "alternate") == "alternate":
+            fields.setdefault("link", elem.get("href"))
+        elif name in ("entry", "info"):
+            fields["areaDesc"] = ", ".join(dict.fromkeys(area for area in areas if area))
+            alert = _alert_from_fields(dict(header, **fields), country)
+            if alert:
+                alerts.append(alert)
+            fields, areas, in_item = {}, [], False
+            elem.clear()
+            if name == "entry" and root is not None:
+                # Atom 源的 entry 都是 feed 的直接子元素，处理完即可从根上移除
+                root.clear()
+        elif text and name not in ("alert", "feed", "area", "parameter", "eventCode", "geocode"):
+            fields.setdefault(name, text)
+
+    return alerts
+
+
+def active_alerts(alerts: List[WeatherAlert], min_severity: str = "Moderate",
+                  now: Optional[datetime] = None) -> List[WeatherAlert]:
+    """过滤掉已过期和低于 min_severity 的预警，按严重程度、开始时间排序"""
+    now = now or datetime.now(timezone.utc)
+    threshold = SEVERITY_LEVELS.index(min_severity) if min_severity in SEVERITY_LEVELS else 0
+    kept = []
+    for alert in alerts:
+        expires = _parse_time(alert.get("expires", ""))
+        if expires is not None and expires < now:
+            continue
+        if SEVERITY_LEVELS.index(alert.get("severity", "Unknown")) < threshold:
+            continue
+        kept.append(alert)
+    kept.sort(key=lambda a: (-SEVERITY_LEVELS.index(a.get("severity", "Unknown")), a.get("onset", "")))
+    return kept
+
+
+def fetch_weather_alerts(feeds: Dict[str, str], fetcher: ConditionalFetcher,
+                         min_severity: str = "Moderate", max_workers: int = 4) -> List[WeatherAlert]:
+    """
+    并发拉取各国预警源（条件 GET，未变化的源直接使用上次解析结果）
+
+    Args:
+        feeds: 国家 -> 预警源 URL
+        fetcher: 条件请求器
+        min_severity: 最低严重程度
+        max_workers: 并发数
+
+    Returns:
+        当前有效的结构化预警
+    """
+    if not feeds:
+        return []
+
+    def fetch_one(item):
+        country, url = item
+        alerts, changed = fetcher.fetch(url, lambda stream: parse_cap_feed(stream, country))
+        print(f"[天气预警源] {country}: {len(alerts)} 条预警{'' if changed else '（沿用上次结果）'}")
+        return alerts
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(feeds))),
+                            thread_name_prefix="weather-feed") as pool:
+        all_alerts = [alert for alerts in pool.map(fetch_one, feeds.items()) for alert in alerts]
+
+    alerts = active_alerts(all_alerts, min_severity)
+    print(f"[天气预警源] 共 {len(all_alerts)} 条，当前有效（≥{min_severity}）{len(alerts)} 条")
+    return alerts
+
+
+def get_weather_alerts(config: Dict) -> Optional[List[WeatherAlert]]:
+    """
+    按 config.json 的 weather_feeds 配置拉取官方预警
+
+    Returns:
+        结构化预警列表；未启用官方预警源时返回 None（调用方改用关键词搜索）
+    """
+    feed_config = config.get("weather_feeds", {})
+    if not feed_config.get("enabled"):
+        return None
+
+    countries = config.get("monitoring", {}).get("countries", [])
+    feeds = {country: url for country, url in feed_config.get("feeds", {}).items()
+             if not countries or country in countries}
+    fetcher = ConditionalFetcher(feed_config.get("cache_file", "feed_cache.json"),
+                                 read_timeout=feed_config.get("timeout", 30))
+    try:
+        return fetch_weather_alerts(feeds, fetcher, feed_config.get("min_severity", "Moderate"),
+                                    feed_config.get("max_concurrency", 4))
+    finally:
+        fetcher.close()
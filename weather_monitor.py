@@ -3,15 +3,39 @@
 """
 import os
 from datetime import datetime
-from typing import Dict, List
+from typing import Dict, List, Optional
 
+from classifier import get_classifier
+from weather_feeds import WeatherAlert
 
-def search_weather_alerts(countries: List[str] = None) -> Dict:
+
+WEATHER_QUERY_TERMS = "logistics transport weather alert warning storm snow rain wind extreme temperature"
+
+# 严重程度 -> (图标, 中文)
+SEVERITY_LABELS = {
+    "Extreme": ("🔴", "极端"), "Severe": ("🟠", "严重"), "Moderate": ("🟡", "中等"),
+    "Minor": ("🟢", "轻微"), "Unknown": ("⚪", "未知"),
+}
+
+# 各灾害类型对物流的主要影响
+HAZARD_IMPACTS = {
+    "wind": "强风可能导致桥梁和高速路段限行、港口吊装暂停",
+    "thunderstorm": "雷暴可能导致港口和机场作业中断",
+    "snow_ice": "冰雪可能导致道路封闭和运输效率下降",
+    "rain": "强降雨可能影响物流时效",
+    "flood": "洪水可能导致道路和铁路中断",
+    "heat": "高温可能触发重型货车限行",
+    "coastal": "风暴潮可能导致港口关闭",
+}
+
+
+def search_weather_alerts(countries: List[str] = None, sharding: Dict = None) -> Dict:
     """
     搜索欧洲物流相关的天气预警信息
 
     Args:
         countries: 要监控的国家列表，默认关注德国
+        sharding: 分片搜索配置（config.json 中的 search.sharding），enabled 时按国家拆分子查询
 
     Returns:
         包含天气预警信息的字典
@@ -21,26 +45,102 @@ def search_weather_alerts(countries: List[str] = None) -> Dict:
 
     # 构建搜索查询
     countries_str = " OR ".join(countries)
-    query = f"({countries_str}) logistics transport weather alert warning storm snow rain wind extreme temperature"
+    query = f"({countries_str}) {WEATHER_QUERY_TERMS}"
 
     print(f"[天气监控] 搜索查询: {query}")
 
-    # 注意：实际搜索需要在主程序中使用 Tavily MCP 工具
-    # 这里返回搜索配置
-    return {
+    # 这里返回搜索配置，由 TavilyClient.run 执行
+    search_config = {
         "query": query,
         "time_range": "day",  # 最近24小时
         "max_results": 10,
         "search_type": "weather_alert"
     }
 
+    if sharding and sharding.get("enabled"):
+        search_config.update({
+            "shards": [
+                {"label": country, "query": f"{country} {WEATHER_QUERY_TERMS}"}
+                for country in countries
+            ],
+            "max_results_per_shard": sharding.get("max_results_per_shard", 5),
+            "max_concurrency": sharding.get("max_concurrency", 4),
+            "max_merged_results": sharding.get("max_merged_results", 30)
+        })
+        print(f"[天气监控] 分片搜索: {len(countries)} 个子查询")
+
+    return search_config
+
+
+def _format_alert_time(value: str) -> str:
+    """把 ISO 时间缩短为 MM-DD HH:MM（保留原时区）"""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).strftime("%m-%d %H:%M")
+    except ValueError:
+        return value or "未知"
+
+
+def _format_structured_alerts(alerts: List[WeatherAlert]) -> str:
+    """官方预警源的结构化预警：按国家、严重程度汇总，逐条列出区域、灾害类型和生效时间"""
+    if not alerts:
+        report = "## ✅ 今日天气概览\n\n"
+        report += "**官方预警源显示监控区域内暂无中等及以上级别的天气预警，运输条件正常。**\n\n"
+        report += "建议继续关注天气变化，保持正常运输计划。\n\n"
+        return report
+
+    classifier = get_classifier()
+    countries = sorted({classifier.countries.get(a["country"], a["country"]) for a in alerts})
+    hazards = classifier.hazard_labels(a["hazard"] for a in alerts)
+    severity_counts = {}
+    for alert in alerts:
+        severity_counts[alert["severity"]] = severity_counts.get(alert["severity"], 0) + 1
+
+    report = "## 📋 今日天气概览\n\n"
+    report += f"**官方预警源当前有效预警 {len(alerts)} 条。**\n\n"
+    report += "**严重程度：** " + " | ".join(
+        f"{SEVERITY_LABELS[level][0]} {SEVERITY_LABELS[level][1]} {severity_counts[level]} 条"
+        for level in SEVERITY_LABELS if level in severity_counts
+    ) + "\n\n"
+    report += f"**涉及国家：** {' | '.join(countries)}\n\n"
+    report += f"**灾害类型：** {' | '.join(hazards)}\n\n"
+
+    impacts = [HAZARD_IMPACTS[h] for h in dict.fromkeys(a["hazard"] for a in alerts) if h in HAZARD_IMPACTS]
+    if impacts:
+        report += "**主要影响：** " + "；".join(impacts) + "。\n\n"
 
-def format_weather_report(search_results: List[Dict]) -> str:
+    report += "**📌 行动建议：** "
+    if any(a["severity"] in ("Extreme", "Severe") for a in alerts):
+        report += "存在严重及以上级别预警，建议受影响区域暂停或改道运输，并提前通知客户可能的延误。"
+    elif len(countries) >= 3:
+        report += "多个国家受影响，建议提前规划替代路线，密切关注天气发展。"
+    else:
+        report += "建议关注相关区域的天气变化，必要时调整运输计划。"
+    report += "\n\n---\n\n"
+
+    report += "## 🔗 详细预警信息\n\n"
+    for idx, alert in enumerate(alerts, 1):
+        icon, level = SEVERITY_LABELS.get(alert["severity"], SEVERITY_LABELS["Unknown"])
+        country = classifier.countries.get(alert["country"], alert["country"])
+        hazard = classifier.hazards.get(alert["hazard"], "其他")
+        report += f"**{idx}. {icon} {country} · {alert.get('region') or '全境'} · {hazard}（{level}）**\n"
+        report += f"   ⏰ {_format_alert_time(alert.get('onset', ''))} 至 {_format_alert_time(alert.get('expires', ''))}"
+        if alert.get("event"):
+            report += f" · {alert['event']}"
+        report += "\n"
+        if alert.get("url"):
+            report += f"   📎 [查看详情]({alert['url']})\n"
+        report += "\n"
+
+    return report
+
+
+def format_weather_report(search_results: List[Dict], alerts: Optional[List[WeatherAlert]] = None) -> str:
     """
     格式化天气预警报告（简洁版：总结+链接）
 
     Args:
         search_results: Tavily 搜索返回的结果
+        alerts: 官方预警源的结构化预警（weather_feeds.get_weather_alerts），提供时代替搜索结果生成报告
 
     Returns:
         格式化的天气报告文本（简洁中文总结+链接）
@@ -53,6 +153,10 @@ def format_weather_report(search_results: List[Dict]) -> str:
     report += f"**📍 监控区域：** 德国、法国、荷兰、比利时、波兰\n\n"
     report += "---\n\n"
 
+    # 官方预警源
+    if alerts is not None:
+        return report + _format_structured_alerts(alerts)
+
     # 无预警情况
     if not search_results or len(search_results) == 0:
         report += "## ✅ 今日天气概览\n\n"
@@ -63,56 +167,32 @@ def format_weather_report(search_results: List[Dict]) -> str:
     # 有预警情况 - 生成整体中文总结
     report += "## 📋 今日天气概览\n\n"
 
-    # 统计和分类预警
-    weather_summary = []
+    # 统计和分类预警（灾害类型与官方预警共用 taxonomy.json 中 hazards 的键）
     countries_mentioned = set()
-    weather_types = set()
+    hazards = set()
 
+    classifier = get_classifier()
     for result in search_results:
-        title = result.get("title", "").lower()
-        content = result.get("content", "").lower()
-        full_text = title + " " + content
-
-        # 提取国家
-        if "germany" in full_text or "german" in full_text:
-            countries_mentioned.add("德国")
-        if "france" in full_text or "french" in full_text:
-            countries_mentioned.add("法国")
-        if "netherlands" in full_text or "dutch" in full_text:
-            countries_mentioned.add("荷兰")
-        if "belgium" in full_text or "belgian" in full_text:
-            countries_mentioned.add("比利时")
-        if "poland" in full_text or "polish" in full_text:
-            countries_mentioned.add("波兰")
-
-        # 提取天气类型
-        if "storm" in full_text or "风暴" in full_text:
-            weather_types.add("暴风雨")
-        if "snow" in full_text or "雪" in full_text:
-            weather_types.add("降雪")
-        if "rain" in full_text or "雨" in full_text:
-            weather_types.add("降雨")
-        if "wind" in full_text or "大风" in full_text:
-            weather_types.add("大风")
-        if "temperature" in full_text or "温度" in full_text:
-            weather_types.add("极端温度")
+        tags = classifier.classify(result)
+        countries_mentioned.update(tags.countries)
+        hazards.update(tags.hazards)
 
     # 生成总结文字
     report += f"**今日监控到 {len(search_results)} 条天气预警信息。**\n\n"
 
     if countries_mentioned:
-        report += f"**涉及国家：** {' | '.join(sorted(countries_mentioned))}\n\n"
+        report += f"**涉及国家：** {' | '.join(classifier.country_labels(countries_mentioned))}\n\n"
 
-    if weather_types:
-        report += f"**天气类型：** {' | '.join(sorted(weather_types))}\n\n"
+    if hazards:
+        report += f"**天气类型：** {' | '.join(classifier.hazard_labels(hazards))}\n\n"
 
     # 主要影响总结
     report += "**主要影响：** "
-    if "暴风雨" in weather_types or "大风" in weather_types:
+    if "wind" in hazards or "thunderstorm" in hazards:
         report += "强风可能导致运输延误和安全风险。"
-    elif "降雪" in weather_types:
-        report += "降雪可能影响道路通行和运输效率。"
-    elif "降雨" in weather_types:
+    elif "snow_ice" in hazards:
+        report += "降雪或道路结冰可能影响道路通行和运输效率。"
+    elif "rain" in hazards or "flood" in hazards:
         report += "降雨可能影响物流时效。"
     else:
         report += "天气条件可能对物流运输造成一定影响。"
@@ -155,5 +235,6 @@ def get_weather_search_config(config: Dict) -> Dict:
     """
     monitoring = config.get("monitoring", {})
     countries = monitoring.get("countries", ["Germany"])
+    sharding = config.get("search", {}).get("sharding")
 
-    return search_weather_alerts(countries)
+    return search_weather_alerts(countries, sharding)